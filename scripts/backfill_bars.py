@@ -0,0 +1,86 @@
+"""Backfill the local bar store with full daily history from Alpha Vantage.
+
+``FetchStockSummaryTool`` only ever asks for ``outputsize=compact`` (the latest
+~100 sessions), so the bar store cannot reconstruct anything older. This
+command pulls ``outputsize=full`` once per symbol into ``data/bars`` and, on
+every later run, only requests the compact tail to append new sessions (or
+nothing, if the symbol is already current). Requests run concurrently through
+the shared Alpha Vantage client, so they stay within the configured rate
+budget (see ``ALPHA_VANTAGE_PLAN`` in the README).
+
+Run
+---
+    python scripts/backfill_bars.py --symbols AAPL MSFT
+    python scripts/backfill_bars.py --tickers-file scripts/tickers_input.csv
+    python scripts/backfill_bars.py --tickers-file tickers.json --limit 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import sys
+from collections import Counter
+from pathlib import Path
+
+# Make the package importable when run as a standalone script.
+_PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(_PROJECT_ROOT / "src"))
+
+from dotenv import load_dotenv  # noqa: E402
+
+load_dotenv(_PROJECT_ROOT / ".env")
+
+from sp_stock_agent.tools.alpha_vantage_api_tool import backfill_bars  # noqa: E402
+
+DEFAULT_TICKERS_FILE = "tickers.json"
+
+
+def load_symbols(path: str) -> list[str]:
+    """Symbols from ``tickers.json`` (SEC ticker map) or a one-column CSV with a header."""
+    p = Path(path)
+    if p.suffix.lower() == ".json":
+        with open(p) as f:
+            return [s.upper() for s in json.load(f)]
+    with open(p, encoding="utf-8-sig", newline="") as f:
+        rows = [r[0].strip().upper() for r in csv.reader(f) if r and r[0].strip()]
+    return [s for s in rows[1:] if not s.startswith("#")]
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--symbols", nargs="+", help="Explicit symbols (overrides --tickers-file).")
+    ap.add_argument(
+        "--tickers-file",
+        default=DEFAULT_TICKERS_FILE,
+        help="tickers.json or a one-column CSV (default: tickers.json).",
+    )
+    ap.add_argument("--interval", default="daily", choices=["daily", "weekly", "monthly"])
+    ap.add_argument("--limit", type=int, default=None, help="Only backfill the first N symbols.")
+    ap.add_argument("--force-full", action="store_true", help="Re-download full history for every symbol.")
+    args = ap.parse_args(argv)
+
+    symbols = [s.upper() for s in args.symbols] if args.symbols else load_symbols(args.tickers_file)
+    if args.limit is not None:
+        symbols = symbols[: args.limit]
+    if not symbols:
+        print("No symbols to backfill.", file=sys.stderr)
+        return 1
+
+    print(f"Backfilling {len(symbols)} symbol(s) ({args.interval})...")
+    outcome = backfill_bars(symbols, interval=args.interval, force_full=args.force_full)
+
+    counts = Counter("error" if r.startswith("error") else r for r in outcome.values())
+    print(
+        f"full: {counts['full']}  compact: {counts['compact']}  "
+        f"current: {counts['current']}  errors: {counts['error']}"
+    )
+    for symbol, result in outcome.items():
+        if result.startswith("error"):
+            print(f"  {symbol}: {result}", file=sys.stderr)
+    return 1 if counts["error"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
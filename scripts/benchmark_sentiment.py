@@ -0,0 +1,121 @@
+"""Benchmark the news sentiment backends on CPU.
+
+Loads each backend from ``sp_stock_agent.sentiment_backends``, warms it up,
+then classifies the same set of summaries and reports load time, per-article
+latency and throughput. Summaries come from the scraper's last run
+(``data/news_data.json``) when present, otherwise from a small built-in set.
+Backends whose dependencies are missing (e.g. ``finbert-onnx`` without
+``optimum``) are reported and skipped.
+
+Usage:
+    python scripts/benchmark_sentiment.py
+    python scripts/benchmark_sentiment.py --backends zero-shot finbert --repeat 5
+    python scripts/benchmark_sentiment.py --texts-file data/news_data.json --csv sentiment_bench.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+# Make the package importable when run as a standalone script.
+_PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(_PROJECT_ROOT / "src"))
+
+from sp_stock_agent.sentiment_backends import BACKENDS, load_sentiment_backend  # noqa: E402
+
+DEFAULT_TEXTS_FILE = "data/news_data.json"
+
+SAMPLE_TEXTS = [
+    "The company raised its full-year revenue guidance after quarterly sales beat analyst estimates.",
+    "Shares fell sharply after the regulator opened an investigation into the firm's accounting practices.",
+    "The board declared a regular quarterly dividend, unchanged from the prior quarter.",
+    "Margins contracted as input costs rose and demand in its largest market softened.",
+    "Analysts upgraded the stock to buy, citing strong subscription growth and cost discipline.",
+    "The chipmaker announced a new product line expected to ship in the second half of the year.",
+    "The retailer will close 120 stores and cut 4% of its workforce to reduce expenses.",
+    "Management reiterated its outlook and said order trends were in line with expectations.",
+]
+
+
+def load_texts(path: str) -> list[str]:
+    """Summaries from a ``news_data.json`` written by the scraper, else the samples."""
+    p = Path(path)
+    if p.exists():
+        texts = [r.get("summary") for r in json.loads(p.read_text())]
+        texts = [t for t in texts if t]
+        if texts:
+            return texts
+    return list(SAMPLE_TEXTS)
+
+
+def positive_int(value: str) -> int:
+    """argparse type for counts that must be at least 1."""
+    n = int(value)
+    if n < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {n}")
+    return n
+
+
+def bench(name: str, texts: list[str], batch_size: int, repeat: int) -> dict:
+    started = time.perf_counter()
+    backend = load_sentiment_backend(name)
+    load_sec = time.perf_counter() - started
+
+    backend(texts[:batch_size], batch_size=batch_size)  # warm-up
+    runs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        out = backend(texts, batch_size=batch_size)
+        runs.append(time.perf_counter() - started)
+    best = min(runs)
+    return {
+        "backend": name,
+        "load_sec": round(load_sec, 2),
+        "ms_per_article": round(1000 * best / len(texts), 2),
+        "articles_per_sec": round(len(texts) / best, 1),
+        "labels": dict(Counter(o["label"] for o in out)),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS))
+    ap.add_argument("--texts-file", default=DEFAULT_TEXTS_FILE)
+    ap.add_argument("--batch-size", type=positive_int, default=8)
+    ap.add_argument("--repeat", type=positive_int, default=3, help="Timed runs per backend (best is reported).")
+    ap.add_argument("--csv", help="Also write the results to this CSV file.")
+    args = ap.parse_args(argv)
+
+    texts = load_texts(args.texts_file)
+    print(f"Classifying {len(texts)} text(s), batch size {args.batch_size}, best of {args.repeat}\n")
+
+    results = []
+    for name in args.backends:
+        try:
+            results.append(bench(name, texts, args.batch_size, args.repeat))
+        except Exception as e:
+            print(f"  {name}: skipped ({e})", file=sys.stderr)
+
+    header = f"{'backend':<14}{'load s':>9}{'ms/article':>12}{'articles/s':>12}  labels"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['backend']:<14}{r['load_sec']:>9}{r['ms_per_article']:>12}{r['articles_per_sec']:>12}  {r['labels']}")
+
+    if args.csv and results:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(results[0]))
+            writer.writeheader()
+            writer.writerows(results)
+        print(f"\nWrote {args.csv}")
+    return 0 if results else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,143 @@
+"""Local on-disk store for Alpha Vantage OHLCV bars.
+
+Bars are kept per symbol and per interval (``daily``/``weekly``/``monthly``) in
+a small columnar JSON file, ``data/bars/<interval>/<SYMBOL>.json``::
+
+    {"symbol": "AAPL", "interval": "daily", "fetched_at": "...",
+     "full_history": false,
+     "date": [...], "open": [...], "high": [...], "low": [...],
+     "close": [...], "volume": [...]}
+
+Dates are ascending ``YYYY-MM-DD`` strings and every column has the same
+length. ``FetchStockSummaryTool`` reads this store first and only asks Alpha
+Vantage for the missing tail, so re-running the same evening costs no requests.
+``full_history`` records that the file holds the complete history from an
+``outputsize=full`` backfill (see ``scripts/backfill_bars.py``) and stays set
+while later compact top-ups extend it without a gap.
+
+Files are replaced atomically (write to a temp file, then ``os.replace``), so
+concurrent readers in other processes always see a complete file.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .market_calendar import US_EASTERN, required_market_data_date, session_close
+from .storage import write_atomic
+
+# Root directory of the bar store (override via env if needed).
+BAR_STORE_DIR = os.getenv("BAR_STORE_DIR", "data/bars")
+
+COLUMNS = ("open", "high", "low", "close", "volume")
+
+# One lock per file path so threads in this process never interleave a
+# read-merge-write cycle on the same symbol.
+_path_locks: Dict[str, threading.Lock] = {}
+_path_locks_guard = threading.Lock()
+
+
+def _lock_for(path: Path) -> threading.Lock:
+    with _path_locks_guard:
+        return _path_locks.setdefault(str(path), threading.Lock())
+
+
+def _empty(symbol: str, interval: str) -> dict:
+    return {
+        "symbol": symbol,
+        "interval": interval,
+        "fetched_at": None,
+        "full_history": False,
+        "date": [],
+        **{c: [] for c in COLUMNS},
+    }
+
+
+class BarStore:
+    """Columnar per-symbol/per-interval bar files under ``root``."""
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = Path(root or BAR_STORE_DIR)
+
+    def path(self, symbol: str, interval: str) -> Path:
+        return self.root / interval / f"{symbol.upper()}.json"
+
+    def load(self, symbol: str, interval: str = "daily") -> dict:
+        """Return the stored columns for ``symbol`` (empty columns if none)."""
+        p = self.path(symbol, interval)
+        if not p.exists():
+            return _empty(symbol, interval)
+        try:
+            data = json.loads(p.read_text())
+        except (OSError, ValueError):
+            # A corrupt file is just a cache miss; the next merge rewrites it.
+            return _empty(symbol, interval)
+        if any(len(data.get(c, [])) != len(data.get("date", [])) for c in COLUMNS):
+            return _empty(symbol, interval)
+        return data
+
+    def latest_date(self, symbol: str, interval: str = "daily") -> Optional[str]:
+        dates = self.load(symbol, interval)["date"]
+        return dates[-1] if dates else None
+
+    def is_current(self, bars: dict, as_of: Optional[datetime] = None) -> bool:
+        """True if ``bars`` already hold the bar the market calendar requires.
+
+        The latest stored bar must be on/after ``required_market_data_date`` and
+        must have been fetched after that session closed, so a partial bar
+        stored during trading hours is never mistaken for the settled one.
+        """
+        if not bars["date"] or not bars.get("fetched_at"):
+            return False
+        required = required_market_data_date(as_of)
+        latest = datetime.strptime(bars["date"][-1], "%Y-%m-%d").date()
+        fetched_at = datetime.fromisoformat(bars["fetched_at"]).astimezone(US_EASTERN)
+        return latest >= required and fetched_at >= session_close(required)
+
+    def merge(self, symbol: str, interval: str, rows: Dict[str, dict], full: bool = False) -> dict:
+        """Upsert ``rows`` (``{date: {open, high, low, close, volume}}``) and save.
+
+        Pass ``full=True`` when ``rows`` is the symbol's complete history.
+
+        ``rows`` is a contiguous recent tail as returned by Alpha Vantage, so any
+        stored bar on/after its oldest date that it does not contain is
+        obsolete (e.g. a partial weekly bar keyed by a mid-week date) and is
+        dropped. If the stored history ends before the tail starts there may
+        be a gap we cannot detect, so the old history is discarded rather than
+        stitched together.
+        """
+        if not rows:
+            return self.load(symbol, interval)
+
+        p = self.path(symbol, interval)
+        with _lock_for(p):
+            stored = self.load(symbol, interval)
+            oldest_new = min(rows)
+            keep: Dict[str, dict] = {}
+            full_history = full
+            if stored["date"] and stored["date"][-1] >= oldest_new:
+                full_history = full or bool(stored.get("full_history"))
+                for i, d in enumerate(stored["date"]):
+                    if d < oldest_new:
+                        keep[d] = {c: stored[c][i] for c in COLUMNS}
+            keep.update(rows)
+
+            dates: List[str] = sorted(keep)
+            merged = _empty(symbol.upper(), interval)
+            merged["fetched_at"] = datetime.now(timezone.utc).isoformat()
+            merged["full_history"] = full_history
+            merged["date"] = dates
+            for c in COLUMNS:
+                merged[c] = [keep[d][c] for d in dates]
+            write_atomic(p, json.dumps(merged))
+            return merged
+
+    def tail(self, bars: dict, n: int) -> List[tuple]:
+        """Return the newest ``n`` bars as ``(date, row)`` pairs, newest first."""
+        out = []
+        for i in range(len(bars["date"]) - 1, max(len(bars["date"]) - n, 0) - 1, -1):
+            out.append((bars["date"][i], {c: bars[c][i] for c in COLUMNS}))
+        return out
@@ -16,8 +16,8 @@ from sp_stock_agent.usage_tracker import record_run
 from sp_stock_agent.evaluation_metadata import capture_metadata
 from sp_stock_agent.decision_table_writer import write_decision_table
 from sp_stock_agent.market_calendar import next_trading_day, required_market_data_date, now_eastern
-from .tools import Sec10KTool
-from .tools.alpha_vantage_api_tool import validate_daily_data_freshness
+from .tools.sec_10k_tool import prefetch_10k
+from .tools.alpha_vantage_api_tool import use_market_data_snapshot, validate_daily_data_freshness
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
@@ -213,14 +213,16 @@ class StockAnalysisFlow(Flow[StockAnalysisState]):
     
     @listen(get_tickers)
     def get_10K_document(self, raw_tickers):
-        """Prefetch 10-K HTML per ticker; missing filings must not abort the flow."""
+        """Prefetch 10-K HTML per ticker; missing filings must not abort the flow.
+
+        Downloads run concurrently within SEC's rate limit and parsing runs in
+        worker processes (see ``prefetch_10k``).
+        """
         if not raw_tickers:
             return
-        for ticker in raw_tickers:
-            try:
-                _ = Sec10KTool()._run(ticker)
-            except Exception as e:
-                warnings.warn(f"10-K prefetch skipped for {ticker}: {e}", UserWarning)
+        for ticker, result in prefetch_10k(raw_tickers).items():
+            if result.startswith("error"):
+                warnings.warn(f"10-K prefetch skipped for {ticker}: {result[len('error: '):]}", UserWarning)
 
     @listen(validate_tickers)
     def check_market_data_freshness(self, validated_tickers):
@@ -235,7 +237,8 @@ class StockAnalysisFlow(Flow[StockAnalysisState]):
             f"Required daily OHLC bar date: {required} ({required.strftime('%A')})\n"
         )
 
-        stale = validate_daily_data_freshness(validated_tickers, required)
+        snapshot: dict = {}
+        stale = validate_daily_data_freshness(validated_tickers, required, snapshot=snapshot)
         if stale:
             lines = [
                 "Market data is too stale to run a prediction. Alpha Vantage did not "
@@ -264,6 +267,10 @@ class StockAnalysisFlow(Flow[StockAnalysisState]):
             raise ValueError("\n".join(lines))
 
         print(f"✓ All {len(validated_tickers)} tickers have daily data through {required}")
+
+        # Hand the verified bars to the crew: fetch_stock_summary serves daily
+        # requests from this snapshot instead of calling Alpha Vantage again.
+        use_market_data_snapshot(snapshot)
         return validated_tickers
 
     @listen(check_market_data_freshness)
@@ -6,7 +6,7 @@ holidays are skipped when ``pandas`` is available (it is a transitive
 dependency), otherwise only weekends are skipped.
 """
 
-from datetime import date, datetime, timedelta
+from datetime import date, datetime, time, timedelta
 from functools import lru_cache
 from zoneinfo import ZoneInfo
 
@@ -105,6 +105,20 @@ def previous_trading_day(d) -> date:
     return prev
 
 
+def session_close(d) -> datetime:
+    """Return the regular-session close (4:00 PM US/Eastern) on ``d``."""
+    return datetime.combine(_as_date(d), time(MARKET_CLOSE_HOUR), tzinfo=US_EASTERN)
+
+
+def next_session_close(as_of: datetime | None = None) -> datetime:
+    """Return the close of the first session whose bar is not yet required.
+
+    Daily data that already contains ``required_market_data_date(as_of)``
+    cannot change before this moment, so it is a natural cache expiry.
+    """
+    return session_close(next_trading_day(required_market_data_date(as_of)))
+
+
 def now_eastern() -> datetime:
     """Current wall-clock time in US/Eastern (NYSE regular session timezone)."""
     return datetime.now(US_EASTERN)
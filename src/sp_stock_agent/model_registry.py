@@ -0,0 +1,58 @@
+"""Process-wide registry of lazily loaded ML models.
+
+Tools register a *factory* for each model under a name at import time, which
+is cheap; the model itself is only built the first time ``get_model`` is
+called and is then shared by every caller in the process. Loading is guarded
+by a per-name lock, so concurrent first calls build the model exactly once.
+
+    register_model("news_summarizer",
+                   lambda: pipeline("summarization", model="Falconsai/text_summarization"))
+    summarizer = get_model("news_summarizer")   # loads on first use only
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+_factories: Dict[str, Callable[[], Any]] = {}
+_models: Dict[str, Any] = {}
+_locks: Dict[str, threading.Lock] = {}
+_registry_lock = threading.Lock()
+
+
+def register_model(name: str, factory: Callable[[], Any]) -> None:
+    """Register (or replace) the factory for ``name``; any loaded instance is dropped."""
+    with _registry_lock:
+        _factories[name] = factory
+        _models.pop(name, None)
+        _locks.setdefault(name, threading.Lock())
+
+
+def get_model(name: str) -> Any:
+    """Return the shared instance of ``name``, building it on first use."""
+    model = _models.get(name)
+    if model is not None:
+        return model
+    with _registry_lock:
+        if name not in _factories:
+            raise KeyError(f"No model registered under '{name}'")
+        lock = _locks[name]
+    with lock:
+        model = _models.get(name)
+        if model is None:
+            logger.info(f"Loading model '{name}'")
+            model = _factories[name]()
+            _models[name] = model
+    return model
+
+
+def is_loaded(name: str) -> bool:
+    return name in _models
+
+
+def unload_models() -> None:
+    """Drop every loaded instance (factories stay registered)."""
+    with _registry_lock:
+        _models.clear()
@@ -0,0 +1,123 @@
+"""Per-ticker sentiment aggregates computed from an Alpha Vantage news feed.
+
+Every NEWS_SENTIMENT article carries a ``ticker_sentiment`` list with a
+``relevance_score`` (0..1) and ``ticker_sentiment_score`` (-1..1) per ticker.
+Instead of leaving the news agent to read and average those by eye,
+``aggregate_ticker_sentiment`` flattens all (article, ticker) pairs into NumPy
+arrays once and reduces them per ticker with ``np.bincount``:
+
+- ``mean``: relevance-weighted mean sentiment;
+- ``std``: relevance-weighted standard deviation (dispersion of opinion);
+- ``count``: number of articles mentioning the ticker;
+- ``decayed``: relevance-weighted mean where each article's weight also halves
+  every ``half_life_hours`` of age, so fresh news dominates;
+- ``label``: Alpha Vantage's label for the weighted mean.
+
+Values are ``None`` when a ticker has no articles (or only zero-relevance
+ones). ``numpy`` is a transitive dependency of crewai.
+"""
+
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Age at which an article's weight in the decayed score halves.
+NEWS_SENTIMENT_HALF_LIFE_HOURS = float(os.getenv("NEWS_SENTIMENT_HALF_LIFE_HOURS", "12"))
+
+
+def sentiment_label(score: Optional[float]) -> Optional[str]:
+    """Alpha Vantage's documented label for a sentiment score."""
+    if score is None:
+        return None
+    if score <= -0.35:
+        return "Bearish"
+    if score <= -0.15:
+        return "Somewhat-Bearish"
+    if score < 0.15:
+        return "Neutral"
+    if score < 0.35:
+        return "Somewhat-Bullish"
+    return "Bullish"
+
+
+def parse_time(value: str) -> Optional[datetime]:
+    """AV timestamp (``YYYYMMDDTHHMM[SS]``) as a naive datetime, or ``None``."""
+    for fmt in ("%Y%m%dT%H%M%S", "%Y%m%dT%H%M"):
+        try:
+            return datetime.strptime(value, fmt)
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def _value(x: float) -> Optional[float]:
+    return None if np.isnan(x) else round(float(x), 4)
+
+
+def aggregate_ticker_sentiment(
+    feed: List[dict],
+    tickers: List[str],
+    as_of: Optional[datetime] = None,
+    half_life_hours: float = NEWS_SENTIMENT_HALF_LIFE_HOURS,
+) -> Dict[str, dict]:
+    """Return ``{ticker: {"count", "mean", "std", "decayed", "label"}}``.
+
+    ``as_of`` is the reference time for decay (naive, same clock as AV's
+    ``time_published``); it defaults to the newest article in the feed.
+    """
+    index = {t.upper(): i for i, t in enumerate(tickers)}
+    rows, relevance, score, published = [], [], [], []
+    for article in feed:
+        when = parse_time(article.get("time_published", ""))
+        for entry in article.get("ticker_sentiment", []) or []:
+            i = index.get(str(entry.get("ticker", "")).upper())
+            if i is None:
+                continue
+            try:
+                r, s = float(entry.get("relevance_score")), float(entry.get("ticker_sentiment_score"))
+            except (TypeError, ValueError):
+                continue
+            rows.append(i)
+            relevance.append(r)
+            score.append(s)
+            published.append(when.timestamp() if when else np.nan)
+
+    n = len(tickers)
+    idx = np.asarray(rows, dtype=int)
+    rel = np.asarray(relevance, dtype=float)
+    val = np.asarray(score, dtype=float)
+    ts = np.asarray(published, dtype=float)
+
+    count = np.bincount(idx, minlength=n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        wsum = np.bincount(idx, weights=rel, minlength=n)
+        mean = np.bincount(idx, weights=rel * val, minlength=n) / wsum
+        var = np.bincount(idx, weights=rel * (val - mean[idx]) ** 2, minlength=n) / wsum
+        std = np.sqrt(var)
+
+        if len(ts) and not np.all(np.isnan(ts)):
+            ref = as_of.timestamp() if as_of else np.nanmax(ts)
+            age_hours = np.clip((ref - np.where(np.isnan(ts), ref, ts)) / 3600.0, 0, None)
+        else:
+            age_hours = np.zeros(len(ts))
+        # The decayed score is a weighted mean, so shifting every age of a
+        # ticker by its freshest article's age leaves it unchanged while
+        # keeping the weights from underflowing for old feeds.
+        freshest = np.full(n, np.inf)
+        np.minimum.at(freshest, idx, age_hours)
+        decay = rel * 0.5 ** ((age_hours - freshest[idx]) / half_life_hours)
+        decayed = np.bincount(idx, weights=decay * val, minlength=n) / np.bincount(idx, weights=decay, minlength=n)
+
+    out = {}
+    for ticker, i in index.items():
+        m = _value(mean[i]) if count[i] else None
+        out[ticker] = {
+            "count": int(count[i]),
+            "mean": m,
+            "std": _value(std[i]) if count[i] else None,
+            "decayed": _value(decayed[i]) if count[i] else None,
+            "label": sentiment_label(m),
+        }
+    return out
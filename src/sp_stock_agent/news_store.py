@@ -0,0 +1,147 @@
+"""Local store of Alpha Vantage NEWS_SENTIMENT articles.
+
+``NewsSentimentTool`` used to re-download the whole 24-hour window for every
+ticker on every call. Articles are now kept in a small SQLite database
+(``data/news/articles.sqlite``) keyed by a hash of their URL and indexed by
+ticker and publication minute, together with a per-ticker *coverage window*:
+the span of time for which every article AV returned is already stored. A
+repeat run only asks AV for the part of its window after the covered span
+and serves the rest from here.
+
+Timestamps use AV's formats: ``time_from``/``time_to`` are ``YYYYMMDDTHHMM``
+and ``time_published`` is ``YYYYMMDDTHHMMSS``; everything is compared at
+minute precision (the first 13 characters), which keeps the comparison a
+plain string comparison.
+
+Only unfiltered queries (no ``topics``) use the coverage window, since a
+topic-filtered feed says nothing about the articles it left out.
+"""
+
+import hashlib
+import json
+import os
+from contextlib import closing
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from .storage import connect_sqlite
+
+# Location of the article database (override via env if needed).
+NEWS_STORE_PATH = os.getenv("NEWS_STORE_PATH", "data/news/articles.sqlite")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    url_hash TEXT PRIMARY KEY,
+    time_published TEXT NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS article_tickers (
+    ticker TEXT NOT NULL,
+    minute TEXT NOT NULL,
+    url_hash TEXT NOT NULL,
+    PRIMARY KEY (ticker, url_hash)
+);
+CREATE INDEX IF NOT EXISTS idx_article_tickers_time ON article_tickers (ticker, minute);
+CREATE TABLE IF NOT EXISTS coverage (
+    ticker TEXT PRIMARY KEY,
+    covered_from TEXT NOT NULL,
+    covered_to TEXT NOT NULL
+);
+"""
+
+
+def _minute(timestamp: str) -> str:
+    """``YYYYMMDDTHHMM`` prefix of an AV timestamp."""
+    return (timestamp or "")[:13]
+
+
+def article_key(article: dict) -> str:
+    """Stable identity of an article: hash of its URL (title + time if it has none)."""
+    ident = article.get("url") or f"{article.get('title')}|{article.get('time_published')}"
+    return hashlib.sha256(ident.encode("utf-8")).hexdigest()
+
+
+class NewsStore:
+    """SQLite-backed article store with per-ticker coverage windows."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path or NEWS_STORE_PATH)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(connect_sqlite(self.path)) as conn:
+            conn.executescript(_SCHEMA)
+
+    def coverage(self, ticker: str) -> Optional[Tuple[str, str]]:
+        """``(covered_from, covered_to)`` for ``ticker``, or ``None``."""
+        with closing(connect_sqlite(self.path)) as conn:
+            row = conn.execute(
+                "SELECT covered_from, covered_to FROM coverage WHERE ticker = ?", (ticker.upper(),)
+            ).fetchone()
+        return tuple(row) if row else None
+
+    def record(
+        self,
+        ticker: str,
+        feed: List[dict],
+        window_from: str,
+        window_to: str,
+        sort: str = "LATEST",
+        truncated: bool = False,
+    ) -> None:
+        """Store ``feed`` (AV's answer for ``[window_from, window_to]``) and extend coverage.
+
+        If AV cut the feed at ``limit`` (``truncated``) only the part of the
+        window the returned articles span is known to be complete: from the
+        oldest article for ``LATEST`` ordering, up to the newest for ``EARLIEST``.
+        """
+        ticker = ticker.upper()
+        covered_from, covered_to = _minute(window_from), _minute(window_to)
+        published = sorted(_minute(a.get("time_published", "")) for a in feed if a.get("time_published"))
+        if truncated and published:
+            if sort == "LATEST":
+                covered_from = max(covered_from, published[0])
+            else:
+                covered_to = min(covered_to, published[-1])
+
+        with closing(connect_sqlite(self.path)) as conn, conn:
+            for article in feed:
+                key = article_key(article)
+                conn.execute(
+                    "INSERT OR REPLACE INTO articles (url_hash, time_published, payload) VALUES (?, ?, ?)",
+                    (key, article.get("time_published", ""), json.dumps(article)),
+                )
+                conn.execute(
+                    "INSERT OR IGNORE INTO article_tickers (ticker, minute, url_hash) VALUES (?, ?, ?)",
+                    (ticker, _minute(article.get("time_published", "")), key),
+                )
+
+            row = conn.execute(
+                "SELECT covered_from, covered_to FROM coverage WHERE ticker = ?", (ticker,)
+            ).fetchone()
+            # Overlapping or touching windows merge; otherwise the newest wins.
+            if row and covered_from <= row[1] and covered_to >= row[0]:
+                covered_from, covered_to = min(covered_from, row[0]), max(covered_to, row[1])
+            conn.execute(
+                "INSERT OR REPLACE INTO coverage (ticker, covered_from, covered_to) VALUES (?, ?, ?)",
+                (ticker, covered_from, covered_to),
+            )
+
+    def articles(
+        self,
+        ticker: str,
+        time_from: str,
+        time_to: str,
+        sort: str = "LATEST",
+        limit: Optional[int] = None,
+    ) -> List[dict]:
+        """Stored articles for ``ticker`` published within ``[time_from, time_to]``."""
+        order = "DESC" if sort == "LATEST" else "ASC"
+        sql = (
+            "SELECT a.payload FROM article_tickers t JOIN articles a ON a.url_hash = t.url_hash "
+            f"WHERE t.ticker = ? AND t.minute >= ? AND t.minute <= ? ORDER BY a.time_published {order}"
+        )
+        args: list = [ticker.upper(), _minute(time_from), _minute(time_to)]
+        if limit:
+            sql += " LIMIT ?"
+            args.append(int(limit))
+        with closing(connect_sqlite(self.path)) as conn:
+            return [json.loads(payload) for (payload,) in conn.execute(sql, args)]
@@ -0,0 +1,120 @@
+"""Persistent cache of news summaries and sentiment results.
+
+The same article keeps turning up in search results across tickers and
+nightly runs, and ``NewsScraperTool`` used to summarize and classify it again
+every time. Results are now stored in a small SQLite database
+(``data/cache/nlp.sqlite``) keyed by ``(kind, model_id, content_hash)``:
+
+- ``kind`` is ``"summary"`` or ``"sentiment"``;
+- ``model_id`` names the model that produced the value, so switching the
+  summarizer or sentiment backend never serves another model's output;
+- ``content_hash`` is the SHA-256 of the input text with whitespace
+  collapsed, so the same article under a different URL (or a syndicated
+  copy) still hits.
+
+Entries older than ``NLP_CACHE_MAX_AGE_DAYS`` are treated as misses and
+removed by ``prune``, which also keeps at most ``NLP_CACHE_MAX_ENTRIES``
+entries by dropping the least recently used ones.
+"""
+
+import hashlib
+import json
+import os
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from .storage import connect_sqlite
+
+# Location and bounds of the cache (override via env if needed).
+NLP_CACHE_PATH = os.getenv("NLP_CACHE_PATH", "data/cache/nlp.sqlite")
+NLP_CACHE_MAX_AGE_DAYS = float(os.getenv("NLP_CACHE_MAX_AGE_DAYS", "30"))
+NLP_CACHE_MAX_ENTRIES = int(os.getenv("NLP_CACHE_MAX_ENTRIES", "50000"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    kind TEXT NOT NULL,
+    model_id TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    PRIMARY KEY (kind, model_id, content_hash)
+);
+CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries (accessed_at);
+"""
+
+# SQLite's default limit on bound parameters is 999.
+_CHUNK = 500
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 of ``text`` with runs of whitespace collapsed."""
+    return hashlib.sha256(" ".join((text or "").split()).encode("utf-8")).hexdigest()
+
+
+def _chunks(items: list) -> Iterable[list]:
+    for i in range(0, len(items), _CHUNK):
+        yield items[i:i + _CHUNK]
+
+
+class NLPCache:
+    """SQLite-backed ``(kind, model_id, content_hash) -> value`` store."""
+
+    def __init__(self, path: Optional[str] = None, max_age_days: Optional[float] = None):
+        self.path = Path(path or NLP_CACHE_PATH)
+        self.max_age_sec = 86400 * (NLP_CACHE_MAX_AGE_DAYS if max_age_days is None else max_age_days)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(connect_sqlite(self.path)) as conn:
+            conn.executescript(_SCHEMA)
+
+    def get_many(self, kind: str, model_id: str, hashes: Iterable[str]) -> Dict[str, Any]:
+        """Cached values for whichever of ``hashes`` are present and not expired."""
+        hashes = list(dict.fromkeys(hashes))
+        now = time.time()
+        found: Dict[str, Any] = {}
+        with closing(connect_sqlite(self.path)) as conn, conn:
+            for chunk in _chunks(hashes):
+                marks = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT content_hash, value FROM entries WHERE kind = ? AND model_id = ? "
+                    f"AND created_at >= ? AND content_hash IN ({marks})",
+                    [kind, model_id, now - self.max_age_sec, *chunk],
+                ).fetchall()
+                found.update((h, json.loads(v)) for h, v in rows)
+                conn.execute(
+                    f"UPDATE entries SET accessed_at = ? WHERE kind = ? AND model_id = ? "
+                    f"AND content_hash IN ({marks})",
+                    [now, kind, model_id, *chunk],
+                )
+        return found
+
+    def put_many(self, kind: str, model_id: str, values: Dict[str, Any]) -> None:
+        """Store ``{content_hash: value}`` (values must be JSON-serializable)."""
+        if not values:
+            return
+        now = time.time()
+        with closing(connect_sqlite(self.path)) as conn, conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO entries (kind, model_id, content_hash, value, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(kind, model_id, h, json.dumps(v), now, now) for h, v in values.items()],
+            )
+
+    def prune(self, max_entries: int = NLP_CACHE_MAX_ENTRIES) -> int:
+        """Drop expired entries, then the least recently used beyond ``max_entries``."""
+        with closing(connect_sqlite(self.path)) as conn, conn:
+            removed = conn.execute(
+                "DELETE FROM entries WHERE created_at < ?", (time.time() - self.max_age_sec,)
+            ).rowcount
+            removed += conn.execute(
+                "DELETE FROM entries WHERE rowid IN (SELECT rowid FROM entries "
+                "ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (max(0, max_entries),),
+            ).rowcount
+        return removed
+
+    def __len__(self) -> int:
+        with closing(connect_sqlite(self.path)) as conn:
+            return conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
@@ -0,0 +1,190 @@
+"""Shared on-disk cache for raw HTTP responses (e.g. Alpha Vantage).
+
+Entries are content-addressed: the key is the SHA-256 of the endpoint plus its
+normalized parameters (sorted, stringified, API key removed), and each entry
+lives in ``data/cache/http/<key[:2]>/<key>.json``::
+
+    {"endpoint": "...", "params": {...}, "stored_at": "...",
+     "expires_at": "...", "body": ...}
+
+``body`` is the decoded JSON payload (or text for non-JSON sources). Callers
+choose the expiry per endpoint, e.g. daily bars stay valid until the next
+session close (see ``market_calendar.next_session_close``). An expired entry
+is deleted when it is next looked up. Each file's mtime is set to its
+expiry, so ``prune`` (run once per process by ``get_response_cache``) can
+remove every expired entry, then those expiring soonest until the directory
+fits ``RESPONSE_CACHE_MAX_BYTES``, from ``stat()`` alone. Keys such as
+NEWS_SENTIMENT's minute-precision ``time_from``/``time_to`` are rarely
+requested twice, so without this the directory would grow with every run.
+
+Files are replaced atomically (temp file + ``os.replace``), so several
+processes can share the directory: a reader sees either the old or the new
+entry, never a partial one. A corrupt or unreadable entry is treated as a miss.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .storage import write_atomic
+
+logger = logging.getLogger(__name__)
+
+# Root directory of the response cache (override via env if needed).
+RESPONSE_CACHE_DIR = os.getenv("RESPONSE_CACHE_DIR", "data/cache/http")
+# Set RESPONSE_CACHE_ENABLED=0 to always go to the network.
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "1") != "0"
+# Size bound enforced by ``ResponseCache.prune`` (0 = no limit).
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(256 * 1024 ** 2)))
+
+# Parameters that identify the caller, not the resource.
+_IGNORED_PARAMS = ("apikey",)
+
+
+def normalize_params(params: dict) -> Dict[str, str]:
+    """Sorted, stringified copy of ``params`` without credentials."""
+    return {k: str(params[k]) for k in sorted(params) if k not in _IGNORED_PARAMS}
+
+
+def cache_key(endpoint: str, params: dict) -> str:
+    """Content address of a request: SHA-256 of endpoint + normalized params."""
+    blob = json.dumps({"endpoint": endpoint, "params": normalize_params(params)}, sort_keys=True)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class ResponseCache:
+    """Content-addressed response cache under ``root`` with hit/miss counters."""
+
+    def __init__(self, root: Optional[str] = None, enabled: Optional[bool] = None):
+        self.root = Path(root or RESPONSE_CACHE_DIR)
+        self.enabled = RESPONSE_CACHE_ENABLED if enabled is None else enabled
+        self._stats_lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "writes": 0}
+
+    def path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of the counters (``hits``, ``misses``, ``writes``)."""
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    @staticmethod
+    def _read(path: Path) -> Optional[dict]:
+        """The entry at ``path`` if it is readable and not expired, else ``None``."""
+        try:
+            entry = json.loads(path.read_text())
+            if datetime.fromisoformat(entry["expires_at"]) > _utcnow():
+                return entry
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return None
+
+    def get(self, endpoint: str, params: dict) -> Optional[dict]:
+        """Return the fresh entry for a request, or ``None`` (counted as a miss).
+
+        Expired or unreadable entries are deleted on the way.
+        """
+        if not self.enabled:
+            self._count("misses")
+            return None
+        p = self.path(cache_key(endpoint, params))
+        entry = self._read(p)
+        if entry is None and p.exists():
+            self._remove(p)
+        self._count("hits" if entry else "misses")
+        return entry
+
+    def put(self, endpoint: str, params: dict, body: Any, expires_at: datetime) -> None:
+        """Store ``body`` until ``expires_at`` (timezone-aware). Write errors are logged, not raised."""
+        if not self.enabled or expires_at <= _utcnow():
+            return
+        entry = {
+            "endpoint": endpoint,
+            "params": normalize_params(params),
+            "stored_at": _utcnow().isoformat(),
+            "expires_at": expires_at.astimezone(timezone.utc).isoformat(),
+            "body": body,
+        }
+        path = self.path(cache_key(endpoint, params))
+        try:
+            write_atomic(path, json.dumps(entry))
+            # The file's mtime carries the expiry, so ``prune`` needs only stat().
+            expires_ts = expires_at.timestamp()
+            os.utime(path, (expires_ts, expires_ts))
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Could not cache response for {endpoint}: {e}")
+            return
+        self._count("writes")
+
+    def prune(self, max_bytes: int = RESPONSE_CACHE_MAX_BYTES) -> int:
+        """Delete expired entries, then those expiring soonest until the cache fits ``max_bytes``.
+
+        Works from ``stat()`` alone (an entry's mtime is its expiry), so no
+        entry is opened. Returns the number of entries removed.
+        """
+        now = _utcnow().timestamp()
+        removed = 0
+        kept: List[Tuple[float, int, Path]] = []
+        for p in self.root.glob("*/*.json"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            if st.st_mtime <= now:
+                removed += self._remove(p)
+            else:
+                kept.append((st.st_mtime, st.st_size, p))
+        total = sum(size for _, size, _ in kept)
+        if max_bytes > 0 and total > max_bytes:
+            for _, size, p in sorted(kept):
+                if total <= max_bytes:
+                    break
+                removed += self._remove(p)
+                total -= size
+        if removed:
+            logger.info(f"Pruned {removed} response cache entries under {self.root}")
+        return removed
+
+    @staticmethod
+    def _remove(path: Path) -> int:
+        try:
+            path.unlink()
+            return 1
+        except OSError:  # already removed by another process
+            return 0
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Return the process-wide response cache, pruning it on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+            if _cache.enabled:
+                _cache.prune()
+        return _cache
+
+
+def set_response_cache(cache: Optional[ResponseCache]) -> None:
+    """Replace the process-wide cache (``None`` rebuilds it lazily)."""
+    global _cache
+    with _cache_lock:
+        _cache = cache
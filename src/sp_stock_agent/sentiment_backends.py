@@ -0,0 +1,123 @@
+"""Interchangeable sentiment classifiers for scraped news.
+
+Zero-shot classification with ``facebook/bart-large-mnli`` scores every
+summary once per candidate label (three NLI passes through a large model),
+which dominates the news scraper's CPU time. A finance-specific classifier
+such as FinBERT answers in a single forward pass of a much smaller model.
+The backend is picked with ``NEWS_SENTIMENT_BACKEND``:
+
+- ``zero-shot`` (default): ``facebook/bart-large-mnli``, three passes per text;
+- ``finbert``: ``FINBERT_MODEL`` (default ``ProsusAI/finbert``), one pass;
+- ``finbert-int8``: the same model with its linear layers dynamically
+  quantized to int8 by PyTorch, for CPU-only hosts;
+- ``finbert-onnx``: the same model exported to ONNX and run by ONNX Runtime.
+  Needs the optional ``optimum[onnxruntime]`` package.
+
+Every backend is a callable ``backend(texts, batch_size=...)`` returning one
+``{"label": "BULLISH" | "BEARISH" | "NEUTRAL", "score": float}`` per text, so
+callers never see model-specific labels. ``scripts/benchmark_sentiment.py``
+measures per-article latency for each of them.
+"""
+
+import os
+from typing import Callable, Dict, List, Optional
+
+SENTIMENT_LABELS = ["BULLISH", "BEARISH", "NEUTRAL"]
+
+NEWS_SENTIMENT_BACKEND = os.getenv("NEWS_SENTIMENT_BACKEND", "zero-shot")
+ZERO_SHOT_MODEL = os.getenv("ZERO_SHOT_MODEL", "facebook/bart-large-mnli")
+FINBERT_MODEL = os.getenv("FINBERT_MODEL", "ProsusAI/finbert")
+
+# FinBERT's labels mapped onto the scraper's.
+_FINBERT_LABELS = {"positive": "BULLISH", "negative": "BEARISH", "neutral": "NEUTRAL"}
+
+
+class ZeroShotBackend:
+    """NLI zero-shot classification against ``SENTIMENT_LABELS``."""
+
+    def __init__(self, pipe):
+        self._pipe = pipe
+
+    def __call__(self, texts: List[str], batch_size: int = 8) -> List[dict]:
+        outputs = self._pipe(texts, SENTIMENT_LABELS, batch_size=batch_size)
+        if isinstance(outputs, dict):  # single input returns a bare dict
+            outputs = [outputs]
+        return [{"label": o["labels"][0], "score": round(o["scores"][0], 4)} for o in outputs]
+
+
+class TextClassifierBackend:
+    """Sequence classifier answering in one forward pass per text."""
+
+    def __init__(self, pipe, label_map: Optional[Dict[str, str]] = None):
+        self._pipe = pipe
+        self._label_map = label_map or _FINBERT_LABELS
+
+    def __call__(self, texts: List[str], batch_size: int = 8) -> List[dict]:
+        outputs = self._pipe(texts, batch_size=batch_size, truncation=True)
+        if isinstance(outputs, dict):
+            outputs = [outputs]
+        return [
+            {"label": self._label_map.get(str(o["label"]).lower(), "NEUTRAL"), "score": round(o["score"], 4)}
+            for o in outputs
+        ]
+
+
+def _zero_shot():
+    from transformers import pipeline
+    return ZeroShotBackend(pipeline("zero-shot-classification", model=ZERO_SHOT_MODEL))
+
+
+def _finbert():
+    from transformers import pipeline
+    return TextClassifierBackend(pipeline("text-classification", model=FINBERT_MODEL))
+
+
+def _finbert_int8():
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer, pipeline
+
+    model = AutoModelForSequenceClassification.from_pretrained(FINBERT_MODEL)
+    model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    tokenizer = AutoTokenizer.from_pretrained(FINBERT_MODEL)
+    return TextClassifierBackend(pipeline("text-classification", model=model, tokenizer=tokenizer, device="cpu"))
+
+
+def _finbert_onnx():
+    try:
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+    except ImportError as e:
+        raise ImportError(
+            "NEWS_SENTIMENT_BACKEND=finbert-onnx needs ONNX Runtime support: "
+            "pip install 'optimum[onnxruntime]'"
+        ) from e
+    from transformers import AutoTokenizer, pipeline
+
+    model = ORTModelForSequenceClassification.from_pretrained(FINBERT_MODEL, export=True)
+    tokenizer = AutoTokenizer.from_pretrained(FINBERT_MODEL)
+    return TextClassifierBackend(pipeline("text-classification", model=model, tokenizer=tokenizer))
+
+
+BACKENDS: Dict[str, Callable[[], Callable]] = {
+    "zero-shot": _zero_shot,
+    "finbert": _finbert,
+    "finbert-int8": _finbert_int8,
+    "finbert-onnx": _finbert_onnx,
+}
+
+
+def _backend_name(name: Optional[str]) -> str:
+    name = (name or NEWS_SENTIMENT_BACKEND).strip().lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown sentiment backend '{name}' (choose from: {', '.join(BACKENDS)})")
+    return name
+
+
+def load_sentiment_backend(name: Optional[str] = None) -> Callable:
+    """Build the backend ``name`` (default ``NEWS_SENTIMENT_BACKEND``)."""
+    return BACKENDS[_backend_name(name)]()
+
+
+def sentiment_model_id(name: Optional[str] = None) -> str:
+    """Identifier of the backend and weights ``name`` uses, without loading it."""
+    name = _backend_name(name)
+    return f"{name}:{ZERO_SHOT_MODEL if name == 'zero-shot' else FINBERT_MODEL}"
@@ -0,0 +1,37 @@
+"""File and SQLite helpers shared by the on-disk stores and caches.
+
+- ``write_atomic`` writes to a temp file in the target's directory and then
+  ``os.replace``s it over the target, so readers in other processes see
+  either the old or the new file, never a partial one;
+- ``connect_sqlite`` opens a short-lived SQLite connection in WAL mode. One
+  connection per call keeps the stores safe across threads, and WAL lets
+  readers proceed while another process writes.
+"""
+
+import os
+import sqlite3
+import tempfile
+from pathlib import Path
+from typing import Union
+
+
+def write_atomic(path: Union[str, Path], data: Union[str, bytes]) -> None:
+    """Replace ``path`` with ``data`` (bytes are written in binary mode)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb" if isinstance(data, bytes) else "w") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def connect_sqlite(path: Union[str, Path], timeout: float = 30) -> sqlite3.Connection:
+    """Open ``path`` in WAL mode, waiting up to ``timeout`` seconds for locks."""
+    conn = sqlite3.connect(path, timeout=timeout)
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
@@ -1,12 +1,14 @@
+import copy
 import json
 import logging
 import os
 import threading
-import time
-import requests
 from typing import Union, List, Type
 from pydantic import BaseModel, Field
 
+from ..bar_store import BarStore
+from ..indicators import latest_indicators
+from .alpha_vantage_client import get_client
 
 # Import so that the FetchStockSummaryTool can inherit from the base class 
 from crewai.tools import BaseTool
@@ -26,28 +28,110 @@ logging.basicConfig(
 )
 
 # --- Alpha Vantage request pacing --------------------------------------------
-# Alpha Vantage throttles "burst" request patterns even when the per-minute
-# quota is not exceeded. We enforce a minimum spacing between consecutive
-# requests so calls are paced steadily across the whole process instead of
-# fired in a burst. The limiter is shared by every Alpha Vantage tool that
-# imports ``alpha_vantage_throttle`` so all AV traffic respects one pace.
-# Override the spacing with ALPHA_VANTAGE_MIN_INTERVAL_SEC (seconds);
-# 0.9s ~= 66 requests/min, comfortably under the 75/min premium ceiling.
-_AV_MIN_INTERVAL_SEC = float(os.getenv("ALPHA_VANTAGE_MIN_INTERVAL_SEC", "0.9"))
-_av_rate_lock = threading.Lock()
-_av_last_request_ts = 0.0
+# All AV traffic goes through the shared client in ``alpha_vantage_client``:
+# one pooled HTTP session and one token-bucket limiter for the whole process.
 
 
 def alpha_vantage_throttle() -> None:
-    """Block until the minimum spacing has elapsed since the last AV request."""
-    global _av_last_request_ts
-    with _av_rate_lock:
-        now = time.monotonic()
-        wait = _AV_MIN_INTERVAL_SEC - (now - _av_last_request_ts)
-        if wait > 0:
-            logger.debug(f"Throttling Alpha Vantage request for {wait:.2f}s")
-            time.sleep(wait)
-        _av_last_request_ts = time.monotonic()
+    """Block until the shared limiter grants a request slot.
+
+    Only needed by callers that issue their own HTTP requests; everything in
+    this package uses ``get_client()`` which paces automatically.
+    """
+    get_client().bucket.acquire()
+
+
+# --- Per-run market data snapshot --------------------------------------------
+# ``StockAnalysisFlow.check_market_data_freshness`` already fetches the daily
+# summary for every ticker. It hands those results over via
+# ``use_market_data_snapshot`` and ``fetch_single_stock`` serves daily requests
+# from the snapshot for the rest of the run instead of hitting AV again.
+_snapshot_lock = threading.Lock()
+_market_data_snapshot: dict = {}
+
+
+def use_market_data_snapshot(snapshot: dict | None) -> None:
+    """Install ``{symbol: daily summary}`` as this process's run snapshot.
+
+    Passing ``None`` or an empty dict clears it.
+    """
+    global _market_data_snapshot
+    with _snapshot_lock:
+        _market_data_snapshot = {k.upper(): v for k, v in (snapshot or {}).items()}
+    if snapshot:
+        logger.info(f"Serving daily data for {sorted(_market_data_snapshot)} from the run snapshot")
+
+
+def _snapshot_entry(symbol: str) -> dict | None:
+    with _snapshot_lock:
+        entry = _market_data_snapshot.get(symbol.upper())
+    return copy.deepcopy(entry) if entry else None
+
+
+def _update_snapshot_entry(symbol: str, data: dict) -> None:
+    with _snapshot_lock:
+        if symbol.upper() in _market_data_snapshot:
+            _market_data_snapshot[symbol.upper()] = copy.deepcopy(data)
+
+
+# REALTIME_BULK_QUOTES accepts up to 100 comma-separated symbols but is a
+# premium-only endpoint. Once AV says the plan does not include it we stop
+# trying for this process and go straight to per-symbol GLOBAL_QUOTE; any
+# other failure only sends that chunk to GLOBAL_QUOTE.
+_BULK_QUOTE_MAX_SYMBOLS = 100
+_bulk_quotes_unavailable = False
+
+
+def _premium_only(data) -> bool:
+    """True if an AV body says the endpoint is not part of the caller's plan."""
+    if not isinstance(data, dict):
+        return False
+    message = str(data.get("message") or data.get("Information") or "").lower()
+    return "premium endpoint" in message
+
+
+def _quote_result(symbol: str, timestamp: str, o, h, l, c, v) -> dict:
+    """Shape a quote like ``fetch_current_price`` results."""
+    current_price = float(c)
+    return {
+        "symbol": symbol,
+        "timestamp": timestamp,
+        "current_price": current_price,
+        "ohlc": {
+            "open": float(o),
+            "high": float(h),
+            "low": float(l),
+            "close": current_price,
+            "volume": int(float(v)),
+        },
+    }
+
+
+# map user-friendly interval to API function & JSON keys
+_INTERVAL_MAP = {
+    'daily': ('TIME_SERIES_DAILY', 'Time Series (Daily)'),
+    'weekly': ('TIME_SERIES_WEEKLY', 'Weekly Time Series'),
+    'monthly': ('TIME_SERIES_MONTHLY', 'Monthly Time Series')
+}
+
+# A compact payload covers the latest ~100 sessions (~140 calendar days). A
+# store that ended before that cannot be topped up without a gap.
+_COMPACT_SPAN_DAYS = 140
+
+
+def _parse_ohlcv(series_data: dict) -> dict:
+    """Convert an Alpha Vantage time-series block into ``{date: ohlcv}`` rows."""
+    return {
+        date: {
+            "open": float(values["1. open"]),
+            "high": float(values["2. high"]),
+            "low": float(values["3. low"]),
+            "close": float(values["4. close"]),
+            "volume": int(values["5. volume"]),
+        }
+        for date, values in series_data.items()
+    }
+
 
 class StockInput(BaseModel):
     symbol: Union[str, List[str]] = Field(
@@ -59,7 +143,7 @@ class StockInput(BaseModel):
     )
     current: bool = Field(
         False,
-        description="Set to true to fetch only the most recent price (using intraday data). Default is false."
+        description="Set to true to fetch only the most recent price (latest realtime quote). Default is false."
     )
 
 
@@ -69,96 +153,105 @@ class FetchStockSummaryTool(BaseTool):
     description: str = (
         "Fetches stock data for given ticker(s). "
         "Supports daily, weekly, monthly OHLC data (5 periods), returns, and RSI (only on daily). "
+        "Daily results also include SMA/EMA/MACD/ATR/Bollinger indicators. "
         "Set current=True to fetch just the most recent price. "
         "Example: {\"symbol\": \"AAPL\", \"interval\": \"weekly\", \"current\": false}"
     )
     args_schema: Type[StockInput] = StockInput
 
-    def fetch_single_stock(self, symbol: str, api_key: str, interval: str = 'daily') -> dict:
+    def fetch_single_stock(
+        self, symbol: str, api_key: str, interval: str = 'daily', include_rsi: bool = True
+    ) -> dict:
         """
         Fetch data for a single stock symbol, including RSI and returns.
         interval: 'daily', 'weekly', or 'monthly'
+        include_rsi: set to False for a bars-only probe (e.g. the freshness
+        check, which only needs ``last_updated``) to never fall back to the
+        RSI endpoint. Daily RSI is normally computed locally from stored bars.
         """
         logger.info(f"Fetching stock data for symbol: {symbol} at {interval} interval")
 
-        # map user-friendly interval to API function & JSON keys
-        interval_map = {
-            'daily': ('TIME_SERIES_DAILY', 'Time Series (Daily)'),
-            'weekly': ('TIME_SERIES_WEEKLY', 'Weekly Time Series'),
-            'monthly': ('TIME_SERIES_MONTHLY', 'Monthly Time Series')
-        }
-
-        if interval not in interval_map:
+        if interval not in _INTERVAL_MAP:
             raise ValueError(f"Invalid interval '{interval}'. Choose from: daily, weekly, monthly")
 
-        function_name, json_key = interval_map[interval]
-
-        url = "https://www.alphavantage.co/query"
-        params = {
-            "function": function_name,
-            "symbol": symbol,
-            "outputsize": "compact",
-            "apikey": api_key
-        }
+        function_name, json_key = _INTERVAL_MAP[interval]
+
+        if interval == 'daily':
+            cached = _snapshot_entry(symbol)
+            if cached:
+                logger.info(f"Using run snapshot for {symbol} (latest {cached.get('last_updated')})")
+                # Probe entries may lack RSI (too little history for the local
+                # computation); fall back to the endpoint once on first use.
+                if include_rsi and "rsi" not in cached:
+                    rsi = self._fetch_rsi(symbol, api_key)
+                    if rsi:
+                        cached["rsi"] = rsi
+                        _update_snapshot_entry(symbol, cached)
+                return cached
 
         try:
-            alpha_vantage_throttle()
-            response = requests.get(url, params=params)
-            data = response.json()
+            # Serve from the local bar store when it already holds the bar the
+            # market calendar requires; otherwise top it up with the compact
+            # (latest ~100 bars) payload and keep the merged history on disk.
+            store = BarStore()
+            bars = store.load(symbol, interval)
+            if store.is_current(bars):
+                logger.info(f"Using stored {interval} bars for {symbol} (latest {bars['date'][-1]})")
+            else:
+                params = {
+                    "function": function_name,
+                    "symbol": symbol,
+                    "outputsize": "compact",
+                    "apikey": api_key
+                }
+                data = get_client().get_json(params)
 
-            if json_key not in data:
-                error_msg = f"Error fetching data for {symbol}: {data.get('Note') or data.get('Error Message') or data}"
-                logger.error(error_msg)
-                raise ValueError(error_msg)
+                if json_key not in data:
+                    error_msg = f"Error fetching data for {symbol}: {data.get('Note') or data.get('Error Message') or data}"
+                    logger.error(error_msg)
+                    raise ValueError(error_msg)
+
+                bars = store.merge(symbol, interval, _parse_ohlcv(data[json_key]))
 
-            series_data = data[json_key]
-            latest_5_periods = dict(list(series_data.items())[:5])
+            latest_5_periods = store.tail(bars, 5)
 
                 
                 #Formatting the data for the output
             formatted_data = {
                     "symbol": symbol,
-                    "last_updated": list(latest_5_periods.keys())[0] if latest_5_periods else None,   
+                    "last_updated": latest_5_periods[0][0] if latest_5_periods else None,   
                     "daily_data": {},
                     "intraday_returns": {},
                 }
 
-            for date, values in latest_5_periods.items():
-                open_price = float(values["1. open"])
-                close_price = float(values["4. close"])
+            for date, values in latest_5_periods:
+                open_price = values["open"]
+                close_price = values["close"]
                 
                 formatted_data["daily_data"][date] = {
                     "open": open_price,
-                    "high": float(values["2. high"]),
-                    "low": float(values["3. low"]),
+                    "high": values["high"],
+                    "low": values["low"],
                     "close": close_price,
-                    "volume": int(values["5. volume"])
+                    "volume": values["volume"]
                 }
 
                 # Intraday return: (close - open) / open
                 intraday_return = (close_price - open_price) / open_price
                 formatted_data["intraday_returns"][date] = round(intraday_return, 4)
 
-            # Fetch RSI
-            rsi_params = {
-                "function": "RSI",
-                "symbol": symbol,
-                "interval": "daily",
-                "time_period": 14,
-                "series_type": "close",
-                "apikey": api_key
-            }
+            # RSI and the other indicators come from the stored daily closes;
+            # the RSI endpoint is only a fallback when history is too short.
+            if interval == 'daily':
+                indicators = latest_indicators(bars)
+                if indicators.get("rsi_14") is not None:
+                    formatted_data["rsi"] = {indicators["date"]: indicators["rsi_14"]}
+                    formatted_data["indicators"] = indicators
 
-            alpha_vantage_throttle()
-            rsi_resp = requests.get(url, params=rsi_params)
-            rsi_data = rsi_resp.json()
-            rsi_values = rsi_data.get("Technical Analysis: RSI", {})
-            if rsi_values:
-                # Get most recent RSI value
-                recent_date, recent_rsi = next(iter(rsi_values.items()))
-                formatted_data["rsi"] = {recent_date: float(recent_rsi["RSI"])}
-            else:
-                logger.warning(f"No RSI data for {symbol}")
+            if include_rsi and "rsi" not in formatted_data:
+                rsi = self._fetch_rsi(symbol, api_key)
+                if rsi:
+                    formatted_data["rsi"] = rsi
 
             logger.info(f"Successfully fetched data for {symbol}")
             return formatted_data
@@ -168,13 +261,36 @@ class FetchStockSummaryTool(BaseTool):
             return None
         
 
+    def _fetch_rsi(self, symbol: str, api_key: str) -> dict | None:
+        """Fetch the most recent daily RSI(14) as ``{date: value}``."""
+        rsi_params = {
+            "function": "RSI",
+            "symbol": symbol,
+            "interval": "daily",
+            "time_period": 14,
+            "series_type": "close",
+            "apikey": api_key
+        }
+
+        try:
+            rsi_data = get_client().get_json(rsi_params)
+        except Exception as e:
+            logger.warning(f"RSI request failed for {symbol}: {e}")
+            return None
+        rsi_values = rsi_data.get("Technical Analysis: RSI", {})
+        if not rsi_values:
+            logger.warning(f"No RSI data for {symbol}")
+            return None
+        # Get most recent RSI value
+        recent_date, recent_rsi = next(iter(rsi_values.items()))
+        return {recent_date: float(recent_rsi["RSI"])}
+
     def fetch_current_price(self, symbol: str, api_key: str, interval: str = '1min') -> dict:
         """
         Fetch the most recent stock price using intraday data.
         """
         logger.info(f"Fetching current price for {symbol} with {interval} interval")
 
-        url = "https://www.alphavantage.co/query"
         params = {
             "function": "TIME_SERIES_INTRADAY",
             "symbol": symbol,
@@ -184,9 +300,7 @@ class FetchStockSummaryTool(BaseTool):
         }
 
         try:
-            alpha_vantage_throttle()
-            response = requests.get(url, params=params)
-            data = response.json()
+            data = get_client().get_json(params)
 
             time_series_key = f"Time Series ({interval})"
             if time_series_key not in data:
@@ -223,6 +337,90 @@ class FetchStockSummaryTool(BaseTool):
             return None
 
 
+    def fetch_current_prices(self, symbols: List[str], api_key: str) -> dict:
+        """
+        Fetch the latest quote for many symbols with as few requests as possible.
+
+        A single symbol keeps using the latest intraday bar
+        (``fetch_current_price``). Several use REALTIME_BULK_QUOTES (up to 100
+        symbols per request) and fall back to one GLOBAL_QUOTE per symbol for
+        anything the bulk endpoint did not return (or when the plan does not
+        include it).
+        """
+        global _bulk_quotes_unavailable
+        if len(symbols) == 1:
+            res = self.fetch_current_price(symbols[0], api_key)
+            return {symbols[0]: res} if res else {}
+
+        logger.info(f"Fetching current quotes for {len(symbols)} symbols")
+        quotes: dict = {}
+
+        if not _bulk_quotes_unavailable:
+            for i in range(0, len(symbols), _BULK_QUOTE_MAX_SYMBOLS):
+                chunk = symbols[i:i + _BULK_QUOTE_MAX_SYMBOLS]
+                params = {
+                    "function": "REALTIME_BULK_QUOTES",
+                    "symbol": ",".join(chunk),
+                    "apikey": api_key
+                }
+                try:
+                    data = get_client().get_json(params)
+                except Exception as e:
+                    logger.warning(f"Bulk quote request failed, using GLOBAL_QUOTE for this chunk: {e}")
+                    continue
+                rows = data.get("data") if isinstance(data, dict) else None
+                if not rows:
+                    if _premium_only(data):
+                        logger.info(f"Bulk quotes unavailable on this plan, using GLOBAL_QUOTE: {data.get('message') or data.get('Information')}")
+                        _bulk_quotes_unavailable = True
+                        break
+                    logger.warning(f"No bulk quotes returned, using GLOBAL_QUOTE for this chunk: {data}")
+                    continue
+                wanted = {s.upper(): s for s in chunk}
+                for row in rows:
+                    sym = wanted.get(str(row.get("symbol", "")).upper())
+                    if not sym:
+                        continue
+                    try:
+                        quotes[sym] = _quote_result(
+                            sym, row["timestamp"], row["open"], row["high"], row["low"], row["close"], row["volume"]
+                        )
+                    except (KeyError, TypeError, ValueError) as e:
+                        logger.warning(f"Malformed bulk quote for {sym}: {e}")
+
+        missing = [s for s in symbols if s not in quotes]
+        results = get_client().map_concurrent(lambda s: self.fetch_global_quote(s, api_key), missing)
+        for sym, res in zip(missing, results):
+            if res and not isinstance(res, Exception):
+                quotes[sym] = res
+
+        return {s: quotes[s] for s in symbols if s in quotes}
+
+    def fetch_global_quote(self, symbol: str, api_key: str) -> dict:
+        """Fetch the latest quote for one symbol via GLOBAL_QUOTE."""
+        params = {
+            "function": "GLOBAL_QUOTE",
+            "symbol": symbol,
+            "apikey": api_key
+        }
+        try:
+            data = get_client().get_json(params)
+            quote = data.get("Global Quote") or {}
+            if not quote:
+                raise ValueError(data.get('Note') or data.get('Information') or data.get('Error Message') or data)
+            return _quote_result(
+                symbol,
+                quote["07. latest trading day"],
+                quote["02. open"],
+                quote["03. high"],
+                quote["04. low"],
+                quote["05. price"],
+                quote["06. volume"],
+            )
+        except Exception as e:
+            logger.error(f"Error fetching quote for {symbol}: {str(e)}")
+            return None
+
     # We dont know what will be passed if either a list or just a symbol 
     def return_all_stock_data(self, symbols):
         """Fetch and store summarized data for all passed symbols."""
@@ -230,23 +428,19 @@ class FetchStockSummaryTool(BaseTool):
 
         api_key = os.environ['ALPHA_VANTAGE_API_KEY']
         all_stock_data = {}
-        
-        for symbol in symbols:
-            try:
-                # Fetch data for each symbol
-                stock_data = self.fetch_single_stock(symbol, api_key)
-
-                if stock_data:
-                    all_stock_data[symbol] = stock_data
-                    logger.info(f"✓ Fetched data for {symbol}")
-                else:
-                    logger.warning(f"✗ Failed to fetch data for {symbol}")
-                    
-            except Exception as e:
-                logger.error(f"✗ Error fetching {symbol}: {str(e)}")
-
-                # Continue with next symbol instead of failing completely
-                continue
+
+        # Fetch symbols concurrently; the shared client paces the requests.
+        results = get_client().map_concurrent(lambda s: self.fetch_single_stock(s, api_key), symbols)
+
+        for symbol, stock_data in zip(symbols, results):
+            # One symbol failing must not fail the rest
+            if isinstance(stock_data, Exception):
+                logger.error(f"✗ Error fetching {symbol}: {str(stock_data)}")
+            elif stock_data:
+                all_stock_data[symbol] = stock_data
+                logger.info(f"✓ Fetched data for {symbol}")
+            else:
+                logger.warning(f"✗ Failed to fetch data for {symbol}")
         
         logger.info(f"Completed fetching data for {len(all_stock_data)} out of {len(symbols)} symbols")
         return all_stock_data
@@ -264,11 +458,7 @@ class FetchStockSummaryTool(BaseTool):
             symbols = [symbol] if isinstance(symbol, str) else symbol
 
             if current:
-                result = {}
-                for sym in symbols:
-                    res = self.fetch_current_price(sym, api_key)
-                    if res:
-                        result[sym] = res
+                result = self.fetch_current_prices(symbols, api_key)
                 return json.dumps(result, indent=2)
 
             else:
@@ -285,12 +475,17 @@ def validate_daily_data_freshness(
     symbols: List[str],
     required_date,
     api_key: str | None = None,
+    snapshot: dict | None = None,
 ) -> dict:
     """Check that each symbol has a daily OHLC bar on or after ``required_date``.
 
     Returns a dict mapping stale/missing tickers to the latest bar date Alpha
     Vantage returned (``None`` if the fetch failed entirely). An empty dict
     means every symbol passed.
+
+    If ``snapshot`` is given, every successfully fetched daily summary is
+    stored in it keyed by symbol so the caller can reuse the data (see
+    ``use_market_data_snapshot``) instead of fetching it again.
     """
     from datetime import datetime as _dt
 
@@ -305,8 +500,15 @@ def validate_daily_data_freshness(
 
     tool = FetchStockSummaryTool()
     stale: dict = {}
-    for symbol in symbols:
-        data = tool.fetch_single_stock(symbol, api_key)
+    # Bars-only probe: the gate needs ``last_updated``, never the RSI endpoint.
+    results = get_client().map_concurrent(
+        lambda s: tool.fetch_single_stock(s, api_key, include_rsi=False), symbols
+    )
+    for symbol, data in zip(symbols, results):
+        if isinstance(data, Exception):
+            data = None
+        if data and snapshot is not None:
+            snapshot[symbol] = data
         latest = (data or {}).get("last_updated")
         if not latest:
             stale[symbol] = None
@@ -317,6 +519,69 @@ def validate_daily_data_freshness(
     return stale
 
 
+def backfill_symbol(symbol: str, api_key: str, interval: str = 'daily', force_full: bool = False) -> str:
+    """Bring the stored bars for ``symbol`` up to date, fetching full history once.
+
+    The first backfill of a symbol (or ``force_full``) requests
+    ``outputsize=full``; afterwards only the ``compact`` tail is requested,
+    and nothing at all while the store is current. Returns ``"full"``,
+    ``"compact"`` or ``"current"``; raises on API errors.
+    """
+    from datetime import date as _date, timedelta as _timedelta
+
+    if interval not in _INTERVAL_MAP:
+        raise ValueError(f"Invalid interval '{interval}'. Choose from: daily, weekly, monthly")
+    function_name, json_key = _INTERVAL_MAP[interval]
+
+    store = BarStore()
+    bars = store.load(symbol, interval)
+    full = force_full or not bars.get("full_history")
+    if not full:
+        if store.is_current(bars):
+            return "current"
+        latest = _date.fromisoformat(bars["date"][-1])
+        full = latest < _date.today() - _timedelta(days=_COMPACT_SPAN_DAYS)
+
+    outputsize = "full" if full else "compact"
+    data = get_client().get_json({
+        "function": function_name,
+        "symbol": symbol,
+        "outputsize": outputsize,
+        "apikey": api_key,
+    })
+    if json_key not in data:
+        raise ValueError(data.get('Note') or data.get('Information') or data.get('Error Message') or data)
+    merged = store.merge(symbol, interval, _parse_ohlcv(data[json_key]), full=full)
+    logger.info(f"Backfilled {symbol} {interval} ({outputsize}): {len(merged['date'])} bars through {merged['date'][-1]}")
+    return outputsize
+
+
+def backfill_bars(
+    symbols: List[str],
+    api_key: str | None = None,
+    interval: str = 'daily',
+    force_full: bool = False,
+) -> dict:
+    """Run ``backfill_symbol`` for every symbol concurrently within the rate budget.
+
+    Returns ``{symbol: "full" | "compact" | "current" | "error: ..."}``.
+    """
+    api_key = api_key or os.environ.get("ALPHA_VANTAGE_API_KEY")
+    if not api_key:
+        raise ValueError("ALPHA_VANTAGE_API_KEY is not set.")
+
+    results = get_client().map_concurrent(
+        lambda s: backfill_symbol(s, api_key, interval, force_full), symbols
+    )
+    outcome = {}
+    for symbol, result in zip(symbols, results):
+        if isinstance(result, Exception):
+            logger.error(f"Backfill failed for {symbol}: {result}")
+            result = f"error: {result}"
+        outcome[symbol] = result
+    return outcome
+
+
 #Test it locally in the file
 if __name__ == "__main__":
     data = FetchStockSummaryTool().return_all_stock_data() # Empty input for no-arg function
@@ -0,0 +1,464 @@
+"""
+Shared Alpha Vantage HTTP client.
+
+Every Alpha Vantage tool sends its requests through one process-wide
+``AlphaVantageClient`` (see ``get_client``). The client owns:
+
+- a ``requests.Session`` with a pooled HTTP adapter, so connections to
+  ``www.alphavantage.co`` are reused instead of re-opened per call;
+- a ``TokenBucket`` rate limiter shared by all callers (sync or async), so
+  the whole process respects a single quota;
+- asyncio entry points (``aget_json`` / ``map_concurrent``) that let a batch
+  of symbols overlap network latency with pacing instead of serialising both;
+- a single-flight layer: identical requests (same parameters, ignoring the
+  API key) that are in flight at the same time share one network call, and a
+  completed result is memoised for a short TTL, so agents re-asking for the
+  same symbol within seconds do not burn quota;
+- throttle handling: AV answers rate-limit violations with HTTP 200 and a
+  ``Note``/``Information`` message. The client classifies those payloads,
+  slows the *shared* bucket (so every caller backs off, not just the one that
+  was told off) and retries with exponential backoff until a deadline.
+  Daily-quota exhaustion is not retried; it raises ``AlphaVantageQuotaExceeded``
+  immediately since waiting minutes will not help;
+- an on-disk response cache (``response_cache.ResponseCache``) below the
+  memo, so a crashed or repeated run re-reads payloads instead of spending
+  quota again. Lifetimes are per function (``cache_expiry``): daily series
+  stay valid until the next session close, quotes for a minute, and so on.
+
+Rate configuration (environment):
+
+- ``ALPHA_VANTAGE_PLAN``: one of ``AV_PLANS`` (e.g. ``free``, ``premium-75``).
+- ``ALPHA_VANTAGE_RATE_PER_MIN`` / ``ALPHA_VANTAGE_BURST``: explicit overrides.
+- ``ALPHA_VANTAGE_MIN_INTERVAL_SEC``: legacy spacing knob; ``0.9`` means
+  ~66 requests/min with no burst, which is also the default.
+- ``ALPHA_VANTAGE_MAX_CONCURRENCY``: in-flight requests / pooled connections.
+- ``ALPHA_VANTAGE_MEMO_TTL_SEC``: how long completed responses are reused
+  (default 30 seconds; ``0`` disables the memo, coalescing still applies).
+- ``ALPHA_VANTAGE_RETRY_DEADLINE_SEC``: total time a request may spend
+  retrying throttled/transient failures (default 90; ``0`` disables retries).
+- ``ALPHA_VANTAGE_RETRY_BACKOFF_SEC``: first backoff delay, doubled per
+  attempt up to 30 seconds (default 2).
+"""
+
+import asyncio
+import concurrent.futures
+import copy
+import logging
+import os
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ..market_calendar import next_session_close, required_market_data_date
+from ..response_cache import ResponseCache, get_response_cache
+
+logger = logging.getLogger(__name__)
+
+AV_URL = "https://www.alphavantage.co/query"
+
+# Alpha Vantage plans: (sustained requests per minute, burst size). AV
+# throttles bursty traffic even under the per-minute quota, so bursts stay small.
+AV_PLANS = {
+    "free": (5, 1),
+    "premium-75": (75, 3),
+    "premium-150": (150, 5),
+    "premium-300": (300, 10),
+    "premium-600": (600, 20),
+    "premium-1200": (1200, 40),
+}
+
+_DEFAULT_MIN_INTERVAL_SEC = 0.9  # ~66 requests/min, under the 75/min premium ceiling
+_DEFAULT_TIMEOUT_SEC = 30
+_DEFAULT_MEMO_TTL_SEC = 30.0
+_DEFAULT_RETRY_DEADLINE_SEC = 90.0
+_DEFAULT_RETRY_BACKOFF_SEC = 2.0
+_MAX_BACKOFF_SEC = 30.0
+
+# HTTP statuses worth retrying: explicit throttling and transient server errors.
+_RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# Substrings of AV's Note/Information messages, checked in this order.
+# Frequency/burst messages mean "slow down and try again" (the classic free
+# tier note also quotes the daily limit, hence it is checked first); otherwise
+# a per-day limit means the quota is gone for today. Premium keys get a
+# per-minute notice that names no limit at all, only the sales address.
+_BURST_MARKERS = ("call frequency", "per second", "spreading out", "burst")
+_QUOTA_MARKERS = ("per day", "daily limit")
+_THROTTLE_MARKERS = ("per minute", "rate limit", "higher api call volume", "premium@alphavantage.co")
+
+# Response-cache lifetimes (seconds) per AV function. Functions in
+# ``_SESSION_FUNCTIONS`` are cached until the next session close instead,
+# once their payload covers the session the market calendar requires.
+_CACHE_TTL_SEC = {
+    "GLOBAL_QUOTE": 60,
+    "REALTIME_BULK_QUOTES": 60,
+    "TIME_SERIES_INTRADAY": 60,
+    "NEWS_SENTIMENT": 15 * 60,
+    "EARNINGS_CALL_TRANSCRIPT": 30 * 24 * 3600,
+}
+_DEFAULT_CACHE_TTL_SEC = 5 * 60
+_SESSION_FUNCTIONS = {
+    "TIME_SERIES_DAILY",
+    "TIME_SERIES_DAILY_ADJUSTED",
+    "TIME_SERIES_WEEKLY",
+    "TIME_SERIES_MONTHLY",
+    "RSI",
+    "SMA",
+    "EMA",
+    "MACD",
+    "ATR",
+    "BBANDS",
+}
+
+
+class AlphaVantageError(Exception):
+    """Base class for errors raised by ``AlphaVantageClient``."""
+
+
+class AlphaVantageThrottled(AlphaVantageError):
+    """AV kept throttling the request until the retry deadline passed."""
+
+
+class AlphaVantageQuotaExceeded(AlphaVantageError):
+    """The API key's daily request quota is used up."""
+
+
+class TokenBucket:
+    """Thread-safe token bucket with FIFO reservations.
+
+    Each caller reserves one token and is told how long to wait for it, so the
+    lock is never held while sleeping and callers are served in arrival order.
+    Works for threads (``acquire``) and coroutines (``acquire_async``).
+    """
+
+    def __init__(self, rate_per_sec: float, burst: int = 1):
+        if rate_per_sec <= 0:
+            raise ValueError("rate_per_sec must be positive")
+        self.rate = float(rate_per_sec)
+        self.capacity = max(1, int(burst))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token and return how many seconds to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1.0
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def penalize(self, seconds: float) -> None:
+        """Hold back every caller for at least ``seconds`` from now.
+
+        Used after AV reports throttling. Repeated penalties do not stack:
+        the bucket only ensures the next token is ``seconds`` away.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens = min(self._tokens, -seconds * self.rate + 1.0)
+
+    def acquire(self) -> None:
+        wait = self.reserve()
+        if wait > 0:
+            logger.debug(f"Throttling Alpha Vantage request for {wait:.2f}s")
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        wait = self.reserve()
+        if wait > 0:
+            logger.debug(f"Throttling Alpha Vantage request for {wait:.2f}s")
+            await asyncio.sleep(wait)
+
+
+def bucket_from_env() -> TokenBucket:
+    """Build the rate limiter from the environment (see module docstring)."""
+    rate_per_min: Optional[float] = None
+    burst = 1
+    plan = os.getenv("ALPHA_VANTAGE_PLAN")
+    if plan:
+        if plan not in AV_PLANS:
+            raise ValueError(f"Unknown ALPHA_VANTAGE_PLAN '{plan}'. Choose from: {', '.join(AV_PLANS)}")
+        rate_per_min, burst = AV_PLANS[plan]
+    if os.getenv("ALPHA_VANTAGE_MIN_INTERVAL_SEC"):
+        rate_per_min = 60.0 / float(os.environ["ALPHA_VANTAGE_MIN_INTERVAL_SEC"])
+    if os.getenv("ALPHA_VANTAGE_RATE_PER_MIN"):
+        rate_per_min = float(os.environ["ALPHA_VANTAGE_RATE_PER_MIN"])
+    if os.getenv("ALPHA_VANTAGE_BURST"):
+        burst = int(os.environ["ALPHA_VANTAGE_BURST"])
+    if rate_per_min is None:
+        rate_per_min = 60.0 / _DEFAULT_MIN_INTERVAL_SEC
+    return TokenBucket(rate_per_min / 60.0, burst)
+
+
+def _is_error_payload(data: Any) -> bool:
+    """AV reports errors and throttling with HTTP 200 and one of these keys."""
+    return isinstance(data, dict) and any(k in data for k in ("Note", "Information", "Error Message"))
+
+
+def classify_payload(data: Any) -> Optional[str]:
+    """Return ``"quota"``, ``"throttle"`` or ``None`` for an AV JSON body.
+
+    Only ``Note``/``Information`` messages about request limits are
+    classified; other messages (premium-only endpoints, bad symbols) are left
+    for the caller to interpret.
+    """
+    if not isinstance(data, dict):
+        return None
+    message = str(data.get("Note") or data.get("Information") or "").lower()
+    if not message:
+        return None
+    if any(m in message for m in _BURST_MARKERS):
+        return "throttle"
+    if any(m in message for m in _QUOTA_MARKERS):
+        return "quota"
+    if any(m in message for m in _THROTTLE_MARKERS):
+        return "throttle"
+    return None
+
+
+def _last_refreshed(data: Any) -> Optional[str]:
+    """``YYYY-MM-DD`` of a series payload's "Last Refreshed" metadata, if any."""
+    meta = data.get("Meta Data") if isinstance(data, dict) else None
+    for key, value in (meta or {}).items():
+        if "Last Refreshed" in key:
+            return str(value)[:10]
+    return None
+
+
+def cache_expiry(params: dict, data: Any) -> Optional[datetime]:
+    """When a successful response for ``params`` stops being reusable.
+
+    ``None`` means "do not cache": full-history payloads are large and go
+    straight into the bar store, so keeping a second copy would only waste disk.
+    """
+    now = datetime.now(timezone.utc)
+    function = params.get("function")
+    if params.get("outputsize") == "full":
+        return None
+    if function in _SESSION_FUNCTIONS and params.get("interval", "daily") in ("daily", "weekly", "monthly"):
+        refreshed = _last_refreshed(data)
+        if refreshed and refreshed >= required_market_data_date().isoformat():
+            return next_session_close()
+        # The required session is not in the payload yet; look again soon.
+        return now + timedelta(seconds=_DEFAULT_CACHE_TTL_SEC)
+    return now + timedelta(seconds=_CACHE_TTL_SEC.get(function, _DEFAULT_CACHE_TTL_SEC))
+
+
+def request_key(params: dict) -> Tuple:
+    """Identity of a request for coalescing: every parameter except the API key."""
+    return tuple(sorted((k, str(v)) for k, v in params.items() if k != "apikey"))
+
+
+def run_sync(coro):
+    """Run ``coro`` to completion from synchronous code.
+
+    Uses ``asyncio.run`` normally; if this thread already runs an event loop
+    (e.g. a tool invoked from inside a flow), the coroutine gets its own loop
+    on a helper thread instead.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coro).result()
+
+
+class AlphaVantageClient:
+    """Pooled, rate-limited Alpha Vantage client shared by all AV tools."""
+
+    def __init__(
+        self,
+        bucket: Optional[TokenBucket] = None,
+        max_concurrency: Optional[int] = None,
+        timeout: float = _DEFAULT_TIMEOUT_SEC,
+        memo_ttl: Optional[float] = None,
+        retry_deadline: Optional[float] = None,
+        retry_backoff: Optional[float] = None,
+        cache: Optional[ResponseCache] = None,
+    ):
+        self.bucket = bucket or bucket_from_env()
+        self.cache = cache or get_response_cache()
+        if memo_ttl is None:
+            memo_ttl = float(os.getenv("ALPHA_VANTAGE_MEMO_TTL_SEC", _DEFAULT_MEMO_TTL_SEC))
+        self.memo_ttl = memo_ttl
+        if retry_deadline is None:
+            retry_deadline = float(os.getenv("ALPHA_VANTAGE_RETRY_DEADLINE_SEC", _DEFAULT_RETRY_DEADLINE_SEC))
+        if retry_backoff is None:
+            retry_backoff = float(os.getenv("ALPHA_VANTAGE_RETRY_BACKOFF_SEC", _DEFAULT_RETRY_BACKOFF_SEC))
+        self.retry_deadline = retry_deadline
+        self.retry_backoff = retry_backoff
+        self._inflight: Dict[Tuple, concurrent.futures.Future] = {}
+        self._memo: Dict[Tuple, Tuple[float, Any]] = {}
+        self._flight_lock = threading.Lock()
+        self.max_concurrency = max_concurrency or int(os.getenv("ALPHA_VANTAGE_MAX_CONCURRENCY", "8"))
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrency)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(self, params: dict) -> requests.Response:
+        """Rate-limited GET against the query endpoint (raises on HTTP errors)."""
+        self.bucket.acquire()
+        return self._send(params)
+
+    def get_json(self, params: dict) -> Any:
+        """Rate-limited, coalesced GET returning the decoded JSON body.
+
+        Callers get their own deep copy, so mutating a result never affects
+        other callers sharing the same response.
+        """
+        key = request_key(params)
+        with self._flight_lock:
+            memo = self._memo.get(key)
+            if memo and memo[0] > time.monotonic():
+                logger.debug(f"Memoised Alpha Vantage response for {dict(key)}")
+                return copy.deepcopy(memo[1])
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = concurrent.futures.Future()
+                self._inflight[key] = future
+
+        if not leader:
+            logger.debug(f"Joining in-flight Alpha Vantage request for {dict(key)}")
+            return copy.deepcopy(future.result())
+
+        try:
+            data = self._fetch_through_cache(params)
+        except BaseException as e:
+            with self._flight_lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+        with self._flight_lock:
+            self._inflight.pop(key, None)
+            # Never memoise AV's in-band error / throttle payloads.
+            if self.memo_ttl > 0 and not _is_error_payload(data):
+                self._memo[key] = (time.monotonic() + self.memo_ttl, data)
+                self._prune_memo()
+        future.set_result(data)
+        return copy.deepcopy(data)
+
+    def _fetch_through_cache(self, params: dict) -> Any:
+        """Serve ``params`` from the response cache, or fetch and store it."""
+        entry = self.cache.get(AV_URL, params)
+        if entry:
+            logger.debug(f"Response cache hit for {params.get('function')} {params.get('symbol', '')}")
+            return entry["body"]
+
+        data = self._get_json_with_retry(params)
+        expires = cache_expiry(params, data)
+        if expires and not _is_error_payload(data):
+            self.cache.put(AV_URL, params, data, expires)
+        return data
+
+    def _get_json_with_retry(self, params: dict) -> Any:
+        """Fetch ``params``, retrying throttled/transient failures until the deadline."""
+        function = params.get("function")
+        deadline = time.monotonic() + self.retry_deadline
+        attempt = 0
+        while True:
+            error: Optional[Exception] = None
+            try:
+                data = self.get(params).json()
+            except requests.HTTPError as e:
+                status = e.response.status_code if e.response is not None else None
+                if status not in _RETRYABLE_STATUS:
+                    raise
+                error = e
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            else:
+                kind = classify_payload(data)
+                if kind is None:
+                    return data
+                message = data.get("Note") or data.get("Information")
+                if kind == "quota":
+                    logger.error(f"Alpha Vantage daily quota exhausted ({function}): {message}")
+                    raise AlphaVantageQuotaExceeded(message)
+                error = AlphaVantageThrottled(message)
+
+            delay = min(self.retry_backoff * (2 ** attempt), _MAX_BACKOFF_SEC)
+            delay *= 1 + random.random() * 0.25
+            attempt += 1
+            if time.monotonic() + delay > deadline:
+                logger.error(f"Giving up on Alpha Vantage {function} after {attempt} attempt(s): {error}")
+                raise error
+            logger.warning(f"Alpha Vantage {function} throttled/failed ({error}); retrying in {delay:.1f}s")
+            # Slow the shared bucket so concurrent callers back off too; the
+            # retry itself waits for its token like everyone else.
+            self.bucket.penalize(delay)
+
+    def _prune_memo(self) -> None:
+        """Drop expired memo entries (called with ``_flight_lock`` held)."""
+        now = time.monotonic()
+        for key in [k for k, (expires, _) in self._memo.items() if expires <= now]:
+            del self._memo[key]
+
+    async def aget_json(self, params: dict) -> Any:
+        """Async variant of ``get_json`` (paces and blocks in a worker thread)."""
+        return await asyncio.to_thread(self.get_json, params)
+
+    def _send(self, params: dict) -> requests.Response:
+        response = self.session.get(AV_URL, params=params, timeout=self.timeout)
+        try:
+            response.raise_for_status()
+        except requests.HTTPError as e:
+            logger.error(f"Alpha Vantage HTTP error for {params.get('function')}: {e} — {response.text}")
+            raise
+        return response
+
+    def map_concurrent(self, func: Callable[[Any], Any], items: Iterable[Any]) -> List[Any]:
+        """Run blocking ``func(item)`` for every item concurrently, in order.
+
+        ``func`` is expected to make its requests through this client, so the
+        shared bucket still paces them; up to ``max_concurrency`` calls are in
+        flight at once. Exceptions are returned in place of results.
+        """
+        items = list(items)
+
+        async def _run_all():
+            sem = asyncio.Semaphore(self.max_concurrency)
+
+            async def _one(item):
+                async with sem:
+                    return await asyncio.to_thread(func, item)
+
+            return await asyncio.gather(*(_one(i) for i in items), return_exceptions=True)
+
+        if not items:
+            return []
+        return run_sync(_run_all())
+
+
+_client: Optional[AlphaVantageClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> AlphaVantageClient:
+    """Return the process-wide client, creating it from the environment."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = AlphaVantageClient()
+        return _client
+
+
+def set_client(client: Optional[AlphaVantageClient]) -> None:
+    """Replace the process-wide client (``None`` rebuilds it lazily)."""
+    global _client
+    with _client_lock:
+        _client = client
@@ -9,6 +9,8 @@ from pydantic import BaseModel, Field
 
 from crewai.tools import BaseTool
 
+from .alpha_vantage_client import get_client
+
 # ------------------------------------------------------------
 # 1) Logger setup: dedicated file for earnings transcripts
 # ------------------------------------------------------------
@@ -83,14 +85,12 @@ class EarningsCallTranscriptTool(BaseTool):
         }
 
         logger.info(f"Requesting EARNINGS_CALL_TRANSCRIPT with params: {params}")
-        response = requests.get("https://www.alphavantage.co/query", params=params)
         try:
-            response.raise_for_status()
+            data = get_client().get_json(params)
         except requests.HTTPError as e:
-            logger.error(f"Alpha Vantage HTTP error: {e} — {response.text}")
+            logger.error(f"Alpha Vantage HTTP error: {e}")
             raise
 
-        data = response.json()
         logger.info("Received earnings call transcript response")
         return data
 
@@ -2,6 +2,7 @@ import os
 import json
 import logging
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 
 from typing import Union, List, Optional, Type
@@ -11,8 +12,10 @@ from pydantic import BaseModel, Field
 # Import so that our tool can inherit from the Crew AI base class
 from crewai.tools import BaseTool
 
-# Shared Alpha Vantage request pacing (single limiter across all AV tools).
-from .alpha_vantage_api_tool import alpha_vantage_throttle
+# Shared Alpha Vantage client (pooled session + single limiter across all AV tools).
+from .alpha_vantage_client import get_client
+from ..news_store import NewsStore, article_key
+from ..news_sentiment import aggregate_ticker_sentiment, parse_time
 
 # Ensure logs directory exists BEFORE configuring logging
 os.makedirs('logs', exist_ok=True)
@@ -41,6 +44,107 @@ ch.setLevel(logging.INFO)
 ch.setFormatter(fh_formatter)
 logger.addHandler(ch)
 
+# Digest mode (see ``build_news_digest``): rough prompt budget for the whole
+# digest and how much of each article summary to keep.
+NEWS_DIGEST_TOKEN_BUDGET = int(os.getenv("NEWS_DIGEST_TOKEN_BUDGET", "1500"))
+NEWS_DIGEST_SUMMARY_CHARS = int(os.getenv("NEWS_DIGEST_SUMMARY_CHARS", "160"))
+
+
+def _estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English text)."""
+    return (len(text) + 3) // 4
+
+
+def _ticker_entry(article: dict, ticker: str) -> Optional[dict]:
+    for entry in article.get("ticker_sentiment", []) or []:
+        if entry.get("ticker", "").upper() == ticker.upper():
+            return entry
+    return None
+
+
+def _as_float(value, default: float = 0.0) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _digest_row(article: dict, entry: dict, summary_chars: int) -> str:
+    text = (article.get("summary") or "").replace("\n", " ").replace("|", "/").strip()
+    if len(text) > summary_chars:
+        text = text[: summary_chars - 1].rstrip() + "…"
+    title = (article.get("title") or "").replace("|", "/").strip()
+    return (
+        f"| {article.get('time_published', '')[:13]} "
+        f"| {article.get('source') or article.get('provider') or ''} "
+        f"| {_as_float(entry.get('relevance_score')):.2f} "
+        f"| {_as_float(entry.get('ticker_sentiment_score')):+.2f} {entry.get('ticker_sentiment_label', '')} "
+        f"| {title}: {text} |"
+    )
+
+
+def build_news_digest(
+    result: dict,
+    tickers: List[str],
+    token_budget: int = NEWS_DIGEST_TOKEN_BUDGET,
+    summary_chars: int = NEWS_DIGEST_SUMMARY_CHARS,
+) -> str:
+    """Compact per-ticker markdown digest of a merged news result.
+
+    Articles are deduplicated (the merged feed already is), ranked per ticker
+    by that ticker's ``relevance_score``, and their summaries truncated to
+    ``summary_chars``. Rows are added round-robin across tickers (each
+    ticker's best article first) until ``token_budget`` is reached, so one
+    noisy ticker cannot crowd out the others.
+    """
+    ranked = {}
+    for ticker in tickers:
+        rows = []
+        for article in result.get("feed", []):
+            entry = _ticker_entry(article, ticker)
+            if entry is not None:
+                rows.append((article, entry))
+        rows.sort(key=lambda r: (_as_float(r[1].get("relevance_score")), r[0].get("time_published", "")), reverse=True)
+        ranked[ticker] = rows
+
+    header = "| published | source | relevance | sentiment | headline: summary |\n|---|---|---|---|---|"
+    used = _estimate_tokens(header) * len(tickers)
+    chosen = {t: [] for t in tickers}
+    omitted = sum(len(r) for r in ranked.values())
+    depth = 0
+    budget_left = True
+    while budget_left and any(depth < len(r) for r in ranked.values()):
+        for ticker in tickers:
+            if depth >= len(ranked[ticker]):
+                continue
+            row = _digest_row(*ranked[ticker][depth], summary_chars)
+            cost = _estimate_tokens(row)
+            if used + cost > token_budget:
+                budget_left = False
+                break
+            chosen[ticker].append(row)
+            used += cost
+            omitted -= 1
+        depth += 1
+
+    parts = []
+    sentiment = result.get("sentiment") or {}
+    for ticker in tickers:
+        parts.append(f"### {ticker} ({len(ranked[ticker])} articles)")
+        agg = sentiment.get(ticker.upper()) or {}
+        if agg.get("mean") is not None:
+            parts.append(
+                f"Sentiment: mean {agg['mean']:+.3f} ({agg['label']}), std {agg['std']:.3f}, "
+                f"time-decayed {agg['decayed']:+.3f}"
+            )
+        parts.append("\n".join([header] + chosen[ticker]) if chosen[ticker] else "No articles in window.")
+    if omitted:
+        parts.append(f"_{omitted} lower-relevance articles omitted to fit the token budget._")
+    for ticker, error in (result.get("errors") or {}).items():
+        parts.append(f"_Error fetching {ticker}: {error}_")
+    return "\n\n".join(parts)
+
+
 class NewsSentimentInput(BaseModel):
     tickers: Union[str, List[str]] = Field(
         ...,
@@ -68,6 +172,17 @@ class NewsSentimentInput(BaseModel):
         50,
         description="Max number of results to return (up to 200)"
     )
+    # Agents get the compact digest by default; Python callers of ``_run``
+    # keep the raw merged dict unless they ask for the digest.
+    digest: bool = Field(
+        True,
+        description="Return a compact per-ticker table ranked by relevance (default) "
+                    "instead of the raw JSON feed."
+    )
+    token_budget: Optional[int] = Field(
+        None,
+        description="Approximate token budget for the digest (default 1500)."
+    )
 
 class NewsSentimentTool(BaseTool):
     """
@@ -77,7 +192,8 @@ class NewsSentimentTool(BaseTool):
     name: str = "alpha_vantage_news_sentiment"
     description: str = (
         "Query Alpha Vantage's NEWS_SENTIMENT endpoint for market news "
-        "and sentiment data on specified tickers and topics."
+        "and sentiment data on specified tickers and topics. "
+        "Returns a compact per-ticker digest ranked by relevance unless digest=false."
     )
     args_schema: Type[NewsSentimentInput] = NewsSentimentInput
 
@@ -106,15 +222,64 @@ class NewsSentimentTool(BaseTool):
 
         logger.info(f"Requesting NEWS_SENTIMENT for {ticker} with params: {params}")
 
-        alpha_vantage_throttle()
-        response = requests.get("https://www.alphavantage.co/query", params=params)
         try:
-            response.raise_for_status()
+            return get_client().get_json(params)
         except requests.HTTPError as e:
-            logger.error(f"Alpha Vantage HTTP error for {ticker}: {e} — response text: {response.text}")
+            logger.error(f"Alpha Vantage HTTP error for {ticker}: {e}")
             raise
 
-        return response.json()
+    def _ticker_feed(
+        self,
+        ticker: str,
+        api_key: str,
+        topics_param: Optional[str],
+        time_from: str,
+        time_to: str,
+        sort: str,
+        limit: int,
+    ) -> dict:
+        """News for one ticker, fetching only the part of the window not yet stored.
+
+        If the article store already covers ``time_from`` for this ticker,
+        only ``[covered_to, time_to]`` is requested from AV and the older
+        articles come from the store. Topic-filtered and RELEVANCE-sorted
+        queries bypass the store's coverage (their feeds are not complete),
+        as do windows not given as ``YYYYMMDDTHHMM``, which are passed to AV
+        unchanged.
+        """
+        canonical = None not in (parse_time(time_from), parse_time(time_to))
+        if topics_param or sort not in ("LATEST", "EARLIEST") or not canonical:
+            return self._fetch_single_ticker(ticker, api_key, topics_param, time_from, time_to, sort, limit)
+
+        store = NewsStore()
+        fetch_from = time_from
+        coverage = store.coverage(ticker)
+        if coverage and coverage[0] <= time_from[:13] <= coverage[1]:
+            fetch_from = max(time_from, coverage[1])
+
+        fetched: List[dict] = []
+        data = None
+        if fetch_from[:13] < time_to[:13]:
+            data = self._fetch_single_ticker(ticker, api_key, None, fetch_from, time_to, sort, limit)
+            if not isinstance(data, dict) or "feed" not in data:
+                return data  # AV error/throttle payload; leave coverage untouched
+            fetched = data["feed"]
+            store.record(ticker, fetched, fetch_from, time_to, sort=sort, truncated=len(fetched) >= limit)
+            if fetch_from == time_from:
+                return data
+        # The window may end inside the covered span, so stop at ``time_to``.
+        stored_to = min(fetch_from[:13], time_to[:13])
+        logger.info(f"Serving {ticker} news from {time_from} to {stored_to} from the local article store")
+
+        fetched_keys = {article_key(a) for a in fetched}
+        older = [
+            a for a in store.articles(ticker, time_from, stored_to, sort, limit)
+            if article_key(a) not in fetched_keys
+        ]
+        feed = sorted(fetched + older, key=lambda a: a.get("time_published", ""), reverse=(sort == "LATEST"))[:limit]
+        result = dict(data) if data else {}
+        result.update({"items": str(len(feed)), "feed": feed})
+        return result
 
     def _run(
         self,
@@ -123,8 +288,10 @@ class NewsSentimentTool(BaseTool):
         time_from: Optional[str] = None,
         time_to: Optional[str] = None,
         sort: str = "LATEST",
-        limit: int = 50
-    ) -> dict:
+        limit: int = 50,
+        digest: bool = False,
+        token_budget: Optional[int] = None,
+    ) -> Union[dict, str]:
         # 1) Load API key
         api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
         if not api_key:
@@ -149,31 +316,48 @@ class NewsSentimentTool(BaseTool):
             ",".join(topics) if isinstance(topics, (list, tuple)) else topics
         )
 
-        # 4) Fetch each ticker independently and merge feeds (dedup by URL).
-        merged_feed: List[dict] = []
-        seen_urls = set()
-        per_ticker: dict = {}
+        # 4) Fetch every ticker concurrently (the shared client's limiter still
+        # paces the requests; see ``_ticker_feed`` for the local article store)
+        # and merge feeds as responses arrive. Each article is keyed by
+        # (ticker position, feed position) so the merged feed and the URL
+        # dedup winner are the same as a sequential fetch would give.
+        merged: dict = {}
+        seen_urls: dict = {}
+        responses: dict = {}
         errors: dict = {}
 
-        for ticker in ticker_list:
-            try:
-                data = self._fetch_single_ticker(
-                    ticker, api_key, topics_param, time_from, time_to, sort, limit
-                )
-            except Exception as e:  # one ticker failing must not kill the rest
-                logger.error(f"Failed to fetch news for {ticker}: {e}")
-                errors[ticker] = str(e)
-                continue
-
-            feed = data.get("feed", []) if isinstance(data, dict) else []
-            per_ticker[ticker] = data
-            for article in feed:
-                url = article.get("url")
-                if url and url in seen_urls:
+        workers = max(1, min(len(ticker_list), get_client().max_concurrency))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(
+                    self._ticker_feed,
+                    ticker, api_key, topics_param, time_from, time_to, sort, limit,
+                ): (index, ticker)
+                for index, ticker in enumerate(ticker_list)
+            }
+            for future in as_completed(futures):
+                index, ticker = futures[future]
+                try:
+                    data = future.result()
+                except Exception as e:  # one ticker failing must not kill the rest
+                    logger.error(f"Failed to fetch news for {ticker}: {e}")
+                    errors[ticker] = str(e)
                     continue
-                if url:
-                    seen_urls.add(url)
-                merged_feed.append(article)
+
+                responses[ticker] = data
+                feed = data.get("feed", []) if isinstance(data, dict) else []
+                for position, article in enumerate(feed):
+                    key = (index, position)
+                    url = article.get("url")
+                    if url:
+                        if url in seen_urls and seen_urls[url] < key:
+                            continue
+                        merged.pop(seen_urls.get(url), None)
+                        seen_urls[url] = key
+                    merged[key] = article
+
+        merged_feed: List[dict] = [merged[k] for k in sorted(merged)]
+        per_ticker: dict = {t: responses[t] for t in ticker_list if t in responses}
 
         logger.info(
             f"Received news for {len(per_ticker)} of {len(ticker_list)} tickers; "
@@ -184,9 +368,16 @@ class NewsSentimentTool(BaseTool):
             "items": str(len(merged_feed)),
             "feed": merged_feed,
             "by_ticker": per_ticker,
+            # Deterministic per-ticker aggregates so the agent need not
+            # average ticker_sentiment scores itself.
+            "sentiment": aggregate_ticker_sentiment(
+                merged_feed, ticker_list, as_of=parse_time(time_to)
+            ),
         }
         if errors:
             result["errors"] = errors
+        if digest:
+            return build_news_digest(result, ticker_list, token_budget or NEWS_DIGEST_TOKEN_BUDGET)
         return result
 
     def _parse_response(self, response: dict) -> str:
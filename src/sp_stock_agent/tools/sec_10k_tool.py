@@ -5,22 +5,64 @@ This module provides a CrewAI tool for downloading, caching, and parsing SEC 10-
 to extract specific sections like Risk Factors (Item 1A) and other relevant sections.
 """
 
+import gzip
+import hashlib
+import html as html_lib
 import json
 import logging
+import multiprocessing
 import os
 import re
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from importlib.metadata import PackageNotFoundError, version
+from typing import Dict, List, Optional
+
 import sec_parser as sp
 from crewai.tools import BaseTool
 from sec_downloader import Downloader
+from sec_downloader.types import RequestedFilings
 from html_to_markdown import convert
 from rag.core import create_rag_retriever
 
+from .alpha_vantage_client import TokenBucket
+from ..storage import write_atomic
+
+try:
+    import zstandard
+except ImportError:  # optional; cached filings fall back to gzip
+    zstandard = None
+
 # Constants
 CACHE_DIR = "data/10K"
 OUTPUT_DIR = "data/generated"
 LOGS_DIR = "logs"
 DEFAULT_USER_AGENT = "MyCompanyName"
 DEFAULT_EMAIL = "email@example.com"
+# Filing index: which 10-K (CIK, accession number, filing date, form) is
+# current per symbol, when EDGAR was last asked whether a newer one exists,
+# and the cached HTML file with its size and last use.
+FILING_INDEX_PATH = os.path.join(CACHE_DIR, "index.json")
+SEC_FILING_CHECK_INTERVAL_SEC = float(os.getenv("SEC_FILING_CHECK_INTERVAL_SEC", str(24 * 3600)))
+# Cached filing HTML is stored compressed: "zstd" (needs the optional
+# ``zstandard`` package), "gzip" or "none". Once the files listed in the index
+# exceed SEC_CACHE_MAX_BYTES, the least recently used are evicted (0 = no limit).
+SEC_CACHE_COMPRESSION = os.getenv("SEC_CACHE_COMPRESSION", "zstd" if zstandard else "gzip").lower()
+SEC_CACHE_MAX_BYTES = int(os.getenv("SEC_CACHE_MAX_BYTES", str(2 * 1024 ** 3)))
+# Parsed target sections, keyed by filing (accession number) and by everything
+# that shapes the extracted markdown. Bump SECTIONS_FORMAT_VERSION whenever
+# ``parse_10k_sections`` changes its output.
+SECTIONS_CACHE_DIR = os.path.join(CACHE_DIR, "sections")
+SECTIONS_FORMAT_VERSION = 2
+# SEC fair-access policy: at most 10 requests per second per client, shared
+# by every download in the process.
+SEC_MAX_REQUESTS_PER_SEC = float(os.getenv("SEC_MAX_REQUESTS_PER_SEC", "10"))
+# ``prefetch_10k``: concurrent downloads and parser processes.
+SEC_DOWNLOAD_WORKERS = int(os.getenv("SEC_DOWNLOAD_WORKERS", "4"))
+SEC_PARSE_WORKERS = int(os.getenv("SEC_PARSE_WORKERS", str(os.cpu_count() or 1)))
 
 # Target sections configuration. Keys map an "item" number to how much of the
 # section to extract: "all" (text + tables), "text", or "table".
@@ -70,6 +112,213 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+_sec_bucket = TokenBucket(SEC_MAX_REQUESTS_PER_SEC, burst=1)
+_downloader: Optional[Downloader] = None
+_downloader_lock = threading.Lock()
+
+
+def _sec_downloader() -> Downloader:
+    """Shared SEC downloader (building one fetches the ticker -> CIK map)."""
+    global _downloader
+    with _downloader_lock:
+        if _downloader is None:
+            _sec_bucket.acquire()
+            _downloader = Downloader(DEFAULT_USER_AGENT, DEFAULT_EMAIL)
+        return _downloader
+
+
+def latest_10k_metadata(symbol: str) -> dict:
+    """Identifiers of ``symbol``'s latest 10-K from EDGAR's submissions metadata.
+
+    One rate-limited request; returns ``{"cik", "accession_number",
+    "filing_date", "form_type", "primary_doc_url"}``.
+    """
+    downloader = _sec_downloader()
+    _sec_bucket.acquire()
+    metadatas = downloader.get_filing_metadatas(
+        RequestedFilings(ticker_or_cik=symbol, form_type="10-K", limit=1)
+    )
+    if not metadatas:
+        raise ValueError(f"Could not find a 10-K filing for {symbol}")
+    filing = metadatas[0]
+    return {
+        "cik": filing.cik,
+        "accession_number": filing.accession_number,
+        "filing_date": filing.filing_date,
+        "form_type": filing.form_type,
+        "primary_doc_url": filing.primary_doc_url,
+    }
+
+
+def download_10k_document(url: str) -> str:
+    """HTML of a filing's primary document (one rate-limited request)."""
+    downloader = _sec_downloader()
+    _sec_bucket.acquire()
+    content = downloader.download_filing(url=url)
+    return content.decode('utf-8') if isinstance(content, bytes) else content
+
+
+def _parser_version() -> str:
+    try:
+        return version("sec-parser")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def sections_cache_key(accession_number: str, ignore_table: bool = False) -> str:
+    """File stem for the parsed sections of one filing under the current config."""
+    spec = json.dumps({
+        "parser": _parser_version(),
+        "format": SECTIONS_FORMAT_VERSION,
+        "sections": TARGET_SECTIONS,
+        "ignore_table": ignore_table,
+    }, sort_keys=True)
+    return f"{accession_number}-{hashlib.sha256(spec.encode('utf-8')).hexdigest()[:16]}"
+
+
+# File suffix per compression; reading goes by suffix, so files written under
+# another SEC_CACHE_COMPRESSION setting stay readable.
+_FILING_SUFFIXES = {"zstd": ".html.zst", "gzip": ".html.gz", "none": ".html"}
+
+
+def _filing_suffix() -> str:
+    if SEC_CACHE_COMPRESSION not in _FILING_SUFFIXES:
+        raise ValueError(f"Unknown SEC_CACHE_COMPRESSION '{SEC_CACHE_COMPRESSION}' (zstd, gzip or none)")
+    if SEC_CACHE_COMPRESSION == "zstd" and zstandard is None:
+        raise ImportError("SEC_CACHE_COMPRESSION=zstd needs the zstandard package: pip install zstandard")
+    return _FILING_SUFFIXES[SEC_CACHE_COMPRESSION]
+
+
+def _encode_filing(html: str, path: str) -> bytes:
+    data = html.encode("utf-8")
+    if path.endswith(".zst"):
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    if path.endswith(".gz"):
+        return gzip.compress(data)
+    return data
+
+
+def _decode_filing(path: str) -> str:
+    with open(path, "rb") as f:
+        data = f.read()
+    if path.endswith(".zst"):
+        data = zstandard.ZstdDecompressor().decompress(data)
+    elif path.endswith(".gz"):
+        data = gzip.decompress(data)
+    return data.decode("utf-8")
+
+
+_index_lock = threading.Lock()
+# A lock file older than this belongs to a writer that died holding it.
+_INDEX_LOCK_STALE_SEC = 30
+
+
+@contextmanager
+def _locked_filing_index():
+    """Serialize read-modify-write of the filing index across threads and processes.
+
+    ``prefetch_10k`` and concurrent pipeline runs all update ``index.json``;
+    an exclusively created ``index.json.lock`` next to it makes each update
+    see the previous one, so no entry (or recorded file size) is lost.
+    """
+    lock_path = f"{FILING_INDEX_PATH}.lock"
+    with _index_lock:
+        os.makedirs(os.path.dirname(lock_path) or ".", exist_ok=True)
+        while True:
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                break
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(lock_path) > _INDEX_LOCK_STALE_SEC:
+                        logger.warning(f"Removing stale filing index lock {lock_path}")
+                        os.remove(lock_path)
+                        continue
+                except OSError:  # released in the meantime
+                    continue
+                time.sleep(0.01)
+        try:
+            yield
+        finally:
+            os.close(fd)
+            os.remove(lock_path)
+
+
+def _read_filing_index() -> Dict[str, dict]:
+    try:
+        with open(FILING_INDEX_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _update_filing_index(symbol: str, fields: dict, replace: bool = False) -> None:
+    """Merge ``fields`` into ``symbol``'s index entry (or replace the entry)."""
+    with _locked_filing_index():
+        index = _read_filing_index()
+        index[symbol] = dict(fields) if replace else {**index.get(symbol, {}), **fields}
+        write_atomic(FILING_INDEX_PATH, json.dumps(index, indent=2, sort_keys=True))
+
+
+def _evict_filings(max_bytes: int, keep: str) -> None:
+    """Delete least recently used filing HTML until the cache fits ``max_bytes``.
+
+    Index entries stay (their filing identifiers are still valid); only the
+    file is dropped, so an evicted filing is downloaded again when next used.
+    """
+    if max_bytes <= 0:
+        return
+    with _locked_filing_index():
+        index = _read_filing_index()
+        cached = [(symbol, entry) for symbol, entry in index.items() if entry.get("file")]
+        total = sum(entry.get("size", 0) for _, entry in cached)
+        if total <= max_bytes:
+            return
+        for symbol, entry in sorted(cached, key=lambda item: item[1].get("last_used", 0)):
+            if total <= max_bytes:
+                break
+            if symbol == keep:
+                continue
+            path = os.path.join(CACHE_DIR, entry["file"])
+            logger.info(f"Evicting cached 10-K {path} ({entry.get('size', 0) // 1024} KB)")
+            if os.path.exists(path):
+                os.remove(path)
+            total -= entry.get("size", 0)
+            for key in ("file", "size", "last_used"):
+                entry.pop(key, None)
+        write_atomic(FILING_INDEX_PATH, json.dumps(index, indent=2, sort_keys=True))
+
+
+def current_filing(symbol: str) -> dict:
+    """Filing index entry for ``symbol``'s latest 10-K, re-checked when due.
+
+    An entry checked within ``SEC_FILING_CHECK_INTERVAL_SEC`` is trusted as is;
+    otherwise EDGAR's submissions metadata (not the document) is fetched and
+    the entry replaced if a newer filing exists. If EDGAR cannot be reached,
+    the last known entry is used.
+    """
+    entry = _read_filing_index().get(symbol)
+    if entry and time.time() - entry.get("checked_at", 0) < SEC_FILING_CHECK_INTERVAL_SEC:
+        return entry
+    try:
+        latest = latest_10k_metadata(symbol)
+    except Exception as e:
+        if not entry:
+            raise
+        logger.warning(f"Could not check EDGAR for a newer 10-K of {symbol} ({e}); using the cached filing")
+        return entry
+    if entry and entry["accession_number"] != latest["accession_number"]:
+        logger.info(
+            f"Newer 10-K for {symbol}: {latest['accession_number']} ({latest['filing_date']}) "
+            f"replaces {entry['accession_number']} ({entry.get('filing_date')})"
+        )
+    # The cached file (if any) belongs to the entry only while the filing is unchanged.
+    keep = entry if entry and entry["accession_number"] == latest["accession_number"] else {}
+    entry = {**keep, **latest, "checked_at": time.time()}
+    _update_filing_index(symbol, entry, replace=True)
+    return entry
+
+
 def _level_to_markdown(level: int) -> str:
     """Convert hierarchy level to markdown heading format.
     
@@ -82,6 +331,139 @@ def _level_to_markdown(level: int) -> str:
     return "#" * (level + 1) if level <= 5 else ""
 
 
+def _append_elements(parts: List[str], elements, section_type: str, ignore_table: bool) -> None:
+    """Append the markdown of ``elements`` that ``section_type`` asks for to ``parts``."""
+    for element in elements:
+        # Process different element types based on section configuration
+        if isinstance(element, sp.TextElement) and section_type in ["all", "text"]:
+            parts.append(f"{element.text}\n")
+
+        elif isinstance(element, sp.TitleElement) and section_type in ["all", "text"]:
+            parts.append(f"{_level_to_markdown(element.level)} {element.text}\n")
+
+        elif (isinstance(element, sp.TableElement) and section_type in ["all", "table"]
+              and not ignore_table):
+
+            # parts.append(f"{element.table_to_markdown()}\n")
+            # Existing function from sec_parser does not work
+            # TODO: Find a way to make existing function work
+
+            html_tables = element.html_tag.get_source_code()
+            parts.append(convert(html_tables).content)
+
+
+# "Item <n>" as it appears in filing HTML right after a tag; the words may be
+# split by further tags and non-breaking spaces.
+_HTML_GAP = r"(?:\s|&nbsp;|&#160;|&#xa0;|<[^>]*>)*"
+_ITEM_HEADING_RE = re.compile(rf">{_HTML_GAP}(?P<word>item){_HTML_GAP}(?P<item>\d{{1,2}}[a-c]?)\b", re.IGNORECASE)
+_BLOCK_OPEN_RE = re.compile(r"<(?:div|p|td|th|li|h[1-6])\b", re.IGNORECASE)
+_BLOCK_CLOSE_RE = re.compile(r"</(?:div|p|td|th|li|h[1-6])\s*>", re.IGNORECASE)
+_TAG_RE = re.compile(r"<[^>]*>")
+# Visible text longer than this is a sentence mentioning an item, not a heading.
+_MAX_HEADING_CHARS = 200
+
+
+def _item_headings(html: str) -> List[tuple]:
+    """``(start, item, heading_text)`` for every block that looks like an Item heading.
+
+    ``start`` is the offset of the heading's enclosing block; cross-references
+    inside longer paragraphs are skipped.
+    """
+    headings = []
+    for match in _ITEM_HEADING_RE.finditer(html):
+        word = match.start("word")
+        window_start = max(0, word - 2000)
+        opens = list(_BLOCK_OPEN_RE.finditer(html, window_start, word))
+        start = opens[-1].start() if opens else word
+        if headings and start <= headings[-1][0]:
+            continue  # same block as the previous heading
+        close = _BLOCK_CLOSE_RE.search(html, match.end())
+        block = html[start:close.end() if close else len(html)]
+        text = re.sub(r"\s+", " ", html_lib.unescape(_TAG_RE.sub("", block))).strip()
+        if _normalize_heading(text).startswith("item") and len(text) <= _MAX_HEADING_CHARS:
+            headings.append((start, match.group("item").lower(), text))
+    return headings
+
+
+def locate_target_sections(html: str) -> List[tuple]:
+    """``(item, kind, heading, start, end)`` byte ranges of the ``TARGET_SECTIONS``.
+
+    Each Item runs from its heading to the next Item heading. An item's
+    heading also appears in the table of contents (and sometimes in
+    cross-references), so the longest range per item is taken as the section
+    itself. Results are in document order.
+    """
+    headings = _item_headings(html)
+    best: Dict[str, tuple] = {}
+    for i, (start, item, heading) in enumerate(headings):
+        if item not in TARGET_SECTIONS:
+            continue
+        end = headings[i + 1][0] if i + 1 < len(headings) else len(html)
+        if item not in best or end - start > best[item][4] - best[item][3]:
+            best[item] = (item, TARGET_SECTIONS[item], heading, start, end)
+    return sorted(best.values(), key=lambda section: section[3])
+
+
+def parse_10k_sections(html: str, ignore_table: bool = False) -> str:
+    """Parse a 10-K's HTML and return its ``TARGET_SECTIONS`` as markdown.
+
+    The Item boundaries are located in the raw HTML first, and only those
+    byte ranges go through ``sec_parser``, instead of building the semantic
+    tree of the whole (often 10-20 MB) filing. Falls back to the full tree if
+    no target Item heading can be found.
+
+    Module-level (not a method) so ``prefetch_10k`` can run it in worker
+    processes.
+    """
+    sections = locate_target_sections(html)
+    if not sections:
+        return _parse_full_tree(html, ignore_table)
+
+    parts: List[str] = []
+    parser = sp.Edgar10KParser()
+    for item, kind, heading, start, end in sections:
+        logger.info(f"Found matching section: {heading} ({(end - start) // 1024} KB)")
+        parts.append(f"# {heading}\n")
+        elements = parser.parse(html[start:end])
+        # The heading itself comes back as the first element.
+        if elements and _normalize_heading(elements[0].text) == _normalize_heading(heading):
+            elements = elements[1:]
+        _append_elements(parts, elements, kind, ignore_table)
+    logger.info(f"Found {len(sections)} matching sections")
+    return "".join(parts)
+
+
+def _parse_full_tree(html: str, ignore_table: bool) -> str:
+    """Extract target sections from the semantic tree of the whole filing."""
+    logger.info("Parsing full 10-K document")
+    elements = sp.Edgar10KParser().parse(html)
+    tree = sp.TreeBuilder().build(elements)
+    top_level_sections = [item for part in tree for item in part.children]
+
+    # Extract and process target sections
+    parts: List[str] = []
+    sections_found = 0
+
+    for section in top_level_sections:
+        section_text = section.semantic_element.text
+
+        # Find which target section matches the current heading (tolerant
+        # of casing, punctuation, and unusual whitespace).
+        matching_key, section_type = _match_target_section(section_text)
+
+        if matching_key:
+            sections_found += 1
+
+            logger.info(f"Found matching section: {section.semantic_element.text}")
+            parts.append(f"# {section.semantic_element.text}\n")
+            _append_elements(
+                parts, (node.semantic_element for node in section.get_descendants()), section_type, ignore_table
+            )
+
+    logger.info(f"Found {sections_found} matching sections")
+    return "".join(parts)
+
+
 class Sec10KTool(BaseTool):
     """
     A CrewAI tool for fetching, parsing, and extracting sections from SEC 10-K filings.
@@ -103,45 +485,81 @@ class Sec10KTool(BaseTool):
     def _load_and_cache(self, symbol: str) -> tuple[bool, str]:
         """Handle all cache operations: check cache, download if needed, save to cache.
         
+        The filing index decides which 10-K is current (see ``current_filing``),
+        so a newer filing replaces the cached one instead of being ignored.
+        
         Args:
             symbol: Stock ticker symbol
             
         Returns:
-            HTML content of the 10-K filing
+            Whether the filing was already cached, and its HTML content
         """
-        # Set up cache directory and file path
-        os.makedirs(CACHE_DIR, exist_ok=True)
-        file_path = os.path.join(CACHE_DIR, f"{symbol}_10k.html")
+        filing = current_filing(symbol)
 
         # Try to load from cache first
-        if os.path.exists(file_path):
-            logger.info(f"Loading from cache: {file_path}")
-            with open(file_path, "r") as f:
-                return True, f.read()
+        cached_path = self._cached_html_path(symbol, filing["accession_number"])
+        if cached_path:
+            logger.info(f"Loading from cache: {cached_path}")
+            html_content = _decode_filing(cached_path)
+            _update_filing_index(symbol, {"last_used": time.time()})
+            return True, html_content
         
-        # Download from SEC if not cached
-        logger.info(f"Downloading 10-K filing from SEC for symbol: {symbol}")
-        downloader = Downloader(DEFAULT_USER_AGENT, DEFAULT_EMAIL)
-        html_content = downloader.get_filing_html(ticker=symbol, form="10-K")
+        # Download from SEC if not cached. The compressed file is written
+        # atomically, so a crash never leaves a partial filing behind.
+        logger.info(f"Downloading 10-K filing {filing['accession_number']} from SEC for symbol: {symbol}")
+        html_content = download_10k_document(filing["primary_doc_url"])
         
         # Save to cache with error handling
+        file_path = os.path.join(CACHE_DIR, f"{symbol}_{filing['accession_number']}{_filing_suffix()}")
         try:
-            with open(file_path, "wb") as f:
-                f.write(html_content)
-            logger.info("Successfully cached 10-K filing")
+            data = _encode_filing(html_content, file_path)
+            write_atomic(file_path, data)
+            logger.info(
+                f"Successfully cached 10-K filing ({len(html_content) // 1024} KB as {len(data) // 1024} KB)"
+            )
         except Exception as e:
             logger.error(f"Error saving to cache: {e}")
-            # Clean up corrupted cache file
-            if os.path.exists(file_path):
-                try:
-                    os.remove(file_path)
-                    logger.info(f"Cleaned up corrupted cache file: {file_path}")
-                except Exception as cleanup_error:
-                    logger.error(f"Error deleting file {file_path}: {cleanup_error}")
             raise
+        _update_filing_index(symbol, {
+            "file": os.path.basename(file_path), "size": len(data), "last_used": time.time(),
+        })
+
+        # Drop superseded filings of this symbol, then keep the cache in budget.
+        prefix = f"{symbol}_"
+        for name in os.listdir(CACHE_DIR):
+            path = os.path.join(CACHE_DIR, name)
+            if name.startswith(prefix) and ".html" in name and path != file_path:
+                logger.info(f"Removing superseded 10-K: {path}")
+                os.remove(path)
+        _evict_filings(SEC_CACHE_MAX_BYTES, keep=symbol)
         
-        # Convert bytes to string for consistency
-        return False, html_content.decode('utf-8') if isinstance(html_content, bytes) else html_content
+        return False, html_content
+
+    @staticmethod
+    def _cached_html_path(symbol: str, accession_number: str) -> Optional[str]:
+        """Existing cache file for this filing, in any readable compression."""
+        for compression, suffix in _FILING_SUFFIXES.items():
+            path = os.path.join(CACHE_DIR, f"{symbol}_{accession_number}{suffix}")
+            if os.path.exists(path) and (compression != "zstd" or zstandard is not None):
+                return path
+        return None
+
+    def _sections_path(self, symbol: str) -> str:
+        """Parsed-sections cache file for ``symbol``'s current filing."""
+        accession_number = current_filing(symbol)["accession_number"]
+        return os.path.join(SECTIONS_CACHE_DIR, f"{sections_cache_key(accession_number, self.ignore_table)}.md")
+
+    def _cached_sections(self, symbol: str) -> Optional[str]:
+        """Previously extracted sections of ``symbol``'s cached filing, or ``None``."""
+        path = self._sections_path(symbol)
+        if os.path.exists(path):
+            logger.info(f"Loading parsed sections from cache: {path}")
+            with open(path, "r") as f:
+                return f.read()
+        return None
+
+    def _store_sections(self, symbol: str, markdown: str) -> None:
+        write_atomic(self._sections_path(symbol), markdown)
 
     def _process_and_save_sections(self, html: str, symbol: str) -> str:
         """Parse document, extract target sections, and save output.
@@ -153,53 +571,15 @@ class Sec10KTool(BaseTool):
         Returns:
             Markdown content of extracted sections
         """
-        # Parse the document
-        logger.info("Parsing 10-K document")
-        elements = sp.Edgar10KParser().parse(html)
-        tree = sp.TreeBuilder().build(elements)
-        top_level_sections = [item for part in tree for item in part.children]
-        
-        # Extract and process target sections
-        markdown = ""
-        sections_found = 0
+        markdown = self._cached_sections(symbol)
+        if markdown is None:
+            markdown = parse_10k_sections(html, self.ignore_table)
+            self._store_sections(symbol, markdown)
+        self._save_sections(markdown, symbol)
+        return markdown
 
-        for section in top_level_sections:
-            section_text = section.semantic_element.text
-            
-            # Find which target section matches the current heading (tolerant
-            # of casing, punctuation, and unusual whitespace).
-            matching_key, section_type = _match_target_section(section_text)
-            
-            if matching_key:
-                sections_found += 1
-
-                logger.info(f"Found matching section: {section.semantic_element.text}")
-                markdown += f"# {section.semantic_element.text}\n"
-                
-                # Process all descendants of this section
-                for node in section.get_descendants():
-                    element = node.semantic_element
-                    
-                    # Process different element types based on section configuration
-                    if isinstance(element, sp.TextElement) and section_type in ["all", "text"]:
-                        markdown += f"{element.text}\n"
-                    
-                    elif isinstance(element, sp.TitleElement) and section_type in ["all", "text"]:
-                        markdown += f"{_level_to_markdown(element.level)} {element.text}\n"
-                    
-                    elif (isinstance(element, sp.TableElement) and section_type in ["all", "table"] 
-                          and not self.ignore_table):
-                        
-                        # markdown += f"{element.table_to_markdown()}\n"
-                        # Existing function from sec_parser does not work
-                        # TODO: Find a way to make existing function work
-                        
-                        html_tables = element.html_tag.get_source_code()
-                        markdown += convert(html_tables).content
-
-        logger.info(f"Found {sections_found} matching sections")
-        
-        # Save the processed content
+    def _save_sections(self, markdown: str, symbol: str) -> None:
+        """Write the extracted sections to ``OUTPUT_DIR``."""
         os.makedirs(OUTPUT_DIR, exist_ok=True)
         output_file = os.path.join(OUTPUT_DIR, f"{symbol}_10k_parsed.md")
         
@@ -207,7 +587,16 @@ class Sec10KTool(BaseTool):
             f.write(markdown)
         
         logger.info(f"Saved parsed 10-K data to: {output_file}")
-        return markdown
+
+    def _ingest(self, markdown: str):
+        """Chunk and embed freshly downloaded sections into the RAG store."""
+        retriever =  create_rag_retriever(
+                collection_name = "sec10k_chunks",
+                chunk_size = 1000,
+                chunk_overlap = 200,
+                top_k = 8
+            ) 
+        return retriever.ingest_text(markdown)
 
     def _run(self, symbol: str) -> str:
         """
@@ -218,6 +607,12 @@ class Sec10KTool(BaseTool):
             Markdown content of extracted sections
         """
         logger.info(f"Starting 10-K processing for symbol: {symbol}")
+
+        # Warm path: the sections of an already ingested filing were parsed before.
+        markdown = self._cached_sections(symbol)
+        if markdown is not None:
+            self._save_sections(markdown, symbol)
+            return markdown
         
         # Get 10-K filing content (handles caching automatically)
         #TODO: Quick fix to check if the report was cached. If it was, chunking would not be needed.
@@ -229,16 +624,88 @@ class Sec10KTool(BaseTool):
         markdown = self._process_and_save_sections(html, symbol)
 
         if markdown and not was_cached:
-            retriever =  create_rag_retriever(
-                    collection_name = "sec10k_chunks",
-                    chunk_size = 1000,
-                    chunk_overlap = 200,
-                    top_k = 8
-                ) 
-            return retriever.ingest_text(markdown)
+            return self._ingest(markdown)
 
         return markdown
 
+
+def prefetch_10k(symbols: List[str], ignore_table: bool = False) -> Dict[str, str]:
+    """Download, parse and ingest the latest 10-K for every symbol.
+
+    Filing checks and downloads run on ``SEC_DOWNLOAD_WORKERS`` threads sharing
+    the SEC rate limit; each filing is handed to a pool of ``SEC_PARSE_WORKERS`` processes
+    as soon as it arrives, so parsing overlaps the remaining downloads. The
+    RAG ingest writes to a single vector store and runs serially, in input
+    order, once everything is parsed.
+
+    Returns ``{symbol: "ingested" | "cached" | "error: ..."}`` in input order.
+    """
+    symbols = list(dict.fromkeys(symbols))
+    if not symbols:
+        return {}
+    tool = Sec10KTool(ignore_table=ignore_table)
+    errors: Dict[str, str] = {}
+    parsed: Dict[str, tuple] = {}
+
+    parse_workers = min(SEC_PARSE_WORKERS, len(symbols))
+    # "spawn": forking while download threads hold locks can deadlock a worker.
+    parse_pool = (
+        ProcessPoolExecutor(parse_workers, mp_context=multiprocessing.get_context("spawn"))
+        if parse_workers > 1 else ThreadPoolExecutor(1)
+    )
+    with parse_pool, ThreadPoolExecutor(max(1, min(SEC_DOWNLOAD_WORKERS, len(symbols)))) as download_pool:
+        def _fetch(symbol: str) -> tuple:
+            # The filing check (and any download) runs here, off the main thread.
+            markdown = tool._cached_sections(symbol)
+            if markdown is not None:
+                return True, None, markdown
+            return (*tool._load_and_cache(symbol), None)
+
+        downloads = {download_pool.submit(_fetch, symbol): symbol for symbol in symbols}
+        parses = {}
+        for future in as_completed(downloads):
+            symbol = downloads[future]
+            try:
+                was_cached, html, markdown = future.result()
+            except Exception as e:
+                errors[symbol] = f"error: {e}"
+                continue
+            if markdown is not None:
+                parsed[symbol] = (was_cached, markdown)
+                continue
+            parses[parse_pool.submit(parse_10k_sections, html, ignore_table)] = (symbol, was_cached, html)
+
+        for future in as_completed(parses):
+            symbol, was_cached, html = parses[future]
+            try:
+                try:
+                    markdown = future.result()
+                except BrokenProcessPool:
+                    # Worker processes unavailable (or one crashed): parse here.
+                    markdown = parse_10k_sections(html, ignore_table)
+                tool._store_sections(symbol, markdown)
+                parsed[symbol] = (was_cached, markdown)
+            except Exception as e:
+                errors[symbol] = f"error: {e}"
+
+    outcome: Dict[str, str] = {}
+    for symbol in symbols:
+        if symbol in errors:
+            outcome[symbol] = errors[symbol]
+            continue
+        was_cached, markdown = parsed[symbol]
+        try:
+            tool._save_sections(markdown, symbol)
+            if markdown and not was_cached:
+                tool._ingest(markdown)
+                outcome[symbol] = "ingested"
+            else:
+                outcome[symbol] = "cached"
+        except Exception as e:
+            outcome[symbol] = f"error: {e}"
+    return outcome
+
+
 # Example usage
 if __name__ == "__main__":
     tool = Sec10KTool()
@@ -1,25 +1,35 @@
 import os
 import json
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Type, List
+from typing import Dict, List, Optional, Type
+from urllib.parse import urlparse
 from pydantic import BaseModel, Field
 import requests
 from dotenv import load_dotenv
 from serpapi import Client
 from newspaper import Article, Config
-from transformers import pipeline
 from crewai.tools import BaseTool
 
+from ..model_registry import get_model, register_model
+from ..nlp_cache import NLPCache, content_hash
+from ..sentiment_backends import load_sentiment_backend, sentiment_model_id
+
 # Load environment variables from project root (not dependent on cwd)
 load_dotenv(Path(__file__).resolve().parents[3] / ".env")
 SERPAPI_KEY = os.getenv("SERPAPI_API_KEY")
 SERPER_KEY = os.getenv("SERPER_API_KEY")
-if not SERPAPI_KEY and not SERPER_KEY:
-    raise EnvironmentError(
-        "Missing news search API key: set SERPAPI_API_KEY (serpapi.com) "
-        "and/or SERPER_API_KEY (serper.dev)"
-    )
+
+
+def _require_search_key() -> None:
+    """Fail on first use (not at import) when no news search key is configured."""
+    if not SERPAPI_KEY and not SERPER_KEY:
+        raise EnvironmentError(
+            "Missing news search API key: set SERPAPI_API_KEY (serpapi.com) "
+            "and/or SERPER_API_KEY (serper.dev)"
+        )
 
 # Logging setup
 os.makedirs("logs", exist_ok=True)
@@ -33,29 +43,103 @@ logging.basicConfig(
     ]
 )
 
+# Article downloads: total worker threads, simultaneous downloads per
+# publisher host, and the per-request timeout.
+NEWS_FETCH_WORKERS = int(os.getenv("NEWS_FETCH_WORKERS", "8"))
+NEWS_FETCH_PER_HOST = int(os.getenv("NEWS_FETCH_PER_HOST", "2"))
+NEWS_FETCH_TIMEOUT_SEC = float(os.getenv("NEWS_FETCH_TIMEOUT_SEC", "10"))
+
 # Configure newspaper to use custom headers (avoid 403s)
 config = Config()
 config.browser_user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
+config.request_timeout = NEWS_FETCH_TIMEOUT_SEC
+
+_host_slots: Dict[str, threading.BoundedSemaphore] = {}
+_host_slots_lock = threading.Lock()
+
+
+def _host_slot(url: str) -> threading.BoundedSemaphore:
+    """Semaphore limiting concurrent downloads from ``url``'s host."""
+    host = urlparse(url).netloc.lower()
+    with _host_slots_lock:
+        return _host_slots.setdefault(host, threading.BoundedSemaphore(NEWS_FETCH_PER_HOST))
+
+# Pipelines are built on first use through the shared model registry, so
+# importing the tools package does not load transformers or any weights.
+SUMMARIZER_MODEL = "news_summarizer"
+CLASSIFIER_MODEL = "news_sentiment_classifier"
+SUMMARIZER_MODEL_ID = "Falconsai/text_summarization"
+
+
+def _summarizer_factory():
+    from transformers import pipeline
+    return pipeline("summarization", model=SUMMARIZER_MODEL_ID)
+
+
+register_model(SUMMARIZER_MODEL, _summarizer_factory)
+# The classifier is whichever backend NEWS_SENTIMENT_BACKEND selects.
+register_model(CLASSIFIER_MODEL, load_sentiment_backend)
+
+# Articles per forward pass for summarization / classification. Inputs are
+# sorted by length before batching so each batch pads to similar lengths.
+NEWS_MODEL_BATCH_SIZE = max(1, int(os.getenv("NEWS_MODEL_BATCH_SIZE", "8")))
+
+# Articles of at most this many words are classified on their own text
+# rather than summarized first (roughly the summarizer's output length); in
+# sentiment-only runs every article is classified on this many lead words.
+NEWS_LEAD_WORDS = int(os.getenv("NEWS_LEAD_WORDS", "120"))
+
+
+def _lead_text(text: str, words: Optional[int] = None) -> str:
+    """The first ``words`` (default ``NEWS_LEAD_WORDS``) words of ``text``."""
+    return " ".join(text.split()[:words or NEWS_LEAD_WORDS])
 
-# Pipelines
-summarizer = pipeline("summarization", model="Falconsai/text_summarization")
-classifier = pipeline("zero-shot-classification", model="facebook/bart-large-mnli")
-SENTIMENT_LABELS = ["BULLISH", "BEARISH", "NEUTRAL"]
+
+def _length_buckets(texts: List[str], batch_size: int) -> List[List[int]]:
+    """Indices of ``texts`` grouped into batches of similar length."""
+    batch_size = max(1, batch_size)
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    return [order[i:i + batch_size] for i in range(0, len(order), batch_size)]
+
+
+def _through_cache(kind: str, model_id: str, texts: List[str], compute, keep) -> list:
+    """Look ``texts`` up in the NLP cache and run ``compute`` once per distinct miss.
+
+    ``compute`` takes a list of texts and returns one result per text; results
+    for which ``keep`` is true are stored for later runs.
+    """
+    cache = NLPCache()
+    keys = [content_hash(t) for t in texts]
+    known = cache.get_many(kind, model_id, keys)
+    misses = {}
+    for i, key in enumerate(keys):
+        if key not in known:
+            misses.setdefault(key, i)
+    if misses:
+        logger.info(f"NLP cache: {len(texts) - len(misses)} cached, {len(misses)} to compute ({kind})")
+        computed = dict(zip(misses, compute([texts[i] for i in misses.values()])))
+        cache.put_many(kind, model_id, {k: v for k, v in computed.items() if keep(v)})
+        known.update(computed)
+    return [known[key] for key in keys]
 
 # Input schema for CrewAI
 class NewsScraperInput(BaseModel):
     tickers: List[str] = Field(..., description="List of stock tickers to analyze")
     max_articles: int = Field(3, description="Max number of articles to fetch per ticker")
+    sentiment_only: bool = Field(
+        False, description="Skip summarization and classify each article's lead text (faster)"
+    )
 
 class NewsScraperTool(BaseTool):
     name: str = "news_sentiment_analysis"
     description: str = (
         "This tool scrapes financial news articles from the internet for selected stocks."
-        "It then analyzes the sentiment of the articles using summarization and zero-shot classification."
+        "It then analyzes the sentiment of the articles using summarization and sentiment classification."
     )
     args_schema: Type[BaseModel] = NewsScraperInput
 
     def fetch_articles(self, query, max_articles):
+        _require_search_key()
         if SERPAPI_KEY:
             logger.info(f"Querying SerpApi (google_news) for: {query}")
             client = Client(api_key=SERPAPI_KEY)
@@ -93,7 +177,8 @@ class NewsScraperTool(BaseTool):
     def extract_text(self, url):
         try:
             article = Article(url, config=config)
-            article.download()
+            with _host_slot(url):
+                article.download()
             article.parse()
             return article.text
         except Exception as e:
@@ -102,59 +187,137 @@ class NewsScraperTool(BaseTool):
 
     def summarize(self, text):
         try:
-            return summarizer(text, max_length=130, min_length=30, do_sample=False)[0]['summary_text']
+            return get_model(SUMMARIZER_MODEL)(text, max_length=130, min_length=30, do_sample=False)[0]['summary_text']
         except Exception as e:
             logger.warning(f"Summarization failed: {e}")
             return None
 
     def classify_sentiment(self, summary):
         try:
-            result = classifier(summary, SENTIMENT_LABELS)
-            return {
-                "label": result["labels"][0],
-                "score": round(result["scores"][0], 4)
-            }
+            return get_model(CLASSIFIER_MODEL)([summary], batch_size=1)[0]
         except Exception as e:
             logger.warning(f"Sentiment classification failed: {e}")
             return {"label": "NEUTRAL", "score": 0.0}
 
-    def _run(self, tickers: List[str], max_articles: int = 3) -> str:
-        all_results = []
+    def summarize_batch(self, texts: List[str], batch_size: int = NEWS_MODEL_BATCH_SIZE) -> List[str | None]:
+        """Summarize ``texts`` (``None`` where it failed), reusing cached summaries."""
+        return _through_cache(
+            "summary", SUMMARIZER_MODEL_ID, texts,
+            lambda todo: self._summarize_uncached(todo, batch_size),
+            keep=bool,
+        )
+
+    def _summarize_uncached(self, texts: List[str], batch_size: int) -> List[str | None]:
+        """Summarize ``texts`` in length-bucketed batches."""
+        summaries: List[str | None] = [None] * len(texts)
+        for bucket in _length_buckets(texts, batch_size):
+            batch = [texts[i] for i in bucket]
+            try:
+                outputs = get_model(SUMMARIZER_MODEL)(
+                    batch, max_length=130, min_length=30, do_sample=False,
+                    truncation=True, batch_size=len(batch),
+                )
+                for i, out in zip(bucket, outputs):
+                    summaries[i] = out['summary_text']
+            except Exception as e:
+                # Isolate the bad input rather than losing the whole batch.
+                logger.warning(f"Batched summarization failed ({e}); retrying articles one by one")
+                for i in bucket:
+                    summaries[i] = self.summarize(texts[i])
+        return summaries
+
+    def classify_batch(self, summaries: List[str], batch_size: int = NEWS_MODEL_BATCH_SIZE) -> List[dict]:
+        """Sentiment for ``summaries``, reusing cached results."""
+        return _through_cache(
+            "sentiment", sentiment_model_id(), summaries,
+            lambda todo: self._classify_uncached(todo, batch_size),
+            # A 0.0 score is the neutral fallback of a failed classification.
+            keep=lambda sentiment: sentiment["score"] > 0,
+        )
+
+    def _classify_uncached(self, summaries: List[str], batch_size: int) -> List[dict]:
+        """Sentiment for ``summaries`` in length-bucketed batches."""
+        sentiments: List[dict] = [{"label": "NEUTRAL", "score": 0.0}] * len(summaries)
+        for bucket in _length_buckets(summaries, batch_size):
+            batch = [summaries[i] for i in bucket]
+            try:
+                outputs = get_model(CLASSIFIER_MODEL)(batch, batch_size=len(batch))
+                for i, out in zip(bucket, outputs):
+                    sentiments[i] = out
+            except Exception as e:
+                logger.warning(f"Batched classification failed ({e}); retrying articles one by one")
+                for i in bucket:
+                    sentiments[i] = self.classify_sentiment(summaries[i])
+        return sentiments
 
+    def _run(self, tickers: List[str], max_articles: int = 3, sentiment_only: bool = False) -> str:
+        # 1) Search news for every ticker.
+        jobs = []
         for ticker in tickers:
-            articles = self.fetch_articles(ticker, max_articles)
-            for art in articles:
-                title = art.get("title")
-                url = art.get("link")
-                source = art.get("source")
-                date = art.get("date", "Unknown")
-
-                if not url:
-                    logger.info(f"Skipping article without URL: {title}")
+            for art in self.fetch_articles(ticker, max_articles):
+                if not art.get("link"):
+                    logger.info(f"Skipping article without URL: {art.get('title')}")
                     continue
+                jobs.append((ticker, art))
+
+        # 2) Download and parse articles on a bounded pool (per-host limits and
+        # timeouts live in ``extract_text``) so network waits overlap. Parsed
+        # texts feed the batched summarizer as soon as a batch is ready, while
+        # the remaining downloads continue in the background. Short articles,
+        # and every article in sentiment-only runs, skip the summarizer and are
+        # classified on their lead text.
+        texts: Dict[int, str] = {}
+        summaries: Dict[int, Optional[str]] = {}
+        summarized: Dict[int, bool] = {}
+        ready: List[int] = []
 
-                text = self.extract_text(url)
+        def _summarize_ready():
+            for i, summary in zip(ready, self.summarize_batch([texts[i] for i in ready])):
+                summaries[i] = summary
+            ready.clear()
+
+        with ThreadPoolExecutor(max_workers=max(1, NEWS_FETCH_WORKERS)) as pool:
+            futures = {pool.submit(self.extract_text, art["link"]): i for i, (_, art) in enumerate(jobs)}
+            for future in as_completed(futures):
+                i = futures[future]
+                text = future.result()
                 if not text or len(text.strip()) < 50:
-                    logger.info(f"Skipping short or empty article: {title}")
+                    logger.info(f"Skipping short or empty article: {jobs[i][1].get('title')}")
                     continue
-
-                summary = self.summarize(text)
-                if not summary:
+                if sentiment_only or len(text.split()) <= NEWS_LEAD_WORDS:
+                    summaries[i], summarized[i] = _lead_text(text), False
                     continue
+                texts[i], summarized[i] = text, True
+                ready.append(i)
+                if len(ready) >= NEWS_MODEL_BATCH_SIZE:
+                    _summarize_ready()
+        if ready:
+            _summarize_ready()
 
-                sentiment = self.classify_sentiment(summary)
+        # 3) Batched classification of the summaries, in article order.
+        kept = [(jobs[i], summaries[i], summarized[i]) for i in sorted(summaries) if summaries[i]]
+        sentiments = self.classify_batch([summary for _, summary, _ in kept])
 
-                logger.info(f"✓ {ticker} | {date} | {source} | {title} => {sentiment['label']}")
+        all_results = []
+        for ((ticker, art), summary, was_summarized), sentiment in zip(kept, sentiments):
+            title = art.get("title")
+            source = art.get("source")
+            date = art.get("date", "Unknown")
+
+            logger.info(f"✓ {ticker} | {date} | {source} | {title} => {sentiment['label']}")
+
+            all_results.append({
+                "ticker": ticker,
+                "title": title,
+                "url": art.get("link"),
+                "publish_date": date,
+                "source": source,
+                "summary": summary,
+                "summarized": was_summarized,
+                "sentiment": sentiment
+            })
 
-                all_results.append({
-                    "ticker": ticker,
-                    "title": title,
-                    "url": url,
-                    "publish_date": date,
-                    "source": source,
-                    "summary": summary,
-                    "sentiment": sentiment
-                })
+        NLPCache().prune()
 
         json_path = "data/news_data.json"
         with open(json_path, "w", encoding="utf-8") as f:
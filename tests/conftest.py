@@ -99,6 +99,55 @@ def mock_env_vars():
         yield
 
 
+@pytest.fixture(autouse=True)
+def isolated_bar_store(tmp_path, monkeypatch):
+    """Point the on-disk bar store at a per-test temporary directory."""
+    monkeypatch.setattr("src.sp_stock_agent.bar_store.BAR_STORE_DIR", str(tmp_path / "bars"))
+    yield tmp_path / "bars"
+
+
+@pytest.fixture(autouse=True)
+def isolated_news_store(tmp_path, monkeypatch):
+    """Point the news article store at a per-test temporary database."""
+    monkeypatch.setattr("src.sp_stock_agent.news_store.NEWS_STORE_PATH", str(tmp_path / "news" / "articles.sqlite"))
+    yield tmp_path / "news" / "articles.sqlite"
+
+
+@pytest.fixture(autouse=True)
+def isolated_nlp_cache(tmp_path, monkeypatch):
+    """Point the summary/sentiment cache at a per-test temporary database."""
+    monkeypatch.setattr("src.sp_stock_agent.nlp_cache.NLP_CACHE_PATH", str(tmp_path / "nlp.sqlite"))
+    yield tmp_path / "nlp.sqlite"
+
+
+@pytest.fixture(autouse=True)
+def isolated_response_cache(tmp_path):
+    """Give each test an empty HTTP response cache under a temporary directory."""
+    from src.sp_stock_agent import response_cache
+    cache = response_cache.ResponseCache(str(tmp_path / "http"), enabled=True)
+    response_cache.set_response_cache(cache)
+    yield cache
+    response_cache.set_response_cache(None)
+
+
+@pytest.fixture(autouse=True)
+def fast_alpha_vantage_client(isolated_response_cache):
+    """Give each test a fresh, effectively unthrottled Alpha Vantage client."""
+    try:
+        from src.sp_stock_agent.tools import alpha_vantage_client as av
+    except ImportError:  # tool dependencies not installed; nothing to reset
+        yield None
+        return
+    client = av.AlphaVantageClient(
+        bucket=av.TokenBucket(rate_per_sec=1000, burst=1000),
+        retry_deadline=0,
+        cache=isolated_response_cache,
+    )
+    av.set_client(client)
+    yield client
+    av.set_client(None)
+
+
 @pytest.fixture
 def temp_cache_dir():
     """Create a temporary cache directory for testing."""
@@ -0,0 +1,252 @@
+"""
+Test cases for the shared Alpha Vantage client and its token-bucket limiter.
+"""
+
+import asyncio
+import os
+import threading
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+import requests
+
+from src.sp_stock_agent.response_cache import ResponseCache
+from src.sp_stock_agent.tools.alpha_vantage_client import (
+    AlphaVantageClient,
+    AlphaVantageQuotaExceeded,
+    AlphaVantageThrottled,
+    TokenBucket,
+    bucket_from_env,
+    classify_payload,
+    run_sync,
+)
+
+THROTTLE_NOTE = {
+    "Note": "Thank you for using Alpha Vantage! Our standard API call frequency is 5 calls per minute "
+            "and 500 calls per day."
+}
+BURST_INFO = {
+    "Information": "Please consider spreading out your free API requests more sparingly (1 request per second)."
+}
+PREMIUM_MINUTE_INFO = {
+    "Information": "Thank you for using Alpha Vantage! Please contact premium@alphavantage.co if you are "
+                   "targeting a higher API call volume."
+}
+QUOTA_INFO = {
+    "Information": "Thank you for using Alpha Vantage! Our standard API rate limit is 25 requests per day."
+}
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Reservation-based token bucket behaviour."""
+
+    def test_burst_then_paced(self):
+        """Up to ``burst`` requests go immediately, the rest are spaced at the rate."""
+        bucket = TokenBucket(rate_per_sec=10, burst=3)
+        waits = [bucket.reserve() for _ in range(5)]
+        self.assertEqual(waits[:3], [0.0, 0.0, 0.0])
+        self.assertAlmostEqual(waits[3], 0.1, delta=0.02)
+        self.assertAlmostEqual(waits[4], 0.2, delta=0.02)
+
+    def test_async_acquire_paces(self):
+        bucket = TokenBucket(rate_per_sec=20, burst=1)
+
+        async def _three():
+            for _ in range(3):
+                await bucket.acquire_async()
+
+        t0 = time.monotonic()
+        asyncio.run(_three())
+        self.assertGreaterEqual(time.monotonic() - t0, 0.09)
+
+    def test_plan_from_env(self):
+        with patch.dict(os.environ, {"ALPHA_VANTAGE_PLAN": "premium-150"}, clear=False):
+            bucket = bucket_from_env()
+        self.assertAlmostEqual(bucket.rate, 2.5)
+        self.assertEqual(bucket.capacity, 5)
+
+        with patch.dict(os.environ, {"ALPHA_VANTAGE_PLAN": "gold"}, clear=False):
+            with self.assertRaises(ValueError):
+                bucket_from_env()
+
+
+class TestAlphaVantageClient(unittest.TestCase):
+    """Pooled session usage and concurrent fan-out."""
+
+    def setUp(self):
+        self.client = AlphaVantageClient(
+            bucket=TokenBucket(rate_per_sec=1000, burst=1000), max_concurrency=4, cache=ResponseCache(enabled=False)
+        )
+
+    @patch('requests.Session.get')
+    def test_get_json_uses_session(self, mock_get):
+        mock_response = Mock()
+        mock_response.json.return_value = {"ok": True}
+        mock_get.return_value = mock_response
+
+        self.assertEqual(self.client.get_json({"function": "RSI"}), {"ok": True})
+        self.assertEqual(mock_get.call_args[1]['params'], {"function": "RSI"})
+
+    @patch('requests.Session.get')
+    def test_concurrent_duplicates_share_one_call(self, mock_get):
+        """Identical in-flight requests are coalesced into one network call."""
+        release = threading.Event()
+
+        def _slow(url, params=None, **kwargs):
+            release.wait(2)
+            response = Mock()
+            response.json.return_value = {"symbol": params["symbol"]}
+            return response
+        mock_get.side_effect = _slow
+
+        params = {"function": "TIME_SERIES_DAILY", "symbol": "AAPL", "apikey": "k1"}
+        same_but_other_key = dict(params, apikey="k2")
+        results = []
+        threads = [
+            threading.Thread(target=lambda p=p: results.append(self.client.get_json(p)))
+            for p in (params, same_but_other_key, params)
+        ]
+        for t in threads:
+            t.start()
+        time.sleep(0.1)
+        release.set()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(results, [{"symbol": "AAPL"}] * 3)
+        results[0]["symbol"] = "mutated"
+        self.assertEqual(results[1], {"symbol": "AAPL"})
+
+    @patch('requests.Session.get')
+    def test_memo_ttl(self, mock_get):
+        """Completed responses are reused within the TTL; error payloads are not."""
+        mock_response = Mock()
+        mock_response.json.return_value = {"ok": True}
+        mock_get.return_value = mock_response
+
+        self.client.get_json({"function": "RSI", "symbol": "AAPL"})
+        self.client.get_json({"function": "RSI", "symbol": "AAPL"})
+        self.assertEqual(mock_get.call_count, 1)
+
+        mock_response.json.return_value = {"Note": "Thank you for using Alpha Vantage!"}
+        self.client.get_json({"function": "RSI", "symbol": "MSFT"})
+        self.client.get_json({"function": "RSI", "symbol": "MSFT"})
+        self.assertEqual(mock_get.call_count, 3)
+
+        no_memo = AlphaVantageClient(
+            bucket=TokenBucket(rate_per_sec=1000, burst=1000), memo_ttl=0, cache=ResponseCache(enabled=False)
+        )
+        mock_response.json.return_value = {"ok": True}
+        no_memo.get_json({"function": "RSI", "symbol": "AAPL"})
+        no_memo.get_json({"function": "RSI", "symbol": "AAPL"})
+        self.assertEqual(mock_get.call_count, 5)
+
+    def test_map_concurrent_overlaps_and_keeps_order(self):
+        """Blocking calls overlap and results come back in input order."""
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def _work(i):
+            with lock:
+                active.append(i)
+                peak.append(len(active))
+            time.sleep(0.05)
+            with lock:
+                active.remove(i)
+            if i == 2:
+                raise ValueError("boom")
+            return i * 10
+
+        results = self.client.map_concurrent(_work, range(6))
+
+        self.assertEqual([r for r in results if not isinstance(r, Exception)], [0, 10, 30, 40, 50])
+        self.assertIsInstance(results[2], ValueError)
+        self.assertLessEqual(max(peak), 4)
+        self.assertGreater(max(peak), 1)
+
+    def test_run_sync_inside_running_loop(self):
+        async def _outer():
+            async def _inner():
+                return 42
+            return run_sync(_inner())
+
+        self.assertEqual(asyncio.run(_outer()), 42)
+
+
+
+class TestThrottleRetry(unittest.TestCase):
+    """Classification of AV throttle payloads and retry with backoff."""
+
+    def setUp(self):
+        self.bucket = TokenBucket(rate_per_sec=1000, burst=1000)
+        self.client = AlphaVantageClient(bucket=self.bucket, retry_deadline=5, retry_backoff=0.01, memo_ttl=0,
+                                          cache=ResponseCache(enabled=False))
+
+    def _responses(self, *payloads):
+        responses = []
+        for payload in payloads:
+            response = Mock()
+            response.json.return_value = payload
+            responses.append(response)
+        return responses
+
+    def test_classify_payload(self):
+        self.assertEqual(classify_payload(THROTTLE_NOTE), "throttle")
+        self.assertEqual(classify_payload(BURST_INFO), "throttle")
+        self.assertEqual(classify_payload(QUOTA_INFO), "quota")
+        self.assertEqual(classify_payload(PREMIUM_MINUTE_INFO), "throttle")
+        self.assertIsNone(classify_payload({"Information": "This is a premium endpoint."}))
+        self.assertIsNone(classify_payload({"Time Series (Daily)": {}}))
+
+    @patch('requests.Session.get')
+    def test_throttle_is_retried_and_slows_shared_bucket(self, mock_get):
+        mock_get.side_effect = self._responses(THROTTLE_NOTE, BURST_INFO, {"ok": True})
+        with patch.object(self.bucket, 'penalize', wraps=self.bucket.penalize) as penalize:
+            self.assertEqual(self.client.get_json({"function": "GLOBAL_QUOTE", "symbol": "AAPL"}), {"ok": True})
+        self.assertEqual(mock_get.call_count, 3)
+        self.assertEqual(penalize.call_count, 2)
+
+    @patch('requests.Session.get')
+    def test_premium_per_minute_notice_is_retried(self, mock_get):
+        mock_get.side_effect = self._responses(PREMIUM_MINUTE_INFO, {"ok": True})
+        self.assertEqual(self.client.get_json({"function": "TIME_SERIES_DAILY", "symbol": "AAPL"}), {"ok": True})
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch('requests.Session.get')
+    def test_quota_exhaustion_is_not_retried(self, mock_get):
+        mock_get.side_effect = self._responses(QUOTA_INFO, {"ok": True})
+        with self.assertRaises(AlphaVantageQuotaExceeded):
+            self.client.get_json({"function": "GLOBAL_QUOTE", "symbol": "AAPL"})
+        self.assertEqual(mock_get.call_count, 1)
+
+    @patch('requests.Session.get')
+    def test_gives_up_at_deadline(self, mock_get):
+        mock_get.side_effect = lambda *a, **kw: self._responses(THROTTLE_NOTE)[0]
+        client = AlphaVantageClient(bucket=self.bucket, retry_deadline=0.2, retry_backoff=0.05, memo_ttl=0,
+                                     cache=ResponseCache(enabled=False))
+        t0 = time.monotonic()
+        with self.assertRaises(AlphaVantageThrottled):
+            client.get_json({"function": "GLOBAL_QUOTE", "symbol": "AAPL"})
+        self.assertLess(time.monotonic() - t0, 1.0)
+        self.assertGreater(mock_get.call_count, 1)
+
+    @patch('requests.Session.get')
+    def test_transient_http_errors_are_retried(self, mock_get):
+        failing = Mock(status_code=503, text="unavailable")
+        failing.raise_for_status.side_effect = requests.HTTPError(response=failing)
+        mock_get.side_effect = [failing, requests.ConnectionError("reset")] + self._responses({"ok": True})
+        self.assertEqual(self.client.get_json({"function": "GLOBAL_QUOTE", "symbol": "AAPL"}), {"ok": True})
+        self.assertEqual(mock_get.call_count, 3)
+
+    def test_penalize_delays_next_token_without_stacking(self):
+        bucket = TokenBucket(rate_per_sec=100, burst=5)
+        bucket.penalize(0.5)
+        bucket.penalize(0.5)
+        self.assertAlmostEqual(bucket.reserve(), 0.5, delta=0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,18 +4,38 @@ Tests both single ticker and multiple ticker scenarios.
 """
 
 import unittest
+import copy
 import json
 import os
 import tempfile
+import threading
+import time
 from unittest.mock import Mock, patch, MagicMock
 from typing import Dict, Any, List
 
 # Import the tools we're testing
-from src.sp_stock_agent.tools.alpha_vantage_api_tool import FetchStockSummaryTool
-from src.sp_stock_agent.tools.av_news_api_tool import NewsSentimentTool
+from src.sp_stock_agent.tools.alpha_vantage_api_tool import (
+    FetchStockSummaryTool,
+    use_market_data_snapshot,
+    validate_daily_data_freshness,
+)
+from src.sp_stock_agent.tools.av_news_api_tool import NewsSentimentTool, build_news_digest
 from src.sp_stock_agent.tools.av_earnings_transcript_api_tool import EarningsCallTranscriptTool
 
 
+def _respond_by(param: str, payloads: Dict[str, Any]):
+    """``Session.get`` side effect answering each request with ``payloads[params[param]]``.
+
+    Multi-symbol fetches run concurrently, so an ordered ``side_effect`` list
+    would hand responses to whichever request happens to go first.
+    """
+    def _get(url, params=None, **kwargs):
+        response = Mock()
+        response.json.return_value = copy.deepcopy(payloads[params[param]])
+        return response
+    return _get
+
+
 class TestFetchStockSummaryTool(unittest.TestCase):
     """Test cases for FetchStockSummaryTool - single and multiple ticker scenarios."""
     
@@ -78,7 +98,7 @@ class TestFetchStockSummaryTool(unittest.TestCase):
         self.assertEqual(self.tool.name, "fetch_stock_summary")
         self.assertIn("Fetches a 5-day summary", self.tool.description)
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_single_ticker_fetch_success(self, mock_get):
         """Test successful fetching of data for a single ticker."""
         # Mock the API response
@@ -115,7 +135,7 @@ class TestFetchStockSummaryTool(unittest.TestCase):
         self.assertIsInstance(daily_data['close'], float)
         self.assertIsInstance(daily_data['volume'], int)
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_single_ticker_fetch_error_handling(self, mock_get):
         """Test error handling for single ticker fetch."""
         # Mock API error response
@@ -131,14 +151,13 @@ class TestFetchStockSummaryTool(unittest.TestCase):
         # Should return None for errors
         self.assertIsNone(result)
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_multiple_ticker_fetch_success(self, mock_get):
         """Test successful fetching of data for multiple tickers."""
         # Mock API responses for multiple symbols
-        mock_responses = []
+        payloads = {}
         for symbol in self.sample_symbols:
-            mock_response = Mock()
-            response_data = self.sample_single_response.copy()
+            response_data = copy.deepcopy(self.sample_single_response)
             response_data["Meta Data"]["2. Symbol"] = symbol
             response_data["Time Series (Daily)"] = {
                 "2024-01-15": {
@@ -149,10 +168,9 @@ class TestFetchStockSummaryTool(unittest.TestCase):
                     "5. volume": "1000000"
                 }
             }
-            mock_response.json.return_value = response_data
-            mock_responses.append(mock_response)
+            payloads[symbol] = response_data
         
-        mock_get.side_effect = mock_responses
+        mock_get.side_effect = _respond_by("symbol", payloads)
         
         with patch.dict(os.environ, {'ALPHA_VANTAGE_API_KEY': 'test_key'}):
             result = self.tool.return_all_stock_data(self.sample_symbols)
@@ -167,26 +185,22 @@ class TestFetchStockSummaryTool(unittest.TestCase):
             self.assertIsInstance(result[symbol], dict)
             self.assertEqual(result[symbol]['symbol'], symbol)
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_multiple_ticker_partial_failure(self, mock_get):
         """Test handling of partial failures in multiple ticker fetch."""
         # Mock responses: first two succeed, third fails
-        mock_responses = []
+        payloads = {}
         
         # Success responses for first two symbols
         for symbol in self.sample_symbols[:2]:
-            mock_response = Mock()
-            response_data = self.sample_single_response.copy()
+            response_data = copy.deepcopy(self.sample_single_response)
             response_data["Meta Data"]["2. Symbol"] = symbol
-            mock_response.json.return_value = response_data
-            mock_responses.append(mock_response)
+            payloads[symbol] = response_data
         
         # Error response for third symbol
-        error_response = Mock()
-        error_response.json.return_value = {"Error Message": "Invalid symbol"}
-        mock_responses.append(error_response)
+        payloads[self.sample_symbols[2]] = {"Error Message": "Invalid symbol"}
         
-        mock_get.side_effect = mock_responses
+        mock_get.side_effect = _respond_by("symbol", payloads)
         
         with patch.dict(os.environ, {'ALPHA_VANTAGE_API_KEY': 'test_key'}):
             result = self.tool.return_all_stock_data(self.sample_symbols)
@@ -231,6 +245,172 @@ class TestFetchStockSummaryTool(unittest.TestCase):
                 self.assertIn(symbol, parsed_result)
 
 
+class TestCurrentQuotes(unittest.TestCase):
+    """current=True quotes are batched through REALTIME_BULK_QUOTES."""
+
+    def setUp(self):
+        self.tool = FetchStockSummaryTool()
+        patcher = patch('src.sp_stock_agent.tools.alpha_vantage_api_tool._bulk_quotes_unavailable', False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def _bulk_row(symbol, close):
+        return {
+            "symbol": symbol, "timestamp": "2024-01-15 16:00:00.000", "open": "1.0",
+            "high": "2.0", "low": "0.5", "close": str(close), "volume": "100",
+        }
+
+    @patch('requests.Session.get')
+    def test_bulk_quotes_single_request(self, mock_get):
+        """Many symbols cost a single bulk request."""
+        mock_response = Mock()
+        mock_response.json.return_value = {"data": [self._bulk_row("AAPL", 185.1), self._bulk_row("MSFT", 390.2)]}
+        mock_get.return_value = mock_response
+
+        with patch.dict(os.environ, {'ALPHA_VANTAGE_API_KEY': 'test_key'}):
+            result = json.loads(self.tool._run(["AAPL", "MSFT"], current=True))
+
+        mock_get.assert_called_once()
+        params = mock_get.call_args[1]['params']
+        self.assertEqual(params['function'], "REALTIME_BULK_QUOTES")
+        self.assertEqual(params['symbol'], "AAPL,MSFT")
+        self.assertEqual(result["MSFT"]["current_price"], 390.2)
+        self.assertEqual(result["AAPL"]["ohlc"]["volume"], 100)
+
+    @patch('requests.Session.get')
+    def test_falls_back_to_global_quote(self, mock_get):
+        """Without bulk access each symbol is fetched via GLOBAL_QUOTE."""
+        def _respond(url, params=None, **kwargs):
+            response = Mock()
+            if params['function'] == "REALTIME_BULK_QUOTES":
+                response.json.return_value = {"message": "This is a premium endpoint."}
+            else:
+                response.json.return_value = {"Global Quote": {
+                    "01. symbol": params['symbol'], "02. open": "1.0", "03. high": "2.0", "04. low": "0.5",
+                    "05. price": "1.5", "06. volume": "100", "07. latest trading day": "2024-01-15",
+                }}
+            return response
+        mock_get.side_effect = _respond
+
+        result = self.tool.fetch_current_prices(["AAPL", "MSFT"], "test_key")
+
+        functions = sorted(c[1]['params']['function'] for c in mock_get.call_args_list)
+        self.assertEqual(functions, ["GLOBAL_QUOTE", "GLOBAL_QUOTE", "REALTIME_BULK_QUOTES"])
+        self.assertEqual(list(result), ["AAPL", "MSFT"])
+        self.assertEqual(result["AAPL"]["timestamp"], "2024-01-15")
+
+    @staticmethod
+    def _quote_responder(bulk_payload):
+        def _respond(url, params=None, **kwargs):
+            response = Mock()
+            if params['function'] == "REALTIME_BULK_QUOTES":
+                response.json.return_value = bulk_payload
+            else:
+                response.json.return_value = {"Global Quote": {
+                    "01. symbol": params['symbol'], "02. open": "1.0", "03. high": "2.0", "04. low": "0.5",
+                    "05. price": "1.5", "06. volume": "100", "07. latest trading day": "2024-01-15",
+                }}
+            return response
+        return _respond
+
+    @patch('requests.Session.get')
+    def test_transient_bulk_failure_only_affects_that_call(self, mock_get):
+        """An empty bulk answer falls back for that chunk but keeps bulk quotes enabled."""
+        from src.sp_stock_agent.tools import alpha_vantage_api_tool
+
+        mock_get.side_effect = self._quote_responder({"data": []})
+        result = self.tool.fetch_current_prices(["AAPL", "MSFT"], "test_key")
+        self.assertEqual(list(result), ["AAPL", "MSFT"])
+        self.assertFalse(alpha_vantage_api_tool._bulk_quotes_unavailable)
+
+        mock_get.side_effect = self._quote_responder({"message": "This is a premium endpoint."})
+        self.tool.fetch_current_prices(["NVDA", "TSLA"], "test_key")
+        self.assertTrue(alpha_vantage_api_tool._bulk_quotes_unavailable)
+
+    @patch('requests.Session.get')
+    def test_single_symbol_uses_latest_intraday_bar(self, mock_get):
+        """One symbol keeps the intraday path instead of GLOBAL_QUOTE's daily bar."""
+        mock_response = Mock()
+        mock_response.json.return_value = {"Time Series (1min)": {
+            "2024-01-15 15:58:00": {"1. open": "1.0", "2. high": "2.0", "3. low": "0.5", "4. close": "1.2", "5. volume": "10"},
+            "2024-01-15 15:59:00": {"1. open": "1.2", "2. high": "2.0", "3. low": "0.5", "4. close": "1.4", "5. volume": "20"},
+        }}
+        mock_get.return_value = mock_response
+
+        result = self.tool.fetch_current_prices(["AAPL"], "test_key")
+
+        mock_get.assert_called_once()
+        self.assertEqual(mock_get.call_args[1]['params']['function'], "TIME_SERIES_INTRADAY")
+        self.assertEqual(result["AAPL"]["timestamp"], "2024-01-15 15:59:00")
+        self.assertEqual(result["AAPL"]["current_price"], 1.4)
+
+
+class TestMarketDataSnapshot(unittest.TestCase):
+    """The freshness check's data is reused by fetch_stock_summary."""
+
+    def tearDown(self):
+        use_market_data_snapshot(None)
+
+    def test_freshness_check_fills_snapshot(self):
+        """validate_daily_data_freshness records each fetched summary."""
+        summary = {"symbol": "AAPL", "last_updated": "2024-01-15", "daily_data": {}}
+        with patch.object(FetchStockSummaryTool, 'fetch_single_stock', return_value=summary):
+            snapshot = {}
+            stale = validate_daily_data_freshness(["AAPL"], "2024-01-15", api_key="test_key", snapshot=snapshot)
+
+        self.assertEqual(stale, {})
+        self.assertEqual(snapshot, {"AAPL": summary})
+
+    @patch('requests.Session.get')
+    def test_snapshot_served_without_network(self, mock_get):
+        """Daily requests for snapshot symbols never reach Alpha Vantage."""
+        summary = {"symbol": "AAPL", "last_updated": "2024-01-15", "daily_data": {}, "rsi": {"2024-01-15": 55.0}}
+        use_market_data_snapshot({"AAPL": summary})
+
+        result = FetchStockSummaryTool().fetch_single_stock("aapl", "test_key")
+
+        mock_get.assert_not_called()
+        self.assertEqual(result, summary)
+        result["last_updated"] = "mutated"
+        self.assertEqual(FetchStockSummaryTool().fetch_single_stock("AAPL", "test_key")["last_updated"], "2024-01-15")
+
+
+    @patch('requests.Session.get')
+    def test_snapshot_rsi_filled_once(self, mock_get):
+        """A probe-only snapshot entry gets its RSI fetched once, then reused."""
+        mock_response = Mock()
+        mock_response.json.return_value = {"Technical Analysis: RSI": {"2024-01-15": {"RSI": "61.5"}}}
+        mock_get.return_value = mock_response
+        use_market_data_snapshot({"AAPL": {"symbol": "AAPL", "last_updated": "2024-01-15", "daily_data": {}}})
+
+        tool = FetchStockSummaryTool()
+        first = tool.fetch_single_stock("AAPL", "test_key")
+        second = tool.fetch_single_stock("AAPL", "test_key")
+
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(mock_get.call_args[1]['params']['function'], "RSI")
+        self.assertEqual(first["rsi"], {"2024-01-15": 61.5})
+        self.assertEqual(second["rsi"], {"2024-01-15": 61.5})
+
+    @patch('requests.Session.get')
+    def test_freshness_probe_skips_rsi(self, mock_get):
+        """The freshness gate issues one daily request per symbol and no RSI call."""
+        mock_response = Mock()
+        mock_response.json.return_value = {
+            "Time Series (Daily)": {
+                "2024-01-15": {"1. open": "1", "2. high": "2", "3. low": "0.5", "4. close": "1.5", "5. volume": "10"}
+            }
+        }
+        mock_get.return_value = mock_response
+
+        stale = validate_daily_data_freshness(["AAPL", "MSFT"], "2024-01-15", api_key="test_key")
+
+        self.assertEqual(stale, {})
+        functions = [c[1]['params']['function'] for c in mock_get.call_args_list]
+        self.assertEqual(functions, ["TIME_SERIES_DAILY", "TIME_SERIES_DAILY"])
+
+
 class TestNewsSentimentTool(unittest.TestCase):
     """Test cases for NewsSentimentTool - single and multiple ticker scenarios."""
     
@@ -276,7 +456,7 @@ class TestNewsSentimentTool(unittest.TestCase):
         self.assertEqual(self.tool.name, "alpha_vantage_news_sentiment")
         self.assertIn("Query Alpha Vantage's NEWS_SENTIMENT", self.tool.description)
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_single_ticker_news_fetch(self, mock_get):
         """Test fetching news for a single ticker."""
         # Mock API response
@@ -299,7 +479,7 @@ class TestNewsSentimentTool(unittest.TestCase):
         self.assertIn('feed', result)
         self.assertEqual(len(result['feed']), 1)
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_multiple_ticker_news_fetch(self, mock_get):
         """Test fetching news for multiple tickers."""
         # Mock API response
@@ -317,6 +497,38 @@ class TestNewsSentimentTool(unittest.TestCase):
         self.assertIn('tickers', call_args[1]['params'])
         self.assertEqual(call_args[1]['params']['tickers'], ','.join(self.sample_tickers))
     
+    @patch('requests.Session.get')
+    def test_per_ticker_requests_overlap_and_merge_in_order(self, mock_get):
+        """Per-ticker requests run concurrently; the merged feed keeps ticker order."""
+        feeds = {
+            "AAPL": [{"url": "u/shared", "title": "a1"}, {"url": "u/aapl", "title": "a2"}],
+            "MSFT": [{"url": "u/msft", "title": "m1"}, {"url": "u/shared", "title": "dup"}],
+            "GOOGL": [{"url": "u/googl", "title": "g1"}],
+        }
+        delays = {"AAPL": 0.15, "MSFT": 0.05, "GOOGL": 0.0}  # finish in reverse order
+        active, peak = [0], [0]
+        lock = threading.Lock()
+
+        def _get(url, params=None, **kwargs):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(delays[params["tickers"]])
+            with lock:
+                active[0] -= 1
+            response = Mock()
+            response.json.return_value = {"feed": feeds[params["tickers"]]}
+            return response
+        mock_get.side_effect = _get
+
+        with patch.dict(os.environ, {'ALPHA_VANTAGE_API_KEY': 'test_key'}):
+            result = self.tool._run(self.sample_tickers)
+
+        self.assertGreater(peak[0], 1)
+        self.assertEqual([a["title"] for a in result["feed"]], ["a1", "a2", "m1", "g1"])
+        self.assertEqual(list(result["by_ticker"]), self.sample_tickers)
+        self.assertEqual(result["items"], "4")
+
     def test_parse_response_success(self):
         """Test parsing of successful API response."""
         # 补全mock数据，ticker_sentiment里加overall_sentiment_score
@@ -369,7 +581,7 @@ class TestNewsSentimentTool(unittest.TestCase):
     
     def test_time_parameter_handling(self):
         """Test handling of time_from and time_to parameters."""
-        with patch('requests.get') as mock_get:
+        with patch('requests.Session.get') as mock_get:
             mock_response = Mock()
             mock_response.json.return_value = self.sample_news_response
             mock_response.raise_for_status.return_value = None
@@ -389,6 +601,55 @@ class TestNewsSentimentTool(unittest.TestCase):
             self.assertEqual(params['time_to'], "20240115T235959")
 
 
+class TestNewsDigest(unittest.TestCase):
+    """Token-budgeted digest of a merged news feed."""
+
+    def _article(self, title, ticker_scores, summary="x" * 400):
+        return {
+            "title": title,
+            "url": f"https://example.com/{title}",
+            "time_published": "20240115T143000",
+            "source": "Reuters",
+            "summary": summary,
+            "ticker_sentiment": [
+                {"ticker": t, "relevance_score": str(r), "ticker_sentiment_score": "0.25",
+                 "ticker_sentiment_label": "Somewhat-Bullish"}
+                for t, r in ticker_scores.items()
+            ],
+        }
+
+    def test_ranked_by_ticker_relevance_with_truncated_summaries(self):
+        feed = [
+            self._article("low", {"AAPL": 0.1, "MSFT": 0.9}),
+            self._article("high", {"AAPL": 0.8}),
+        ]
+        digest = build_news_digest({"feed": feed}, ["AAPL", "MSFT"], token_budget=10_000, summary_chars=50)
+
+        aapl = digest.split("### MSFT")[0]
+        self.assertLess(aapl.index("high:"), aapl.index("low:"))
+        self.assertIn("### MSFT (1 articles)", digest)
+        self.assertNotIn("x" * 51, digest)
+
+    def test_budget_is_shared_round_robin(self):
+        feed = [self._article(f"a{i}", {"AAPL": 0.9 - i / 100}) for i in range(20)]
+        feed.append(self._article("m0", {"MSFT": 0.5}))
+        digest = build_news_digest({"feed": feed}, ["AAPL", "MSFT"], token_budget=200, summary_chars=40)
+
+        self.assertLessEqual(len(digest) / 4, 260)
+        self.assertIn("m0:", digest)
+        self.assertIn("omitted to fit the token budget", digest)
+
+    @patch('requests.Session.get')
+    def test_run_returns_digest_when_requested(self, mock_get):
+        response = Mock()
+        response.json.return_value = {"feed": [self._article("only", {"AAPL": 0.7})]}
+        mock_get.return_value = response
+        with patch.dict(os.environ, {'ALPHA_VANTAGE_API_KEY': 'test_key'}):
+            digest = NewsSentimentTool()._run("AAPL", digest=True)
+        self.assertIsInstance(digest, str)
+        self.assertIn("| 0.70 |", digest)
+
+
 class TestEarningsCallTranscriptTool(unittest.TestCase):
     """Test cases for EarningsCallTranscriptTool."""
     
@@ -410,7 +671,7 @@ class TestEarningsCallTranscriptTool(unittest.TestCase):
         self.assertEqual(self.tool.name, "alpha_vantage_earnings_transcript")
         self.assertIn("Call Alpha Vantage's EARNINGS_CALL_TRANSCRIPT", self.tool.description)
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_transcript_fetch_success(self, mock_get):
         """Test successful fetching of earnings call transcript."""
         # Mock API response
@@ -436,7 +697,7 @@ class TestEarningsCallTranscriptTool(unittest.TestCase):
         self.assertEqual(result['quarter'], self.sample_quarter)
         self.assertIn('transcript', result)
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_transcript_fetch_error(self, mock_get):
         """Test error handling for transcript fetch."""
         # Mock error response
@@ -483,16 +744,13 @@ class TestAlphavantageIntegration(unittest.TestCase):
         self.transcript_tool = EarningsCallTranscriptTool()
         self.sample_symbols = ["AAPL", "MSFT"]
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_full_analysis_workflow(self, mock_get):
         """Test a complete analysis workflow using multiple Alphavantage tools."""
-        # Mock responses for different API calls
-        mock_responses = []
-        
-        # Stock data responses
-        for symbol in self.sample_symbols:
-            stock_response = Mock()
-            stock_response.json.return_value = {
+        # Mock responses for different API calls, keyed by AV function
+        payloads = {
+            # Stock data responses
+            "TIME_SERIES_DAILY": {
                 "Time Series (Daily)": {
                     "2024-01-15": {
                         "1. open": "100.00",
@@ -502,31 +760,25 @@ class TestAlphavantageIntegration(unittest.TestCase):
                         "5. volume": "1000000"
                     }
                 }
-            }
-            mock_responses.append(stock_response)
-        
-        # News sentiment response
-        news_response = Mock()
-        news_response.json.return_value = {
-            "feed": [
-                {
-                    "title": "Tech Stocks Rally",
-                    "ticker_sentiment": [{"ticker": "AAPL", "overall_sentiment_score": "0.8"}]
-                }
-            ]
-        }
-        mock_responses.append(news_response)
-        
-        # Transcript response
-        transcript_response = Mock()
-        transcript_response.json.return_value = {
-            "symbol": "AAPL",
-            "quarter": "2024Q1",
-            "transcript": "Sample transcript content..."
+            },
+            # News sentiment response
+            "NEWS_SENTIMENT": {
+                "feed": [
+                    {
+                        "title": "Tech Stocks Rally",
+                        "ticker_sentiment": [{"ticker": "AAPL", "overall_sentiment_score": "0.8"}]
+                    }
+                ]
+            },
+            # Transcript response
+            "EARNINGS_CALL_TRANSCRIPT": {
+                "symbol": "AAPL",
+                "quarter": "2024Q1",
+                "transcript": "Sample transcript content..."
+            },
         }
-        mock_responses.append(transcript_response)
         
-        mock_get.side_effect = mock_responses
+        mock_get.side_effect = _respond_by("function", payloads)
         
         # Test the workflow
         with patch.dict(os.environ, {'ALPHA_VANTAGE_API_KEY': 'test_key'}):
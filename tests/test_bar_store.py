@@ -0,0 +1,190 @@
+"""
+Test cases for the on-disk OHLC bar store used by FetchStockSummaryTool.
+"""
+
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock, patch
+
+from src.sp_stock_agent.bar_store import BarStore
+from src.sp_stock_agent.market_calendar import US_EASTERN
+from src.sp_stock_agent.tools.alpha_vantage_api_tool import FetchStockSummaryTool, backfill_bars
+
+
+def _row(close: float) -> dict:
+    return {"open": close - 1, "high": close + 1, "low": close - 2, "close": close, "volume": 1000}
+
+
+def _av_daily(rows: dict) -> dict:
+    return {
+        "Time Series (Daily)": {
+            d: {
+                "1. open": str(r["open"]),
+                "2. high": str(r["high"]),
+                "3. low": str(r["low"]),
+                "4. close": str(r["close"]),
+                "5. volume": str(r["volume"]),
+            }
+            for d, r in rows.items()
+        }
+    }
+
+
+class TestBarStore(unittest.TestCase):
+    """Merge, tail and freshness behaviour of BarStore."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.store = BarStore(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_merge_persists_ascending_columns(self):
+        """Merged bars are stored oldest-first and survive a reload."""
+        self.store.merge("AAPL", "daily", {"2024-01-11": _row(11), "2024-01-10": _row(10)})
+
+        bars = BarStore(self._tmp.name).load("AAPL", "daily")
+        self.assertEqual(bars["date"], ["2024-01-10", "2024-01-11"])
+        self.assertEqual(bars["close"], [10, 11])
+        self.assertTrue(os.path.exists(self.store.path("AAPL", "daily")))
+
+    def test_merge_appends_tail_and_drops_superseded_bars(self):
+        """A new tail overrides overlapping bars and drops obsolete partial keys."""
+        self.store.merge("AAPL", "weekly", {"2023-12-29": _row(1), "2024-01-05": _row(5), "2024-01-10": _row(9)})
+        bars = self.store.merge("AAPL", "weekly", {"2024-01-05": _row(6), "2024-01-12": _row(12)})
+        self.assertEqual(bars["date"], ["2023-12-29", "2024-01-05", "2024-01-12"])
+        self.assertEqual(bars["close"], [1, 6, 12])
+
+    def test_merge_discards_history_before_gap(self):
+        """History that ends before the new tail starts is not stitched on."""
+        self.store.merge("AAPL", "daily", {"2024-01-02": _row(2)})
+        bars = self.store.merge("AAPL", "daily", {"2024-03-01": _row(3)})
+        self.assertEqual(bars["date"], ["2024-03-01"])
+
+    def test_full_history_flag_survives_contiguous_top_up(self):
+        self.store.merge("AAPL", "daily", {"2024-01-02": _row(2), "2024-01-03": _row(3)}, full=True)
+        bars = self.store.merge("AAPL", "daily", {"2024-01-03": _row(3), "2024-01-04": _row(4)})
+        self.assertTrue(bars["full_history"])
+        bars = self.store.merge("AAPL", "daily", {"2024-03-01": _row(5)})
+        self.assertFalse(bars["full_history"])
+
+    def test_tail_is_newest_first(self):
+        bars = self.store.merge("AAPL", "daily", {f"2024-01-0{i}": _row(i) for i in range(2, 9)})
+        tail = self.store.tail(bars, 3)
+        self.assertEqual([d for d, _ in tail], ["2024-01-08", "2024-01-07", "2024-01-06"])
+
+    def test_is_current_requires_settled_bar(self):
+        """A bar counts as current only if fetched after its session closed."""
+        as_of = datetime(2024, 1, 12, 21, 0, tzinfo=US_EASTERN)  # Friday evening
+        bars = {"date": ["2024-01-12"], "fetched_at": as_of.astimezone(timezone.utc).isoformat()}
+        self.assertTrue(self.store.is_current(bars, as_of))
+
+        intraday = (as_of - timedelta(hours=8)).astimezone(timezone.utc).isoformat()
+        self.assertFalse(self.store.is_current({"date": ["2024-01-12"], "fetched_at": intraday}, as_of))
+        self.assertFalse(self.store.is_current({"date": ["2024-01-11"], "fetched_at": bars["fetched_at"]}, as_of))
+
+
+class TestFetchStockSummaryToolBarStore(unittest.TestCase):
+    """FetchStockSummaryTool reads the bar store before calling Alpha Vantage."""
+
+    @patch("requests.Session.get")
+    def test_current_store_skips_daily_request(self, mock_get):
+        tool = FetchStockSummaryTool()
+        rows = {f"2024-01-{d:02d}": _row(d) for d in range(2, 13)}
+        BarStore().merge("AAPL", "daily", rows)
+
+        rsi_response = Mock()
+        rsi_response.json.return_value = {}
+        mock_get.return_value = rsi_response
+
+        with patch.object(BarStore, "is_current", return_value=True):
+            result = tool.fetch_single_stock("AAPL", "test_key")
+
+        requested = [c.kwargs["params"]["function"] for c in mock_get.call_args_list]
+        self.assertNotIn("TIME_SERIES_DAILY", requested)
+        self.assertEqual(result["last_updated"], "2024-01-12")
+        self.assertEqual(len(result["daily_data"]), 5)
+
+    @patch("requests.Session.get")
+    def test_rsi_computed_from_stored_closes(self, mock_get):
+        """With enough stored history no request is made at all, RSI included."""
+        rows = {f"2024-02-{d:02d}": _row(100 + (d % 3)) for d in range(1, 29)}
+        BarStore().merge("AAPL", "daily", rows)
+
+        with patch.object(BarStore, "is_current", return_value=True):
+            result = FetchStockSummaryTool().fetch_single_stock("AAPL", "test_key")
+
+        mock_get.assert_not_called()
+        self.assertEqual(list(result["rsi"]), ["2024-02-28"])
+        self.assertIn("macd", result["indicators"])
+
+    @patch("requests.Session.get")
+    def test_stale_store_is_topped_up(self, mock_get):
+        tool = FetchStockSummaryTool()
+        BarStore().merge("AAPL", "daily", {"2024-01-10": _row(10), "2024-01-11": _row(11)})
+
+        daily_response = Mock()
+        daily_response.json.return_value = _av_daily({"2024-01-11": _row(11), "2024-01-12": _row(12)})
+        rsi_response = Mock()
+        rsi_response.json.return_value = {}
+        mock_get.side_effect = [daily_response, rsi_response]
+
+        result = tool.fetch_single_stock("AAPL", "test_key")
+
+        self.assertEqual(list(result["daily_data"]), ["2024-01-12", "2024-01-11", "2024-01-10"])
+        self.assertEqual(BarStore().latest_date("AAPL"), "2024-01-12")
+
+
+
+class TestBackfill(unittest.TestCase):
+    """Full history once per symbol, compact tails afterwards."""
+
+    def _daily(self, rows):
+        response = Mock()
+        response.json.return_value = _av_daily(rows)
+        return response
+
+    @patch("requests.Session.get")
+    def test_first_run_full_then_compact_then_nothing(self, mock_get):
+        history = {f"2024-01-{d:02d}": _row(d) for d in range(2, 12)}
+        mock_get.return_value = self._daily(history)
+        self.assertEqual(backfill_bars(["AAPL", "MSFT"], "test_key"), {"AAPL": "full", "MSFT": "full"})
+        self.assertEqual({c.kwargs["params"]["outputsize"] for c in mock_get.call_args_list}, {"full"})
+        self.assertTrue(BarStore().load("AAPL")["full_history"])
+
+        mock_get.reset_mock()
+        mock_get.return_value = self._daily({"2024-01-11": _row(11), "2024-01-12": _row(12)})
+        with patch("src.sp_stock_agent.tools.alpha_vantage_api_tool._COMPACT_SPAN_DAYS", 36500):
+            self.assertEqual(backfill_bars(["AAPL"], "test_key"), {"AAPL": "compact"})
+        self.assertEqual(mock_get.call_args.kwargs["params"]["outputsize"], "compact")
+        bars = BarStore().load("AAPL")
+        self.assertEqual(bars["date"][0], "2024-01-02")
+        self.assertEqual(bars["date"][-1], "2024-01-12")
+
+        mock_get.reset_mock()
+        with patch.object(BarStore, "is_current", return_value=True):
+            self.assertEqual(backfill_bars(["AAPL"], "test_key"), {"AAPL": "current"})
+        mock_get.assert_not_called()
+
+    @patch("requests.Session.get")
+    def test_compact_only_store_gets_full_history(self, mock_get):
+        """Bars stored by the tool's compact top-ups still trigger one full download."""
+        BarStore().merge("AAPL", "daily", {"2024-01-11": _row(11)})
+        mock_get.return_value = self._daily({"2024-01-10": _row(10), "2024-01-11": _row(11)})
+        with patch.object(BarStore, "is_current", return_value=True):
+            self.assertEqual(backfill_bars(["AAPL"], "test_key"), {"AAPL": "full"})
+
+    @patch("requests.Session.get")
+    def test_errors_are_reported_per_symbol(self, mock_get):
+        bad = Mock()
+        bad.json.return_value = {"Error Message": "Invalid API call."}
+        mock_get.return_value = bad
+        outcome = backfill_bars(["NOPE"], "test_key")
+        self.assertTrue(outcome["NOPE"].startswith("error"))
+
+
+if __name__ == '__main__':
+    unittest.main()
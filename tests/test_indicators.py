@@ -0,0 +1,57 @@
+"""
+Test cases for the locally computed technical indicators.
+"""
+
+import math
+import unittest
+
+from src.sp_stock_agent.indicators import atr, bollinger, ema, latest_indicators, macd, rsi, sma
+
+# Wilder's RSI worked example (StockCharts "RSI" ChartSchool article).
+CLOSES = [
+    44.34, 44.09, 44.15, 43.61, 44.33, 44.83, 45.10, 45.42, 45.84, 46.08, 45.89,
+    46.03, 45.61, 46.28, 46.28, 46.00, 46.03, 46.41, 46.22, 45.64, 46.21, 46.25,
+    45.71, 46.45, 45.78, 45.35, 44.03, 44.18, 44.22, 44.57, 43.42, 42.66, 43.13,
+]
+PUBLISHED_RSI = [70.53, 66.32, 66.55, 69.41, 66.36, 57.97, 62.93, 63.26, 56.06, 62.38]
+
+
+class TestIndicators(unittest.TestCase):
+    """Indicator values against published references and closed forms."""
+
+    def test_rsi_matches_published_values(self):
+        """Wilder RSI-14 matches the published example within rounding."""
+        values = rsi(CLOSES, 14)
+        self.assertTrue(all(math.isnan(v) for v in values[:14]))
+        for got, expected in zip(values[14:], PUBLISHED_RSI):
+            self.assertAlmostEqual(got, expected, delta=0.1)
+
+    def test_rsi_without_losses_is_100(self):
+        self.assertEqual(rsi(list(range(1, 20)), 14)[-1], 100.0)
+
+    def test_sma_and_ema(self):
+        values = [1, 2, 3, 4, 5, 6]
+        self.assertEqual(list(sma(values, 3)[2:]), [2.0, 3.0, 4.0, 5.0])
+        # Seeded with SMA(3) = 2, then alpha = 0.5.
+        self.assertEqual(list(ema(values, 3)[2:]), [2.0, 3.0, 4.0, 5.0])
+
+    def test_flat_series(self):
+        """A flat series has zero MACD, collapsed bands and constant ATR."""
+        flat = [10.0] * 40
+        self.assertAlmostEqual(macd(flat)["macd"][-1], 0.0)
+        self.assertAlmostEqual(macd(flat)["signal"][-1], 0.0)
+        bands = bollinger(flat)
+        self.assertEqual(bands["upper"][-1], bands["lower"][-1])
+        self.assertAlmostEqual(atr([11.0] * 40, [9.0] * 40, flat)[-1], 2.0)
+
+    def test_latest_indicators_short_history(self):
+        """Windows without enough history report None instead of a number."""
+        bars = {"date": ["2024-01-02", "2024-01-03"], "close": [1.0, 2.0], "high": [1.0, 2.0], "low": [1.0, 2.0]}
+        result = latest_indicators(bars)
+        self.assertEqual(result["date"], "2024-01-03")
+        self.assertIsNone(result["rsi_14"])
+        self.assertIsNone(result["macd"]["macd"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+"""
+Test cases for the lazy process-wide model registry and the news scraper's use of it.
+"""
+
+import threading
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+from src.sp_stock_agent import model_registry
+from src.sp_stock_agent.tools import serp_news_scraper
+from src.sp_stock_agent.tools.serp_news_scraper import NewsScraperTool
+
+
+class TestModelRegistry(unittest.TestCase):
+    """Models are built on first use, once, and shared."""
+
+    def tearDown(self):
+        model_registry.unload_models()
+
+    def test_factory_runs_on_first_use_only(self):
+        factory = Mock(return_value="model")
+        model_registry.register_model("test_lazy", factory)
+        factory.assert_not_called()
+
+        self.assertEqual(model_registry.get_model("test_lazy"), "model")
+        self.assertEqual(model_registry.get_model("test_lazy"), "model")
+        factory.assert_called_once()
+        self.assertTrue(model_registry.is_loaded("test_lazy"))
+
+    def test_concurrent_first_use_loads_once(self):
+        calls = []
+
+        def _slow_factory():
+            calls.append(1)
+            time.sleep(0.05)
+            return object()
+
+        model_registry.register_model("test_concurrent", _slow_factory)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(model_registry.get_model("test_concurrent")))
+                   for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len({id(r) for r in results}), 1)
+
+    def test_unknown_model(self):
+        with self.assertRaises(KeyError):
+            model_registry.get_model("does_not_exist")
+
+
+class TestNewsScraperLazyLoading(unittest.TestCase):
+    """Importing the scraper is cheap; keys and models are checked on use."""
+
+    def tearDown(self):
+        model_registry.unload_models()
+
+    def test_import_does_not_load_pipelines(self):
+        self.assertFalse(model_registry.is_loaded(serp_news_scraper.SUMMARIZER_MODEL))
+        self.assertFalse(model_registry.is_loaded(serp_news_scraper.CLASSIFIER_MODEL))
+
+    def test_missing_search_key_raises_on_use(self):
+        with patch.object(serp_news_scraper, "SERPAPI_KEY", None), \
+                patch.object(serp_news_scraper, "SERPER_KEY", None):
+            with self.assertRaises(EnvironmentError):
+                NewsScraperTool().fetch_articles("AAPL", 3)
+
+    def test_summarize_uses_registry_model(self):
+        summarizer = Mock(return_value=[{"summary_text": "short"}])
+        with patch.dict(model_registry._factories, {serp_news_scraper.SUMMARIZER_MODEL: lambda: summarizer}):
+            self.assertEqual(NewsScraperTool().summarize("long text " * 20), "short")
+        summarizer.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
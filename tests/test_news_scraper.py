@@ -0,0 +1,156 @@
+"""
+Test cases for concurrent article fetching and batched inference in NewsScraperTool.
+"""
+
+import threading
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+from src.sp_stock_agent import model_registry
+from src.sp_stock_agent.tools import serp_news_scraper
+from src.sp_stock_agent.tools.serp_news_scraper import NewsScraperTool, _length_buckets
+
+
+class TestNewsScraperBatching(unittest.TestCase):
+    """Summaries and sentiment are computed in length-bucketed batches."""
+
+    def setUp(self):
+        self.summarizer = Mock(side_effect=lambda batch, **kw: [{"summary_text": f"sum:{t[:3]}"} for t in batch])
+        self.classifier = Mock(side_effect=lambda batch, **kw: [{"label": "BULLISH", "score": 0.9} for _ in batch])
+        self._patch = patch.dict(model_registry._factories, {
+            serp_news_scraper.SUMMARIZER_MODEL: lambda: self.summarizer,
+            serp_news_scraper.CLASSIFIER_MODEL: lambda: self.classifier,
+        })
+        self._patch.start()
+        model_registry.unload_models()
+
+    def tearDown(self):
+        self._patch.stop()
+        model_registry.unload_models()
+
+    def test_length_buckets_group_similar_lengths(self):
+        texts = ["x" * n for n in (50, 5, 40, 10, 30)]
+        self.assertEqual(_length_buckets(texts, 2), [[1, 3], [4, 2], [0]])
+        self.assertEqual(_length_buckets(texts, 0), [[1], [3], [4], [2], [0]])
+
+    def test_run_batches_across_tickers_and_keeps_order(self):
+        tool = NewsScraperTool()
+        articles = {
+            "AAPL": [{"title": "a1", "link": "u/a1"}, {"title": "a2", "link": "u/a2"}],
+            "MSFT": [{"title": "m1", "link": "u/m1"}, {"title": "m2", "link": None}],
+        }
+        texts = {"u/a1": "aaa " * 400, "u/a2": "bbb " * 200, "u/m1": "ccc " * 300}
+
+        with patch.object(NewsScraperTool, "fetch_articles", side_effect=lambda t, n: articles[t]), \
+                patch.object(NewsScraperTool, "extract_text", side_effect=lambda url: texts[url]), \
+                patch.object(serp_news_scraper, "NEWS_MODEL_BATCH_SIZE", 8), \
+                patch("builtins.open"), patch("json.dump"):
+            results = tool._run(["AAPL", "MSFT"])
+
+        self.assertEqual([r["title"] for r in results], ["a1", "a2", "m1"])
+        self.assertEqual([r["summary"] for r in results], ["sum:aaa", "sum:bbb", "sum:ccc"])
+        self.assertEqual(self.summarizer.call_count, 1)
+        self.assertEqual(self.classifier.call_count, 1)
+        self.assertEqual(results[0]["sentiment"], {"label": "BULLISH", "score": 0.9})
+
+    def test_failed_batch_falls_back_to_single_items(self):
+        def _summarize(batch, **kw):
+            if isinstance(batch, list) and len(batch) > 1:
+                raise RuntimeError("OOM")
+            if "bad" in batch:
+                raise RuntimeError("bad input")
+            return [{"summary_text": "ok"}]
+        self.summarizer.side_effect = _summarize
+
+        summaries = NewsScraperTool().summarize_batch(["good text", "bad text"], batch_size=2)
+        self.assertEqual(summaries, ["ok", None])
+
+
+class TestNewsScraperFetching(unittest.TestCase):
+    """Article downloads overlap, within a per-host limit."""
+
+    def setUp(self):
+        self._patch = patch.dict(serp_news_scraper._host_slots, clear=True)
+        self._patch.start()
+
+    def tearDown(self):
+        self._patch.stop()
+
+    def _track(self, sleep=0.05):
+        state = {"active": {}, "peak": {}, "total": 0, "peak_total": 0}
+        lock = threading.Lock()
+
+        def download(article_self):
+            host = article_self.url.split("/")[2]
+            with lock:
+                state["active"][host] = state["active"].get(host, 0) + 1
+                state["total"] += 1
+                state["peak"][host] = max(state["peak"].get(host, 0), state["active"][host])
+                state["peak_total"] = max(state["peak_total"], state["total"])
+            time.sleep(sleep)
+            with lock:
+                state["active"][host] -= 1
+                state["total"] -= 1
+        return state, download
+
+    def test_downloads_overlap_within_per_host_limit(self):
+        state, download = self._track()
+        urls = [f"https://{host}/{i}" for host in ("a.com", "b.com") for i in range(4)]
+        articles = {"AAPL": [{"title": u, "link": u} for u in urls]}
+
+        with patch.object(NewsScraperTool, "fetch_articles", side_effect=lambda t, n: articles[t]), \
+                patch.object(serp_news_scraper.Article, "download", download), \
+                patch.object(serp_news_scraper.Article, "parse"), \
+                patch.object(serp_news_scraper, "NEWS_FETCH_WORKERS", 8), \
+                patch.object(serp_news_scraper, "NEWS_FETCH_PER_HOST", 2), \
+                patch.object(NewsScraperTool, "summarize_batch") as summarize, \
+                patch("builtins.open"), patch("json.dump"):
+            NewsScraperTool()._run(["AAPL"])
+
+        summarize.assert_not_called()  # parse is mocked, so every text is empty
+        self.assertEqual(state["peak"], {"a.com": 2, "b.com": 2})
+        self.assertEqual(state["peak_total"], 4)
+
+    def test_ready_batches_are_summarized_while_downloading(self):
+        articles = {"AAPL": [{"title": str(i), "link": f"https://h{i}.com/x"} for i in range(5)]}
+        with patch.object(NewsScraperTool, "fetch_articles", side_effect=lambda t, n: articles[t]), \
+                patch.object(NewsScraperTool, "extract_text", side_effect=lambda url: f"{url} " * 200), \
+                patch.object(NewsScraperTool, "summarize_batch", side_effect=lambda texts: [t[:8] for t in texts]) as summarize, \
+                patch.object(NewsScraperTool, "classify_batch", side_effect=lambda s: [{"label": "NEUTRAL", "score": 1.0}] * len(s)), \
+                patch.object(serp_news_scraper, "NEWS_MODEL_BATCH_SIZE", 2), \
+                patch("builtins.open"), patch("json.dump"):
+            results = NewsScraperTool()._run(["AAPL"])
+
+        self.assertEqual([len(c.args[0]) for c in summarize.call_args_list], [2, 2, 1])
+        self.assertEqual([r["title"] for r in results], ["0", "1", "2", "3", "4"])
+
+    def _run_with_texts(self, texts, **kwargs):
+        articles = {"AAPL": [{"title": url, "link": url} for url in texts]}
+        with patch.object(NewsScraperTool, "fetch_articles", side_effect=lambda t, n: articles[t]), \
+                patch.object(NewsScraperTool, "extract_text", side_effect=lambda url: texts[url]), \
+                patch.object(NewsScraperTool, "summarize_batch", side_effect=lambda t: ["model summary"] * len(t)) as summarize, \
+                patch.object(NewsScraperTool, "classify_batch", side_effect=lambda s: [{"label": "NEUTRAL", "score": 1.0}] * len(s)) as classify, \
+                patch.object(serp_news_scraper, "NEWS_LEAD_WORDS", 20), \
+                patch("builtins.open"), patch("json.dump"):
+            results = NewsScraperTool()._run(["AAPL"], **kwargs)
+        return results, summarize, classify
+
+    def test_short_articles_skip_the_summarizer(self):
+        short = "Shares rose after the company beat estimates and raised guidance."
+        results, summarize, classify = self._run_with_texts({"u/short": short, "u/long": "word " * 500})
+
+        self.assertEqual(summarize.call_args[0][0], ["word " * 500])
+        self.assertEqual(classify.call_args[0][0], [short, "model summary"])
+        self.assertEqual([r["summarized"] for r in results], [False, True])
+
+    def test_sentiment_only_classifies_lead_text(self):
+        results, summarize, classify = self._run_with_texts({"u/long": "word " * 500}, sentiment_only=True)
+
+        summarize.assert_not_called()
+        self.assertEqual(classify.call_args[0][0], [" ".join(["word"] * 20)])
+        self.assertFalse(results[0]["summarized"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+"""
+Test cases for the vectorized per-ticker news sentiment aggregation.
+"""
+
+import os
+import unittest
+from datetime import datetime
+from unittest.mock import Mock, patch
+
+from src.sp_stock_agent.news_sentiment import aggregate_ticker_sentiment, sentiment_label
+from src.sp_stock_agent.tools.av_news_api_tool import NewsSentimentTool
+
+
+def _article(published: str, **scores) -> dict:
+    return {
+        "title": published,
+        "url": f"https://example.com/{published}",
+        "time_published": published,
+        "ticker_sentiment": [
+            {"ticker": t, "relevance_score": str(r), "ticker_sentiment_score": str(s)}
+            for t, (r, s) in scores.items()
+        ],
+    }
+
+
+class TestAggregateTickerSentiment(unittest.TestCase):
+    """Weighted mean, dispersion, count and decay per ticker."""
+
+    def test_relevance_weighted_mean_and_std(self):
+        feed = [
+            _article("20240115T120000", AAPL=(0.75, 0.4), MSFT=(0.5, -0.2)),
+            _article("20240115T120000", AAPL=(0.25, -0.4)),
+        ]
+        agg = aggregate_ticker_sentiment(feed, ["AAPL", "MSFT", "TSLA"])
+
+        self.assertEqual(agg["AAPL"]["count"], 2)
+        self.assertAlmostEqual(agg["AAPL"]["mean"], 0.2)  # (0.75*0.4 - 0.25*0.4) / 1.0
+        # weighted variance: 0.75*0.2^2 + 0.25*0.6^2 = 0.12
+        self.assertAlmostEqual(agg["AAPL"]["std"], 0.3464, places=4)
+        self.assertEqual(agg["AAPL"]["label"], "Somewhat-Bullish")
+        self.assertEqual(agg["MSFT"], {"count": 1, "mean": -0.2, "std": 0.0, "decayed": -0.2,
+                                       "label": "Somewhat-Bearish"})
+        self.assertEqual(agg["TSLA"], {"count": 0, "mean": None, "std": None, "decayed": None, "label": None})
+
+    def test_time_decay_favours_recent_articles(self):
+        feed = [
+            _article("20240115T120000", AAPL=(1.0, 0.5)),   # fresh
+            _article("20240115T000000", AAPL=(1.0, -0.5)),  # one half-life older
+        ]
+        agg = aggregate_ticker_sentiment(feed, ["AAPL"], as_of=datetime(2024, 1, 15, 12), half_life_hours=12)
+        self.assertAlmostEqual(agg["AAPL"]["mean"], 0.0)
+        self.assertAlmostEqual(agg["AAPL"]["decayed"], (0.5 - 0.25) / 1.5, places=4)
+
+    def test_labels_follow_alpha_vantage_thresholds(self):
+        self.assertEqual(
+            [sentiment_label(x) for x in (-0.5, -0.2, 0.0, 0.2, 0.5)],
+            ["Bearish", "Somewhat-Bearish", "Neutral", "Somewhat-Bullish", "Bullish"],
+        )
+
+    @patch('requests.Session.get')
+    def test_attached_to_tool_result(self, mock_get):
+        response = Mock()
+        response.json.return_value = {"feed": [_article("20240115T120000", AAPL=(0.9, 0.3))]}
+        mock_get.return_value = response
+        with patch.dict(os.environ, {'ALPHA_VANTAGE_API_KEY': 'test_key'}):
+            result = NewsSentimentTool()._run("AAPL")
+        self.assertEqual(result["sentiment"]["AAPL"]["count"], 1)
+        self.assertAlmostEqual(result["sentiment"]["AAPL"]["mean"], 0.3)
+
+    @patch('requests.Session.get')
+    def test_non_canonical_time_to_is_passed_through(self, mock_get):
+        response = Mock()
+        response.json.return_value = {"feed": [_article("20240115T120000", AAPL=(0.9, 0.3))]}
+        mock_get.return_value = response
+        with patch.dict(os.environ, {'ALPHA_VANTAGE_API_KEY': 'test_key'}):
+            result = NewsSentimentTool()._run("AAPL", time_from="20240114T0000", time_to="2024-01-15")
+        self.assertEqual(mock_get.call_args[1]["params"]["time_to"], "2024-01-15")
+        self.assertEqual(result["sentiment"]["AAPL"]["count"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+"""
+Test cases for the local news article store and its use by NewsSentimentTool.
+"""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+from src.sp_stock_agent.news_store import NewsStore
+from src.sp_stock_agent.tools.av_news_api_tool import NewsSentimentTool
+
+
+def _article(url: str, published: str, ticker: str = "AAPL") -> dict:
+    return {
+        "title": url,
+        "url": f"https://example.com/{url}",
+        "time_published": published,
+        "ticker_sentiment": [{"ticker": ticker, "relevance_score": "0.9", "ticker_sentiment_score": "0.1"}],
+    }
+
+
+class TestNewsStore(unittest.TestCase):
+    """Article persistence and coverage windows."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.store = NewsStore(os.path.join(self._tmp.name, "articles.sqlite"))
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_articles_are_filtered_by_ticker_and_window(self):
+        self.store.record("AAPL", [_article("a", "20240115T090000"), _article("b", "20240115T120000")],
+                          "20240115T0000", "20240115T1300")
+        self.store.record("MSFT", [_article("m", "20240115T100000", "MSFT")], "20240115T0000", "20240115T1300")
+
+        latest = self.store.articles("AAPL", "20240115T0000", "20240115T1300")
+        self.assertEqual([a["title"] for a in latest], ["b", "a"])
+        self.assertEqual([a["title"] for a in self.store.articles("AAPL", "20240115T1000", "20240115T1300")], ["b"])
+        earliest = self.store.articles("AAPL", "20240115T0000", "20240115T1300", sort="EARLIEST", limit=1)
+        self.assertEqual([a["title"] for a in earliest], ["a"])
+
+    def test_coverage_merges_adjacent_windows(self):
+        self.store.record("AAPL", [], "20240115T0000", "20240115T1200")
+        self.store.record("AAPL", [], "20240115T1200", "20240115T1800")
+        self.assertEqual(self.store.coverage("aapl"), ("20240115T0000", "20240115T1800"))
+
+        self.store.record("AAPL", [], "20240117T0000", "20240117T0100")
+        self.assertEqual(self.store.coverage("AAPL"), ("20240117T0000", "20240117T0100"))
+
+    def test_truncated_feed_only_covers_returned_span(self):
+        feed = [_article("b", "20240115T120000"), _article("a", "20240115T090000")]
+        self.store.record("AAPL", feed, "20240114T0000", "20240115T1300", sort="LATEST", truncated=True)
+        self.assertEqual(self.store.coverage("AAPL"), ("20240115T0900", "20240115T1300"))
+
+
+class TestNewsSentimentToolStore(unittest.TestCase):
+    """Repeat runs only request the window the store does not cover yet."""
+
+    def _response(self, feed):
+        response = Mock()
+        response.json.return_value = {"items": str(len(feed)), "feed": feed}
+        return response
+
+    @patch('requests.Session.get')
+    def test_repeat_run_fetches_only_the_new_window(self, mock_get):
+        tool = NewsSentimentTool()
+        mock_get.return_value = self._response([_article("old", "20240115T090000")])
+        with patch.dict(os.environ, {'ALPHA_VANTAGE_API_KEY': 'test_key'}):
+            first = tool._run("AAPL", time_from="20240115T0000", time_to="20240115T1200")
+        self.assertEqual([a["title"] for a in first["feed"]], ["old"])
+
+        mock_get.return_value = self._response([_article("new", "20240115T130000")])
+        with patch.dict(os.environ, {'ALPHA_VANTAGE_API_KEY': 'test_key'}):
+            second = tool._run("AAPL", time_from="20240115T0100", time_to="20240115T1400")
+
+        params = mock_get.call_args[1]["params"]
+        self.assertEqual((params["time_from"], params["time_to"]), ("20240115T1200", "20240115T1400"))
+        self.assertEqual([a["title"] for a in second["feed"]], ["new", "old"])
+
+    @patch('requests.Session.get')
+    def test_covered_window_needs_no_request(self, mock_get):
+        tool = NewsSentimentTool()
+        mock_get.return_value = self._response([_article("old", "20240115T090000")])
+        with patch.dict(os.environ, {'ALPHA_VANTAGE_API_KEY': 'test_key'}):
+            tool._run("AAPL", time_from="20240115T0000", time_to="20240115T1200")
+            mock_get.reset_mock()
+            result = tool._run("AAPL", time_from="20240115T0800", time_to="20240115T1200")
+
+        mock_get.assert_not_called()
+        self.assertEqual([a["title"] for a in result["feed"]], ["old"])
+
+    @patch('requests.Session.get')
+    def test_window_inside_coverage_stops_at_time_to(self, mock_get):
+        tool = NewsSentimentTool()
+        feed = [_article(f"h{h:02d}", f"20240115T{h:02d}3000") for h in range(23, -1, -1)]
+        mock_get.return_value = self._response(feed)
+        with patch.dict(os.environ, {'ALPHA_VANTAGE_API_KEY': 'test_key'}):
+            tool._run("AAPL", time_from="20240115T0000", time_to="20240115T2300")
+            mock_get.reset_mock()
+            result = tool._run("AAPL", time_from="20240115T0100", time_to="20240115T0300")
+
+        mock_get.assert_not_called()
+        self.assertEqual([a["title"] for a in result["feed"]], ["h02", "h01"])
+
+    @patch('requests.Session.get')
+    def test_topic_queries_bypass_coverage(self, mock_get):
+        tool = NewsSentimentTool()
+        mock_get.return_value = self._response([_article("old", "20240115T090000")])
+        with patch.dict(os.environ, {'ALPHA_VANTAGE_API_KEY': 'test_key'}):
+            tool._run("AAPL", time_from="20240115T0000", time_to="20240115T1200")
+            tool._run("AAPL", topics="earnings", time_from="20240115T0000", time_to="20240115T1200")
+
+        params = mock_get.call_args[1]["params"]
+        self.assertEqual((params["topics"], params["time_from"]), ("earnings", "20240115T0000"))
+
+
+if __name__ == '__main__':
+    unittest.main()
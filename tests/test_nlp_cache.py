@@ -0,0 +1,94 @@
+"""
+Test cases for the persistent summary/sentiment cache.
+"""
+
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+from src.sp_stock_agent import model_registry
+from src.sp_stock_agent.nlp_cache import NLPCache, content_hash
+from src.sp_stock_agent.tools import serp_news_scraper
+from src.sp_stock_agent.tools.serp_news_scraper import NewsScraperTool
+
+
+class TestNLPCache(unittest.TestCase):
+    """Keys, model separation, expiry and eviction."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = NLPCache(str(Path(self.tmp.name) / "nlp.sqlite"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_hash_ignores_whitespace(self):
+        self.assertEqual(content_hash("Apple  beats\nestimates"), content_hash(" Apple beats estimates "))
+        self.assertNotEqual(content_hash("Apple beats"), content_hash("Apple misses"))
+
+    def test_values_are_scoped_by_kind_and_model(self):
+        self.cache.put_many("sentiment", "finbert:x", {"h1": {"label": "BULLISH", "score": 0.9}})
+        self.assertEqual(self.cache.get_many("sentiment", "finbert:x", ["h1", "h2"]),
+                         {"h1": {"label": "BULLISH", "score": 0.9}})
+        self.assertEqual(self.cache.get_many("sentiment", "zero-shot:y", ["h1"]), {})
+        self.assertEqual(self.cache.get_many("summary", "finbert:x", ["h1"]), {})
+
+    def test_expired_entries_miss_and_are_pruned(self):
+        self.cache.put_many("summary", "m", {"old": "a"})
+        with patch("src.sp_stock_agent.nlp_cache.time.time", return_value=time.time() + 40 * 86400):
+            self.cache.put_many("summary", "m", {"new": "b"})
+            self.assertEqual(self.cache.get_many("summary", "m", ["old", "new"]), {"new": "b"})
+            self.assertEqual(self.cache.prune(), 1)
+        self.assertEqual(len(self.cache), 1)
+
+    def test_prune_keeps_most_recently_used(self):
+        for i in range(4):
+            with patch("src.sp_stock_agent.nlp_cache.time.time", return_value=1_000_000 + i):
+                self.cache.put_many("summary", "m", {f"h{i}": str(i)})
+        self.cache.max_age_sec = float("inf")
+        self.cache.get_many("summary", "m", ["h0"])  # touch the oldest
+        self.assertEqual(self.cache.prune(max_entries=2), 2)
+        self.assertEqual(set(self.cache.get_many("summary", "m", ["h0", "h1", "h2", "h3"])), {"h0", "h3"})
+
+
+class TestScraperUsesCache(unittest.TestCase):
+    """A repeated article skips summarization and classification."""
+
+    def setUp(self):
+        self.summarizer = Mock(side_effect=lambda batch, **kw: [{"summary_text": f"sum:{t[:3]}"} for t in batch])
+        self.classifier = Mock(side_effect=lambda batch, **kw: [{"label": "BEARISH", "score": 0.8} for _ in batch])
+        self._patch = patch.dict(model_registry._factories, {
+            serp_news_scraper.SUMMARIZER_MODEL: lambda: self.summarizer,
+            serp_news_scraper.CLASSIFIER_MODEL: lambda: self.classifier,
+        })
+        self._patch.start()
+        model_registry.unload_models()
+
+    def tearDown(self):
+        self._patch.stop()
+        model_registry.unload_models()
+
+    def test_second_batch_is_served_from_cache(self):
+        tool = NewsScraperTool()
+        texts = ["aaa" * 40, "bbb" * 40, "aaa" * 40]
+        self.assertEqual(tool.summarize_batch(texts), ["sum:aaa", "sum:bbb", "sum:aaa"])
+        self.assertEqual(len(self.summarizer.call_args[0][0]), 2)  # duplicate computed once
+
+        self.assertEqual(tool.summarize_batch(texts[:2]), ["sum:aaa", "sum:bbb"])
+        self.assertEqual(tool.classify_batch(["sum:aaa"]), [{"label": "BEARISH", "score": 0.8}])
+        self.assertEqual(tool.classify_batch(["sum:aaa"]), [{"label": "BEARISH", "score": 0.8}])
+        self.assertEqual(self.summarizer.call_count, 1)
+        self.assertEqual(self.classifier.call_count, 1)
+
+    def test_failures_are_not_cached(self):
+        self.classifier.side_effect = RuntimeError("boom")
+        tool = NewsScraperTool()
+        for _ in range(2):
+            self.assertEqual(tool.classify_batch(["sum:aaa"]), [{"label": "NEUTRAL", "score": 0.0}])
+        self.assertEqual(self.classifier.call_count, 4)  # batch + single retry, twice
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+"""
+Test cases for the shared HTTP response cache and its use by the Alpha Vantage client.
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock, patch
+
+from src.sp_stock_agent.market_calendar import next_session_close
+from src.sp_stock_agent.response_cache import ResponseCache, cache_key
+from src.sp_stock_agent.tools.alpha_vantage_client import AlphaVantageClient, TokenBucket, cache_expiry
+
+
+def _in(seconds: float) -> datetime:
+    return datetime.now(timezone.utc) + timedelta(seconds=seconds)
+
+
+class TestResponseCache(unittest.TestCase):
+    """Content addressing, expiry and counters."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ResponseCache(self.tmp.name, enabled=True)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_key_ignores_api_key_and_param_order(self):
+        a = cache_key("av", {"symbol": "AAPL", "function": "RSI", "apikey": "one"})
+        b = cache_key("av", {"function": "RSI", "symbol": "AAPL", "apikey": "two"})
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, cache_key("av", {"function": "RSI", "symbol": "MSFT"}))
+        self.assertNotEqual(a, cache_key("sec", {"function": "RSI", "symbol": "AAPL"}))
+
+    def _expire(self, endpoint, params):
+        path = self.cache.path(cache_key(endpoint, params))
+        entry = json.loads(path.read_text())
+        entry["expires_at"] = _in(-60).isoformat()
+        path.write_text(json.dumps(entry))
+        return path
+
+    def test_fresh_and_expired_entries(self):
+        params = {"function": "RSI", "symbol": "AAPL"}
+        self.cache.put("av", params, {"v": 1}, _in(60))
+        self.assertEqual(self.cache.get("av", params)["body"], {"v": 1})
+
+        # Expired entries are misses and are deleted on the way.
+        path = self._expire("av", params)
+        self.assertIsNone(self.cache.get("av", params))
+        self.assertFalse(path.exists())
+        self.assertEqual(self.cache.stats(), {"hits": 1, "misses": 1, "writes": 1})
+
+    def test_corrupt_entry_is_a_miss(self):
+        params = {"function": "RSI", "symbol": "AAPL"}
+        self.cache.put("av", params, {"v": 1}, _in(60))
+        self.cache.path(cache_key("av", params)).write_text("{not json")
+        self.assertIsNone(self.cache.get("av", params))
+
+    def test_prune_drops_expired_then_soonest_to_expire(self):
+        for symbol, ttl in (("AAPL", 60), ("MSFT", 3600), ("NVDA", 600), ("TSLA", 7200)):
+            self.cache.put("av", {"symbol": symbol}, {"v": "x" * 100}, _in(ttl))
+        os.utime(self.cache.path(cache_key("av", {"symbol": "NVDA"})), (1000, 1000))  # expired
+        size = self.cache.path(cache_key("av", {"symbol": "AAPL"})).stat().st_size
+
+        with patch.object(ResponseCache, "_read", side_effect=AssertionError("prune must not open entries")):
+            self.assertEqual(self.cache.prune(max_bytes=2 * size), 2)
+        remaining = {s for s in ("AAPL", "MSFT", "NVDA", "TSLA") if self.cache.get("av", {"symbol": s})}
+        self.assertEqual(remaining, {"MSFT", "TSLA"})
+
+    def test_disabled_cache_never_stores(self):
+        cache = ResponseCache(self.tmp.name, enabled=False)
+        cache.put("av", {"symbol": "AAPL"}, {"v": 1}, _in(60))
+        self.assertIsNone(cache.get("av", {"symbol": "AAPL"}))
+
+
+class TestAlphaVantageResponseCache(unittest.TestCase):
+    """The AV client reads through the response cache."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ResponseCache(self.tmp.name, enabled=True)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _client(self):
+        # A new client per "run": no in-memory memo carries over.
+        return AlphaVantageClient(bucket=TokenBucket(1000, 1000), memo_ttl=0, retry_deadline=0, cache=self.cache)
+
+    def _response(self, payload, status_code=200):
+        response = Mock(status_code=status_code)
+        response.json.return_value = payload
+        return response
+
+    @patch('requests.Session.get')
+    def test_second_run_is_served_from_disk(self, mock_get):
+        mock_get.return_value = self._response({"Global Quote": {"05. price": "1.0"}})
+        params = {"function": "GLOBAL_QUOTE", "symbol": "AAPL", "apikey": "k"}
+        first = self._client().get_json(params)
+        second = self._client().get_json(params)
+        self.assertEqual(first, second)
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(self.cache.stats()["hits"], 1)
+
+    @patch('requests.Session.get')
+    def test_error_payloads_are_not_cached(self, mock_get):
+        mock_get.return_value = self._response({"Error Message": "Invalid API call."})
+        params = {"function": "GLOBAL_QUOTE", "symbol": "BAD"}
+        self._client().get_json(params)
+        self._client().get_json(params)
+        self.assertEqual(mock_get.call_count, 2)
+
+    def test_daily_series_expiry(self):
+        params = {"function": "TIME_SERIES_DAILY", "symbol": "AAPL"}
+        settled = {"Meta Data": {"3. Last Refreshed": "2999-01-01"}}
+        self.assertEqual(cache_expiry(params, settled), next_session_close())
+
+        behind = {"Meta Data": {"3. Last Refreshed": "2000-01-03"}}
+        self.assertLess(cache_expiry(params, behind), _in(600))
+
+        quote = cache_expiry({"function": "GLOBAL_QUOTE"}, {})
+        self.assertLess(quote, _in(120))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,310 @@
+"""
+Test cases for the 10-K filing cache and index, concurrent prefetch and parsed-section cache.
+"""
+
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+from src.sp_stock_agent.tools import sec_10k_tool
+from src.sp_stock_agent.tools.sec_10k_tool import (
+    Sec10KTool,
+    current_filing,
+    download_10k_document,
+    latest_10k_metadata,
+    prefetch_10k,
+    sections_cache_key,
+)
+
+FILING = {
+    "cik": "320193", "accession_number": "0000320193-24-000123", "filing_date": "2024-11-01",
+    "form_type": "10-K", "primary_doc_url": "https://sec.gov/aapl-10k-2024.htm",
+}
+NEWER = {**FILING, "accession_number": "0000320193-25-000077", "filing_date": "2025-10-31",
+         "primary_doc_url": "https://sec.gov/aapl-10k-2025.htm"}
+
+
+def _update_index_repeatedly(root, symbol, times):
+    """Child process for ``TestFilingIndex.test_concurrent_processes_keep_every_entry``."""
+    sec_10k_tool.CACHE_DIR = root
+    sec_10k_tool.FILING_INDEX_PATH = os.path.join(root, "index.json")
+    for i in range(times):
+        sec_10k_tool._update_filing_index(symbol, {"updates": i + 1})
+
+
+class _CacheDirTestCase(unittest.TestCase):
+    """Points the 10-K cache, index and output at a temporary directory."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        self._patches = [
+            patch.object(sec_10k_tool, "CACHE_DIR", root),
+            patch.object(sec_10k_tool, "SECTIONS_CACHE_DIR", os.path.join(root, "sections")),
+            patch.object(sec_10k_tool, "FILING_INDEX_PATH", os.path.join(root, "index.json")),
+            patch.object(sec_10k_tool, "OUTPUT_DIR", os.path.join(root, "generated")),
+        ]
+        for p in self._patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self._patches:
+            p.stop()
+        self.tmp.cleanup()
+
+    def _index(self):
+        with open(os.path.join(self.tmp.name, "index.json")) as f:
+            return json.load(f)
+
+
+
+
+class TestSecDownload(unittest.TestCase):
+    """Every SEC request goes through the shared rate limiter."""
+
+    def setUp(self):
+        self.downloader = Mock()
+        self.bucket = Mock()
+        self._patches = [
+            patch.object(sec_10k_tool, "_sec_downloader", return_value=self.downloader),
+            patch.object(sec_10k_tool, "_sec_bucket", self.bucket),
+        ]
+        for p in self._patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self._patches:
+            p.stop()
+
+    def test_metadata_and_document_each_take_a_token(self):
+        self.downloader.get_filing_metadatas.return_value = [Mock(**FILING)]
+        self.downloader.download_filing.return_value = b"<html>10-K</html>"
+
+        self.assertEqual(latest_10k_metadata("AAPL"), FILING)
+        query = self.downloader.get_filing_metadatas.call_args[0][0]
+        self.assertEqual((query.ticker_or_cik, query.form_type, query.limit), ("AAPL", "10-K", 1))
+
+        self.assertEqual(download_10k_document(FILING["primary_doc_url"]), "<html>10-K</html>")
+        self.downloader.download_filing.assert_called_once_with(url=FILING["primary_doc_url"])
+        self.assertEqual(self.bucket.acquire.call_count, 2)
+
+    def test_missing_filing_raises(self):
+        self.downloader.get_filing_metadatas.return_value = []
+        with self.assertRaises(ValueError):
+            latest_10k_metadata("NOPE")
+
+
+class TestFilingIndex(_CacheDirTestCase):
+    """EDGAR metadata is checked at most daily; documents only when newer."""
+
+    def _load(self, metadata, document="<html>10-K</html>"):
+        with patch.object(sec_10k_tool, "latest_10k_metadata", **metadata) as check, \
+                patch.object(sec_10k_tool, "download_10k_document", return_value=document) as download:
+            result = Sec10KTool()._load_and_cache("AAPL")
+        return result, check, download
+
+    def _age_index(self, seconds):
+        index = self._index()
+        index["AAPL"]["checked_at"] -= seconds
+        with open(os.path.join(self.tmp.name, "index.json"), "w") as f:
+            json.dump(index, f)
+
+    def test_recent_check_skips_edgar(self):
+        self.assertEqual(self._load({"return_value": FILING})[0], (False, "<html>10-K</html>"))
+        result, check, download = self._load({"return_value": NEWER})
+        self.assertEqual(result, (True, "<html>10-K</html>"))
+        check.assert_not_called()
+        download.assert_not_called()
+        self.assertEqual(self._index()["AAPL"]["accession_number"], FILING["accession_number"])
+
+    def test_stale_check_with_same_filing_does_not_download(self):
+        self._load({"return_value": FILING})
+        self._age_index(2 * 24 * 3600)
+        result, check, download = self._load({"return_value": FILING})
+        self.assertEqual(result[0], True)
+        check.assert_called_once()
+        download.assert_not_called()
+
+    def test_newer_filing_replaces_cached_one(self):
+        self._load({"return_value": FILING}, "<html>2024</html>")
+        self._age_index(2 * 24 * 3600)
+        result, _, download = self._load({"return_value": NEWER}, "<html>2025</html>")
+
+        self.assertEqual(result, (False, "<html>2025</html>"))
+        download.assert_called_once_with(NEWER["primary_doc_url"])
+        entry = self._index()["AAPL"]
+        self.assertEqual((entry["cik"], entry["accession_number"], entry["filing_date"], entry["form_type"]),
+                         ("320193", "0000320193-25-000077", "2025-10-31", "10-K"))
+        html_files = sorted(f for f in os.listdir(self.tmp.name) if ".html" in f)
+        self.assertEqual(html_files, [f"AAPL_0000320193-25-000077{sec_10k_tool._filing_suffix()}"])
+
+    def test_edgar_outage_falls_back_to_cached_filing(self):
+        self._load({"return_value": FILING})
+        self._age_index(2 * 24 * 3600)
+        result, _, download = self._load({"side_effect": ConnectionError("EDGAR down")})
+        self.assertEqual(result, (True, "<html>10-K</html>"))
+        download.assert_not_called()
+
+        with patch.object(sec_10k_tool, "latest_10k_metadata", side_effect=ConnectionError("EDGAR down")):
+            with self.assertRaises(ConnectionError):
+                current_filing("MSFT")
+
+    def test_concurrent_processes_keep_every_entry(self):
+        ctx = multiprocessing.get_context("spawn")
+        symbols = ["AAPL", "MSFT", "NVDA"]
+        workers = [ctx.Process(target=_update_index_repeatedly, args=(self.tmp.name, s, 20)) for s in symbols]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join(60)
+        self.assertEqual({s: e["updates"] for s, e in self._index().items()}, dict.fromkeys(symbols, 20))
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, "index.json.lock")))
+
+
+class TestCompressedFilingCache(_CacheDirTestCase):
+    """Filings are stored compressed and evicted least recently used first."""
+
+    def _load(self, symbol, html):
+        filing = {**FILING, "accession_number": f"{symbol}-1"}
+        with patch.object(sec_10k_tool, "latest_10k_metadata", return_value=filing), \
+                patch.object(sec_10k_tool, "download_10k_document", return_value=html) as download:
+            result = Sec10KTool()._load_and_cache(symbol)
+        return result, download
+
+    def _roundtrip(self, compression, suffix):
+        html = "<html>" + "<p>Risk factors and more risk factors.</p>" * 2000 + "</html>"
+        with patch.object(sec_10k_tool, "SEC_CACHE_COMPRESSION", compression):
+            self.assertEqual(self._load("AAPL", html)[0], (False, html))
+            result, download = self._load("AAPL", html)
+        self.assertEqual(result, (True, html))
+        download.assert_not_called()
+
+        entry = self._index()["AAPL"]
+        self.assertEqual(entry["file"], f"AAPL_AAPL-1{suffix}")
+        self.assertEqual(entry["size"], os.path.getsize(os.path.join(self.tmp.name, entry["file"])))
+        self.assertLess(entry["size"], len(html) / 10)
+
+    def test_gzip(self):
+        self._roundtrip("gzip", ".html.gz")
+
+    @unittest.skipIf(sec_10k_tool.zstandard is None, "zstandard not installed")
+    def test_zstd(self):
+        self._roundtrip("zstd", ".html.zst")
+
+    def test_reads_files_written_with_other_settings(self):
+        with patch.object(sec_10k_tool, "SEC_CACHE_COMPRESSION", "none"):
+            self._load("AAPL", "<html>plain</html>")
+        self.assertTrue(os.path.exists(os.path.join(self.tmp.name, "AAPL_AAPL-1.html")))
+        with patch.object(sec_10k_tool, "SEC_CACHE_COMPRESSION", "gzip"):
+            result, download = self._load("AAPL", "<html>plain</html>")
+        self.assertEqual(result, (True, "<html>plain</html>"))
+        download.assert_not_called()
+
+    def test_evicts_least_recently_used(self):
+        with patch.object(sec_10k_tool, "SEC_CACHE_COMPRESSION", "none"), \
+                patch.object(sec_10k_tool, "SEC_CACHE_MAX_BYTES", 250):
+            for symbol in ("AAPL", "MSFT"):
+                self._load(symbol, "x" * 100)
+            self._load("AAPL", "x" * 100)  # AAPL is now the most recently used
+            self._load("NVDA", "x" * 100)
+
+        index = self._index()
+        self.assertNotIn("file", index["MSFT"])
+        self.assertEqual(index["MSFT"]["accession_number"], "MSFT-1")
+        self.assertEqual(sorted(f for f in os.listdir(self.tmp.name) if ".html" in f),
+                         ["AAPL_AAPL-1.html", "NVDA_NVDA-1.html"])
+        _, download = self._load("MSFT", "x" * 100)
+        download.assert_called_once()
+
+
+class TestPrefetch10K(unittest.TestCase):
+    """Downloads overlap, failures are isolated and ingest stays serial."""
+
+    def _prefetch(self, symbols, load):
+        ingested = []
+        with patch.object(Sec10KTool, "_cached_sections", return_value=None), \
+                patch.object(Sec10KTool, "_load_and_cache", side_effect=load), \
+                patch.object(sec_10k_tool, "parse_10k_sections", side_effect=lambda html, ignore: f"md:{html}"), \
+                patch.object(Sec10KTool, "_store_sections"), \
+                patch.object(Sec10KTool, "_save_sections"), \
+                patch.object(Sec10KTool, "_ingest", side_effect=ingested.append), \
+                patch.object(sec_10k_tool, "SEC_DOWNLOAD_WORKERS", 4), \
+                patch.object(sec_10k_tool, "SEC_PARSE_WORKERS", 1):
+            return prefetch_10k(symbols), ingested
+
+    def test_downloads_run_concurrently(self):
+        active, peak, lock = [0], [0], threading.Lock()
+
+        def load(symbol):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+            return False, symbol
+
+        outcome, _ = self._prefetch(["AAPL", "MSFT", "NVDA", "AMZN"], load)
+        self.assertEqual(peak[0], 4)
+        self.assertEqual(list(outcome), ["AAPL", "MSFT", "NVDA", "AMZN"])
+
+    def test_ingest_is_serial_and_skips_cached(self):
+        def load(symbol):
+            if symbol == "BAD":
+                raise ValueError("no filing")
+            time.sleep(0.05 if symbol == "AAPL" else 0)  # finishes last
+            return symbol == "MSFT", symbol
+
+        outcome, ingested = self._prefetch(["AAPL", "BAD", "MSFT", "NVDA"], load)
+        self.assertEqual(outcome, {
+            "AAPL": "ingested", "BAD": "error: no filing", "MSFT": "cached", "NVDA": "ingested",
+        })
+        self.assertEqual(ingested, ["md:AAPL", "md:NVDA"])
+
+
+class TestParsedSectionCache(_CacheDirTestCase):
+    """Extracted sections are reused per accession number and config."""
+
+    def test_key_tracks_config(self):
+        key = sections_cache_key("0000320193-24-000123")
+        self.assertTrue(key.startswith("0000320193-24-000123-"))
+        self.assertNotEqual(key, sections_cache_key("0000320193-24-000123", ignore_table=True))
+        with patch.dict(sec_10k_tool.TARGET_SECTIONS, {"7": "text"}):
+            self.assertNotEqual(key, sections_cache_key("0000320193-24-000123"))
+        with patch.object(sec_10k_tool, "SECTIONS_FORMAT_VERSION", 99):
+            self.assertNotEqual(key, sections_cache_key("0000320193-24-000123"))
+
+    def test_warm_run_skips_download_and_parse(self):
+        with patch.object(sec_10k_tool, "latest_10k_metadata", return_value=FILING), \
+                patch.object(sec_10k_tool, "download_10k_document", return_value="<html>10-K</html>") as download, \
+                patch.object(sec_10k_tool, "parse_10k_sections", return_value="# Item 1A\nRisks\n") as parse, \
+                patch.object(Sec10KTool, "_ingest", return_value="ingested") as ingest:
+            self.assertEqual(Sec10KTool()._run("AAPL"), "ingested")
+            output = os.path.join(self.tmp.name, "generated", "AAPL_10k_parsed.md")
+            os.remove(output)
+            self.assertEqual(Sec10KTool()._run("AAPL"), "# Item 1A\nRisks\n")
+            with open(output) as f:
+                self.assertEqual(f.read(), "# Item 1A\nRisks\n")
+            self.assertEqual(prefetch_10k(["AAPL"]), {"AAPL": "cached"})
+
+        download.assert_called_once()
+        parse.assert_called_once()
+        ingest.assert_called_once()
+
+    def test_new_config_reparses(self):
+        with patch.object(sec_10k_tool, "latest_10k_metadata", return_value=FILING), \
+                patch.object(sec_10k_tool, "download_10k_document", return_value="<html>10-K</html>"), \
+                patch.object(sec_10k_tool, "parse_10k_sections", return_value="md") as parse, \
+                patch.object(Sec10KTool, "_ingest"):
+            Sec10KTool()._run("AAPL")
+            Sec10KTool(ignore_table=True)._run("AAPL")
+        self.assertEqual(parse.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+"""
+Test cases for locating and extracting 10-K Item sections from raw HTML.
+"""
+
+import unittest
+from unittest.mock import Mock, patch
+
+from src.sp_stock_agent.tools import sec_10k_tool
+from src.sp_stock_agent.tools.sec_10k_tool import locate_target_sections, parse_10k_sections
+
+FILING = (
+    '<html><body><table>'
+    '<tr><td><a href="#1a">Item 1A.</a></td><td>Risk Factors</td></tr>'
+    '<tr><td><a href="#1b">Item 1B.</a></td></tr>'
+    '<tr><td><a href="#7a">Item 7A.</a></td></tr>'
+    '<tr><td><a href="#8">Item 8.</a></td></tr>'
+    '<tr><td><a href="#9">Item 9.</a></td></tr>'
+    '</table>'
+    '<div><span style="font-weight:bold">Item&#160;1A.</span><span> Risk Factors</span></div>'
+    '<p>' + 'Our business faces many risks. ' * 40 + '</p>'
+    '<p>As discussed in <a href="#7a">Item 7A</a> below, interest rates affect our results.</p>'
+    '<div><b>ITEM 1B. UNRESOLVED STAFF COMMENTS</b></div><p>None.</p>'
+    '<div><b>Item 7A. Quantitative and Qualitative Disclosures About Market Risk</b></div>'
+    '<p>' + 'We are exposed to market risk. ' * 20 + '</p>'
+    '<div><b>Item 8. Financial Statements</b></div>'
+    '<table><tr><td>Revenue</td><td>100</td></tr></table>'
+    '<div><b>Item 9. Changes in and Disagreements with Accountants</b></div><p>None.</p>'
+    '</body></html>'
+)
+
+
+class TestLocateSections(unittest.TestCase):
+    """Item boundaries are found in the raw HTML."""
+
+    def test_finds_body_sections_not_toc_or_cross_references(self):
+        sections = locate_target_sections(FILING)
+        self.assertEqual([(s[0], s[1]) for s in sections], [("1a", "all"), ("7a", "all"), ("8", "table")])
+        self.assertEqual(sections[0][2], "Item 1A. Risk Factors")
+
+        risk = FILING[sections[0][3]:sections[0][4]]
+        self.assertIn("Our business faces many risks.", risk)
+        self.assertIn("interest rates affect", risk)
+        self.assertNotIn("UNRESOLVED STAFF COMMENTS", risk)
+
+        financials = FILING[sections[2][3]:sections[2][4]]
+        self.assertIn("<td>Revenue</td>", financials)
+        self.assertNotIn("Changes in and Disagreements", financials)
+
+    def test_no_item_headings(self):
+        self.assertEqual(locate_target_sections("<html><body><p>Annual report</p></body></html>"), [])
+
+
+class TestParseSections(unittest.TestCase):
+    """Only the located ranges are parsed; output is joined once."""
+
+    def _element(self, cls, text):
+        return Mock(spec=cls, text=text)
+
+    def test_parses_only_target_ranges(self):
+        parser = Mock()
+
+        def parse(fragment):
+            heading = self._element(sec_10k_tool.sp.TopSectionTitle, fragment.split("</")[0].split(">")[-1])
+            return [heading, self._element(sec_10k_tool.sp.TextElement, f"body of {len(fragment)}")]
+
+        parser.parse.side_effect = parse
+        with patch.object(sec_10k_tool.sp, "Edgar10KParser", Mock(return_value=parser), create=True), \
+                patch.object(sec_10k_tool.sp, "TreeBuilder") as tree_builder:
+            markdown = parse_10k_sections(FILING)
+
+        fragments = [c.args[0] for c in parser.parse.call_args_list]
+        self.assertEqual(len(fragments), 3)
+        self.assertLess(sum(map(len, fragments)), len(FILING))
+        self.assertTrue(all("Item 1B." not in f and "UNRESOLVED" not in f for f in fragments))
+        tree_builder.assert_not_called()
+        self.assertTrue(markdown.startswith("# Item 1A. Risk Factors\nbody of "))
+        self.assertIn("# Item 7A. Quantitative", markdown)
+        # Item 8 is "table" only, so its text elements are dropped.
+        self.assertTrue(markdown.endswith("# Item 8. Financial Statements\n"))
+
+    def test_falls_back_to_full_tree(self):
+        with patch.object(sec_10k_tool, "_parse_full_tree", return_value="full") as full:
+            self.assertEqual(parse_10k_sections("<html><p>no items</p></html>", ignore_table=True), "full")
+        full.assert_called_once_with("<html><p>no items</p></html>", True)
+
+
+if __name__ == '__main__':
+    unittest.main()
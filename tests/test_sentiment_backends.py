@@ -0,0 +1,50 @@
+"""
+Test cases for the pluggable news sentiment backends.
+"""
+
+import unittest
+from unittest.mock import Mock, patch
+
+from src.sp_stock_agent import sentiment_backends
+from src.sp_stock_agent.sentiment_backends import (
+    SENTIMENT_LABELS,
+    TextClassifierBackend,
+    ZeroShotBackend,
+    load_sentiment_backend,
+)
+
+
+class TestSentimentBackends(unittest.TestCase):
+    """Every backend answers with the scraper's labels."""
+
+    def test_zero_shot_uses_candidate_labels(self):
+        pipe = Mock(return_value={"labels": ["BEARISH", "NEUTRAL", "BULLISH"], "scores": [0.71234, 0.2, 0.08766]})
+        out = ZeroShotBackend(pipe)(["Guidance cut"], batch_size=1)
+        self.assertEqual(out, [{"label": "BEARISH", "score": 0.7123}])
+        self.assertEqual(pipe.call_args[0][1], SENTIMENT_LABELS)
+
+    def test_classifier_maps_finbert_labels(self):
+        pipe = Mock(return_value=[
+            {"label": "positive", "score": 0.91},
+            {"label": "Negative", "score": 0.8},
+            {"label": "neutral", "score": 0.6},
+        ])
+        out = TextClassifierBackend(pipe)(["a", "b", "c"], batch_size=3)
+        self.assertEqual([o["label"] for o in out], ["BULLISH", "BEARISH", "NEUTRAL"])
+        self.assertEqual(pipe.call_args[1], {"batch_size": 3, "truncation": True})
+
+    def test_backend_selection(self):
+        factory = Mock(return_value="backend")
+        with patch.dict(sentiment_backends.BACKENDS, {"finbert": factory}):
+            self.assertEqual(load_sentiment_backend("FinBERT"), "backend")
+        with self.assertRaises(ValueError):
+            load_sentiment_backend("no-such-model")
+
+    def test_onnx_backend_explains_missing_dependency(self):
+        with patch.dict("sys.modules", {"optimum": None, "optimum.onnxruntime": None}):
+            with self.assertRaisesRegex(ImportError, "optimum"):
+                load_sentiment_backend("finbert-onnx")
+
+
+if __name__ == '__main__':
+    unittest.main()
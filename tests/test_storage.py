@@ -0,0 +1,48 @@
+"""
+Test cases for the shared atomic-write and SQLite helpers.
+"""
+
+import os
+import tempfile
+import unittest
+from contextlib import closing
+from pathlib import Path
+from unittest.mock import patch
+
+from src.sp_stock_agent.storage import connect_sqlite, write_atomic
+
+
+class TestStorage(unittest.TestCase):
+    """Atomic file replacement and WAL connections."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_write_atomic_text_and_bytes(self):
+        path = self.root / "nested" / "entry.json"
+        write_atomic(path, '{"v": 1}')
+        self.assertEqual(path.read_text(), '{"v": 1}')
+        write_atomic(str(path), b"\x28\xb5\x2f\xfd")
+        self.assertEqual(path.read_bytes(), b"\x28\xb5\x2f\xfd")
+        self.assertEqual(os.listdir(path.parent), ["entry.json"])
+
+    def test_failed_write_keeps_old_file(self):
+        path = self.root / "entry.json"
+        write_atomic(path, "old")
+        with patch("src.sp_stock_agent.storage.os.replace", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                write_atomic(path, "new")
+        self.assertEqual(path.read_text(), "old")
+        self.assertEqual(os.listdir(self.root), ["entry.json"])
+
+    def test_connect_sqlite_uses_wal(self):
+        with closing(connect_sqlite(self.root / "store.sqlite")) as conn:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+
+
+if __name__ == '__main__':
+    unittest.main()